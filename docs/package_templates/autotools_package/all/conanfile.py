@@ -1,10 +1,8 @@
 from conan import ConanFile
 from conan.errors import ConanInvalidConfiguration
-from conan.tools.apple import fix_apple_shared_install_name
 from conan.tools.build import check_min_cppstd, cross_building
 from conan.tools.env import Environment, VirtualRunEnv
 from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, rm, rmdir
-from conan.tools.gnu import Autotools, AutotoolsDeps, AutotoolsToolchain, PkgConfigDeps
 from conan.tools.layout import basic_layout
 from conan.tools.microsoft import is_msvc, unix_path
 import os
@@ -102,6 +100,10 @@ class PackageConan(ConanFile):
         apply_conandata_patches(self)
 
     def generate(self):
+        # build helpers only needed by generate(), build() or package() are imported there, not at module level:
+        # this keeps loading the recipe fast when Conan only computes a dependency graph
+        from conan.tools.gnu import AutotoolsDeps, AutotoolsToolchain, PkgConfigDeps
+
         # inject required env vars into the build scope
         # it's required in case of native build when there is AutotoolsDeps & at least one dependency which might be shared, because configure tries to run a test executable
         if not cross_building(self):
@@ -146,6 +148,7 @@ class PackageConan(ConanFile):
             env.vars(self).save_script("conanbuild_msvc")
 
     def build(self):
+        from conan.tools.gnu import Autotools
 
         autotools = Autotools(self)
         # (optional) run autoreconf to regenerate configure file (libtool should be in tool_requires)
@@ -155,6 +158,9 @@ class PackageConan(ConanFile):
         autotools.make()
 
     def package(self):
+        from conan.tools.apple import fix_apple_shared_install_name
+        from conan.tools.gnu import Autotools
+
         copy(self, "LICENSE", self.source_folder, os.path.join(self.package_folder, "licenses"))
         autotools = Autotools(self)
         autotools.install()
@@ -1,11 +1,8 @@
 from conan import ConanFile
 from conan.errors import ConanInvalidConfiguration
-from conan.tools.apple import fix_apple_shared_install_name
 from conan.tools.build import check_min_cppstd
 from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, rm, rmdir
-from conan.tools.gnu import PkgConfigDeps
 from conan.tools.layout import basic_layout
-from conan.tools.meson import Meson, MesonToolchain
 from conan.tools.microsoft import is_msvc
 import os
 
@@ -93,6 +90,11 @@ class PackageConan(ConanFile):
         apply_conandata_patches(self)
 
     def generate(self):
+        # build helpers only needed by generate(), build() or package() are imported there, not at module level:
+        # this keeps loading the recipe fast when Conan only computes a dependency graph
+        from conan.tools.gnu import PkgConfigDeps
+        from conan.tools.meson import MesonToolchain
+
         # Meson feature options must be set to "enabled" or "disabled"
         def feature(v): return "enabled" if v else "disabled"
         # default_library and static and fpic are automatically parsed when self.options.shared and self.options.fpic exist
@@ -112,11 +114,16 @@ class PackageConan(ConanFile):
         deps.generate()
 
     def build(self):
+        from conan.tools.meson import Meson
+
         meson = Meson(self)
         meson.configure()
         meson.build()
 
     def package(self):
+        from conan.tools.apple import fix_apple_shared_install_name
+        from conan.tools.meson import Meson
+
         copy(self, "LICENSE", self.source_folder, os.path.join(self.package_folder, "licenses"))
         meson = Meson(self)
         meson.install()
@@ -1,7 +1,7 @@
 from conan import ConanFile
 from conan.errors import ConanInvalidConfiguration
 from conan.tools.apple import is_apple_os
-from conan.tools.build import check_min_cppstd
+from conan.tools.build import check_min_cppstd, valid_min_cppstd
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.files import export_conandata_patches, apply_conandata_patches, copy, get, load, rmdir, save
 from conan.tools.microsoft import is_msvc, is_msvc_static_runtime
@@ -25,10 +25,17 @@ class AbseilConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # ABSL_OPTION_HARDENED in absl/base/options.h: bounds checks in containers and types, also in release builds
+        "hardened": [True, False],
+        # ABSL_OPTION_USE_STD_{ANY,OPTIONAL,STRING_VIEW,VARIANT,ORDERING} in absl/base/options.h,
+        # "auto" lets each consumer pick the std types if its C++ standard has them
+        "use_std": ["auto", True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "hardened": False,
+        "use_std": "auto",
     }
     short_paths = True
     extension_properties = {"compatibility_cppstd": False}
@@ -52,6 +59,11 @@ class AbseilConan(ConanFile):
             # upstream tries its best to export symbols, but it's broken for the moment
             raise ConanInvalidConfiguration(f"{self.ref} shared not availabe for Visual Studio, please use version 20230802.1 or newer")
 
+        if self.options.use_std == True:
+            check_min_cppstd(self, 17)
+        elif self.options.use_std == False and Version(self.version) >= "20250512.1":
+            raise ConanInvalidConfiguration(f"{self.ref} always uses the std types, use_std=False is only supported by older versions")
+
     def build_requirements(self):
         # https://github.com/abseil/abseil-cpp/blob/20240722.0/CMakeLists.txt#L19
         if Version(self.version) >= "20240722.0":
@@ -74,7 +86,22 @@ class AbseilConan(ConanFile):
             tc.cache_variables["ABSL_MSVC_STATIC_RUNTIME"] = runtime == "static"
         tc.generate()
 
+    def _patch_sources(self):
+        # Pin the choices of options.h, so that every consumer of this package sees the same types and ABI
+        options_h = os.path.join(self.source_folder, "absl", "base", "options.h")
+        content = load(self, options_h)
+        if self.options.use_std != "auto":
+            use_std = {name: 1 if self.options.use_std else 0 for name in ("ANY", "OPTIONAL", "STRING_VIEW", "VARIANT")}
+            # std::strong_ordering and friends come with C++20
+            use_std["ORDERING"] = 1 if self.options.use_std and valid_min_cppstd(self, 20) else 0
+            for name, value in use_std.items():
+                content = re.sub(rf"#define ABSL_OPTION_USE_STD_{name} \d", f"#define ABSL_OPTION_USE_STD_{name} {value}", content)
+        if self.options.hardened:
+            content = re.sub(r"#define ABSL_OPTION_HARDENED \d", "#define ABSL_OPTION_HARDENED 1", content)
+        save(self, options_h, content)
+
     def build(self):
+        self._patch_sources()
         cmake = CMake(self)
         cmake.configure()
         cmake.build()
@@ -17,7 +17,12 @@ class TestPackageConan(ConanFile):
 
     def generate(self):
         tc = CMakeToolchain(self)
-        tc.variables["CXX20_SUPPORTED"] = Version(self.dependencies["abseil"].ref.version) > "20210324.2"
+        abseil = self.dependencies["abseil"]
+        tc.variables["CXX20_SUPPORTED"] = Version(abseil.ref.version) > "20210324.2"
+        use_std = abseil.options.get_safe("use_std", "auto")
+        if use_std != "auto":
+            tc.cache_variables["ABSL_EXPECTED_USE_STD"] = 1 if use_std else 0
+        tc.cache_variables["ABSL_EXPECTED_HARDENED"] = 1 if abseil.options.get_safe("hardened") else 0
         tc.generate()
 
     def build(self):
@@ -10,6 +10,21 @@
 #include "absl/numeric/int128.h"
 #include "absl/time/time.h"
 #include "absl/types/variant.h"
+#include "absl/base/config.h"
+
+#if defined(ABSL_EXPECTED_USE_STD)
+#if ABSL_EXPECTED_USE_STD && !(defined(ABSL_USES_STD_ANY) && defined(ABSL_USES_STD_OPTIONAL) && \
+                               defined(ABSL_USES_STD_STRING_VIEW) && defined(ABSL_USES_STD_VARIANT))
+#error "abseil was packaged with use_std=True, but absl/base/options.h does not select the std types"
+#elif !ABSL_EXPECTED_USE_STD && (defined(ABSL_USES_STD_ANY) || defined(ABSL_USES_STD_OPTIONAL) || \
+                                 defined(ABSL_USES_STD_STRING_VIEW) || defined(ABSL_USES_STD_VARIANT))
+#error "abseil was packaged with use_std=False, but absl/base/options.h selects std types"
+#endif
+#endif
+
+#if defined(ABSL_EXPECTED_HARDENED) && ABSL_OPTION_HARDENED != ABSL_EXPECTED_HARDENED
+#error "ABSL_OPTION_HARDENED in absl/base/options.h does not match the hardened option"
+#endif
 
 int main()
 {
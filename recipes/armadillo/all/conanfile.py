@@ -54,6 +54,7 @@ class ArmadilloConan(ConanFile):
         "use_extern_rng": [True, False],
         "use_arpack": [False, "system_arpack"],
         "use_wrapper": [True, False],
+        "openblas_use_openmp": [True, False],
     }
     default_options = {
         "shared": False,
@@ -65,6 +66,7 @@ class ArmadilloConan(ConanFile):
         "use_extern_rng": False,
         "use_arpack": False,
         "use_wrapper": False,
+        "openblas_use_openmp": False,
     }
     # Values that must be set for multiple options to be valid
     _co_dependencies = {
@@ -106,6 +108,10 @@ class ArmadilloConan(ConanFile):
             self.options["openblas"].build_lapack = (
                 self.options.use_lapack == "openblas"
             )
+            if self.options.openblas_use_openmp:
+                self.options["openblas"].use_openmp = True
+        else:
+            self.options.rm_safe("openblas_use_openmp")
 
     def validate(self):
         if self.settings.compiler.cppstd:
@@ -173,6 +179,9 @@ class ArmadilloConan(ConanFile):
         if not self.options.shared and self.options.use_wrapper:
             raise ConanInvalidConfiguration("Building the armadillo run-time wrapper library requires armadillo/*:shared=True")
 
+        if self.options.get_safe("openblas_use_openmp") and not self.dependencies["openblas"].options.use_openmp:
+            raise ConanInvalidConfiguration("armadillo/*:openblas_use_openmp=True requires openblas/*:use_openmp=True")
+
     def requirements(self):
         # Optional requirements
         # TODO: "atlas/3.10.3" # Pending https://github.com/conan-io/conan-center-index/issues/6757
@@ -99,6 +99,7 @@ class BoostConan(ConanFile):
         "segmented_stacks": [True, False],
         "debug_level": list(range(0, 14)),
         "pch": [True, False],
+        "unity_build": [True, False],  # compile groups of sources of some libraries as a single translation unit
         "extra_b2_flags": [None, "ANY"],  # custom b2 flags
         "i18n_backend": ["iconv", "icu", None, "deprecated"],
         "i18n_backend_iconv": ["libc", "libiconv", "off"],
@@ -109,6 +110,8 @@ class BoostConan(ConanFile):
         "buildid": [None, "ANY"],
         "python_buildid": [None, "ANY"],
         "system_use_utf8": [True, False],
+        "components": [None, "ANY"],  # comma separated modules to build (with their dependencies), e.g. filesystem,program_options
+        "headers_subset": [True, False],  # only package the headers needed by `components` (extracted with bcp)
     }
     options.update({f"without_{_name}": [True, False] for _name in CONFIGURE_OPTIONS})
 
@@ -138,6 +141,7 @@ class BoostConan(ConanFile):
         "segmented_stacks": False,
         "debug_level": 0,
         "pch": True,
+        "unity_build": False,
         "extra_b2_flags": None,
         "i18n_backend": "deprecated",
         "i18n_backend_iconv": "libc",
@@ -148,6 +152,8 @@ class BoostConan(ConanFile):
         "buildid": None,
         "python_buildid": None,
         "system_use_utf8": False,
+        "components": None,
+        "headers_subset": False,
     }
     default_options.update({f"without_{_name}": False for _name in CONFIGURE_OPTIONS})
     default_options.update({f"without_{_name}": True for _name in ("graph_parallel", "mpi", "python")})
@@ -368,6 +374,72 @@ class BoostConan(ConanFile):
                 break
         return dependencies
 
+    def _split_components(self, components):
+        """
+        Split a value of the `components` option in the compiled modules of the dependencies-x.y.z.yml file
+        and the other (header-only) libraries
+        """
+        names = sorted(set(name.strip() for name in str(components).split(",") if name.strip()))
+        compiled = [name for name in names if name in self._dependencies["dependencies"]]
+        header_only = [name for name in names if name not in self._dependencies["dependencies"]]
+        return compiled, header_only
+
+    @property
+    def _requested_components(self):
+        if not self.options.get_safe("components"):
+            return [], []
+        return self._split_components(self.options.components)
+
+    @property
+    def _components_closure(self):
+        """Configure options of the requested compiled modules and of all the modules they depend on"""
+        modules = set()
+        for name in self._requested_components[0]:
+            modules.update(self._all_dependent_modules(name))
+        return modules.intersection(self._configure_options)
+
+    @property
+    def _unity_build_groups(self):
+        """
+        Sources (relative to libs/<library>/src) compiled as a single translation unit with unity_build.
+        Every group only lists sources of the same library target that are built unconditionally.
+        Missing sources are ignored, so the groups of several source layouts can be listed.
+        """
+        return {
+            "locale": [
+                # >= 1.81.0
+                ["boost/locale/shared/date_time.cpp", "boost/locale/shared/format.cpp", "boost/locale/shared/formatting.cpp",
+                 "boost/locale/shared/generator.cpp", "boost/locale/shared/ids.cpp"],
+                ["boost/locale/util/codecvt_converter.cpp", "boost/locale/util/default_locale.cpp",
+                 "boost/locale/util/info.cpp", "boost/locale/util/locale_data.cpp"],
+                # < 1.81.0
+                ["shared/date_time.cpp", "shared/format.cpp", "shared/formatting.cpp", "shared/generator.cpp", "shared/ids.cpp"],
+                ["util/codecvt_converter.cpp", "util/default_locale.cpp", "util/info.cpp", "util/locale_data.cpp"],
+            ],
+            "log": [
+                ["attribute_name.cpp", "attribute_set.cpp", "attribute_value_set.cpp"],
+                ["default_attribute_names.cpp", "exceptions.cpp", "severity_level.cpp", "trivial.cpp"],
+                ["date_time_format_parser.cpp", "format_parser.cpp", "named_scope_format_parser.cpp"],
+                ["setup/default_filter_factory.cpp", "setup/default_formatter_factory.cpp", "setup/matches_relation_factory.cpp"],
+                ["setup/init_from_settings.cpp", "setup/init_from_stream.cpp"],
+            ],
+            "program_options": [
+                ["cmdline.cpp", "config_file.cpp", "convert.cpp", "options_description.cpp", "parsers.cpp",
+                 "positional_options.cpp", "split.cpp", "value_semantic.cpp", "variables_map.cpp"],
+            ],
+            "serialization": [
+                ["basic_archive.cpp", "basic_iarchive.cpp", "basic_iserializer.cpp", "basic_oarchive.cpp", "basic_oserializer.cpp",
+                 "basic_pointer_iserializer.cpp", "basic_pointer_oserializer.cpp", "basic_serializer_map.cpp"],
+                ["archive_exception.cpp", "extended_type_info.cpp", "extended_type_info_no_rtti.cpp", "extended_type_info_typeid.cpp",
+                 "singleton.cpp", "void_cast.cpp", "xml_archive_exception.cpp"],
+            ],
+            "wave": [
+                ["instantiate_cpp_exprgrammar.cpp", "instantiate_cpp_grammar.cpp", "instantiate_cpp_literalgrs.cpp",
+                 "instantiate_defined_grammar.cpp", "instantiate_has_include_grammar.cpp", "instantiate_predef_macros.cpp"],
+                ["instantiate_re2c_lexer.cpp", "instantiate_re2c_lexer_str.cpp"],
+            ],
+        }
+
     @property
     def _bcp_dir(self):
         return "custom-boost"
@@ -634,6 +706,14 @@ class BoostConan(ConanFile):
             return not self.options.header_only and not self.options.without_stacktrace and self._b2_architecture == "x86"
 
     def configure(self):
+        if self.options.components:
+            # Only build the requested modules and the modules they depend on: this overrides the without_* options
+            closure = self._components_closure
+            for name in self._configure_options:
+                getattr(self.options, f"without_{name}").value = name not in closure
+        if self.options.header_only or not self.options.components:
+            self.options.rm_safe("headers_subset")
+
         if self.options.header_only:
             self.options.rm_safe("shared")
             self.options.rm_safe("fPIC")
@@ -747,6 +827,12 @@ class BoostConan(ConanFile):
             if not os.path.isabs(str(self.options.addr2line_location)):
                 raise ConanInvalidConfiguration("addr2line_location must be an absolute path to addr2line")
 
+        if self.options.components and not self.options.get_safe("headers_subset", False):
+            header_only = self._requested_components[1]
+            if header_only:
+                raise ConanInvalidConfiguration(f"components: {', '.join(header_only)} are not compiled modules of {self.ref}, "
+                                                "header-only libraries can only be selected with headers_subset=True")
+
         # Check, when a boost module is enabled, whether the boost modules it depends on are enabled as well.
         for mod_name, mod_deps in self._dependencies["dependencies"].items():
             if not self.options.get_safe(f"without_{mod_name}", True):
@@ -843,11 +929,22 @@ class BoostConan(ConanFile):
             del self.info.options.debug_level
             del self.info.options.filesystem_version
             del self.info.options.pch
+            del self.info.options.unity_build  # same exported symbols, see test_package
             del self.info.options.python_executable  # PATH to the interpreter is not important, only version matters
             if self.info.options.without_python:
                 del self.info.options.python_version
             if Version(self.version) >= "1.89.0":
                 del self.info.options.system_use_utf8
+            if self.info.options.get_safe("headers_subset"):
+                # The order of the requested modules does not change the package
+                compiled, header_only = self._split_components(self.info.options.components)
+                self.info.options.components = ",".join(compiled + header_only)
+            else:
+                # Already reflected by the without_* options
+                del self.info.options.components
+            if self._with_lzma:
+                # iostreams is built with or without the multithreaded encoder depending on the threads option of xz_utils
+                self.info.requires["xz_utils"].full_package_mode()
 
     def build_requirements(self):
         if not self.options.header_only:
@@ -1061,7 +1158,7 @@ class BoostConan(ConanFile):
 
     @property
     def _use_bcp(self):
-        return self.options.namespace != "boost"
+        return self.options.namespace != "boost" or self.options.get_safe("headers_subset", False)
 
     @property
     def _boost_build_dir(self):
@@ -1080,21 +1177,85 @@ class BoostConan(ConanFile):
     def _run_bcp(self):
         with chdir(self, self.source_folder):
             mkdir(self, self._bcp_dir)
-            namespace = f"--namespace={self.options.namespace}"
+            namespace = f"--namespace={self.options.namespace}" if self.options.namespace != "boost" else ""
             alias = "--namespace-alias" if self.options.namespace_alias else ""
-            boostdir = f"--boost={self.source_folder}"
+            boostdir = f"--boost={self._b2_source_folder}"
             libraries = {"build", "boost-build.jam", "boostcpp.jam", "boost_install", "headers"}
-            for d in os.listdir(os.path.join(self.source_folder, "boost")):
-                if os.path.isdir(os.path.join(self.source_folder, "boost", d)):
-                    libraries.add(d)
-            for d in os.listdir(os.path.join(self.source_folder, "libs")):
-                if os.path.isdir(os.path.join(self.source_folder, "libs", d)):
-                    libraries.add(d)
-            libraries = " ".join(libraries)
+            if self.options.get_safe("headers_subset"):
+                # bcp adds the headers (and sources) these libraries depend on; config and predef provide
+                # the configure checks used by the Jamfiles
+                header_only = self._requested_components[1]
+                for name in header_only:
+                    if not os.path.isdir(os.path.join(self.source_folder, "libs", name)):
+                        raise ConanException(f"components: '{name}' is neither a compiled module nor a library of boost {self.version}")
+                libraries.update(self._components_closure)
+                libraries.update(header_only)
+                libraries.update({"config", "predef"})
+                self.output.info(f"Extracting the headers of: {', '.join(sorted(libraries))}")
+            else:
+                for d in os.listdir(os.path.join(self.source_folder, "boost")):
+                    if os.path.isdir(os.path.join(self.source_folder, "boost", d)):
+                        libraries.add(d)
+                for d in os.listdir(os.path.join(self.source_folder, "libs")):
+                    if os.path.isdir(os.path.join(self.source_folder, "libs", d)):
+                        libraries.add(d)
+            libraries = " ".join(sorted(libraries))
             command = f"{self._bcp_exe} {namespace} {alias} {boostdir} {libraries} {self._bcp_dir}"
             self.output.warning(command)
             self.run(command)
 
+    @staticmethod
+    def _unity_build_original(source):
+        # Keep the extension of a C++ file, so that bcp also processes it
+        return os.path.splitext(source)[0] + ".conan_unity.ipp"
+
+    @property
+    def _unity_build_source_folder(self):
+        return os.path.join(self.build_folder, "unity-src")
+
+    @property
+    def _b2_source_folder(self):
+        return self._unity_build_source_folder if self.options.unity_build else self.source_folder
+
+    def _copy_unity_build_sources(self):
+        """
+        The source folder is shared by all the configurations, so the unity build is prepared in a copy of it,
+        made of hard links when possible: _apply_unity_build only replaces files, it never writes to them.
+        """
+        def link_or_copy(src, dst):
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+        rmdir(self, self._unity_build_source_folder)
+        shutil.copytree(self.source_folder, self._unity_build_source_folder, symlinks=True, copy_function=link_or_copy,
+                        ignore=lambda folder, names: [self._bcp_dir] if folder == self.source_folder else [])
+
+    def _apply_unity_build(self):
+        """
+        b2 has no unity builds: the first source of each group includes all the sources of the group,
+        which are replaced by empty translation units. The Jamfiles are left untouched.
+        """
+        for library, groups in self._unity_build_groups.items():
+            if self.options.get_safe(f"without_{library}", True):
+                continue
+            src = os.path.join(self._unity_build_source_folder, "libs", library, "src")
+            for group in groups:
+                sources = [os.path.join(src, source) for source in group if os.path.isfile(os.path.join(src, source))]
+                if len(sources) < 2:
+                    continue
+                unity_source = sources[0]
+                includes = []
+                for source in sources:
+                    # Renamed then saved as new files: the hard links to the source folder are left as they are
+                    os.replace(source, self._unity_build_original(source))
+                    include = os.path.relpath(self._unity_build_original(source), os.path.dirname(unity_source)).replace("\\", "/")
+                    includes.append(f'#include "{include}"')
+                    save(self, source, f"// Compiled in {os.path.basename(unity_source)} (unity_build)\n")
+                save(self, unity_source, "// Unity build generated by the Conan recipe (unity_build)\n" + "\n".join(includes) + "\n")
+                self.output.info(f"unity_build: {library}: {', '.join(os.path.relpath(s, src) for s in sources)}")
+
     def build(self):
         stacktrace_jamfile = os.path.join(self.source_folder, "libs", "stacktrace", "build", "Jamfile.v2")
         if cross_building(self, skip_x64_x86=True):
@@ -1145,6 +1306,10 @@ class BoostConan(ConanFile):
 
         self._clean()
 
+        if self.options.unity_build:
+            self._copy_unity_build_sources()
+            self._apply_unity_build()
+
         if self._use_bcp:
             self._build_bcp()
             self._run_bcp()
@@ -1155,7 +1320,7 @@ class BoostConan(ConanFile):
         b2_flags = " ".join(self._build_flags)
         full_command = f"{self._b2_exe} {b2_flags}"
         # -d2 is to print more debug info and avoid travis timing out without output
-        sources = os.path.join(self.source_folder, self._bcp_dir) if self._use_bcp else self.source_folder
+        sources = os.path.join(self.source_folder, self._bcp_dir) if self._use_bcp else self._b2_source_folder
         full_command += f' --debug-configuration --build-dir="{self.build_folder}"'
         self.output.warning(full_command)
 
@@ -1310,6 +1475,9 @@ class BoostConan(ConanFile):
             add_defines("bzip2")
         if self._with_lzma:
             add_defines("xz_utils")
+            if not self.dependencies["xz_utils"].options.get_safe("threads", True):
+                # iostreams uses lzma_stream_encoder_mt, which liblzma only provides when built with threads
+                flags.append("define=BOOST_IOSTREAMS_LZMA_NO_MULTITHREADED")
         if self._with_zstd:
             add_defines("zstd")
 
@@ -8,8 +8,9 @@ import pprint
 import re
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 from conan.tools.files import chdir
@@ -105,19 +106,72 @@ class BoostDependencies(object):
     export: BoostDependenciesExport
 
 
+class BoostScanCache(object):
+    """Results of the scans of a boost library, keyed by the commit of its submodule.
+
+    Libraries whose submodule did not change between two boost versions are not scanned again.
+    boostdep results depend on every library, they are keyed by the commit of the superproject.
+    The cache is only written by the main process: the scans run in the process pool return their
+    results, which are added before the dependency files are generated.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries = {}
+        if path and path.is_file():
+            try:
+                self.entries = json.loads(path.read_text())
+            except ValueError:
+                log.warning("Ignoring corrupted cache %s", path)
+
+    def get(self, kind: str, commit: Optional[str], key: str):
+        if not commit:
+            return None
+        return self.entries.get(f"{kind}:{key}@{commit}")
+
+    def set(self, kind: str, commit: Optional[str], key: str, value) -> None:
+        if commit:
+            self.entries[f"{kind}:{key}@{commit}"] = value
+
+    def save(self) -> None:
+        if self.path:
+            self.path.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+
+
 class BoostDependencyBuilder(object):
-    def __init__(self, boost_version: str, boostdep_version: str, tmppath: Path, git_url: str, outputdir: Path, unsafe: bool):
+    def __init__(self, boost_version: str, boostdep_version: str, tmppath: Path, git_url: str, outputdir: Path, unsafe: bool,
+                 boost_path: Optional[Path] = None, cache: Optional[BoostScanCache] = None, boostdep: Optional[Path] = None):
         self.boost_version = boost_version
         self.boostdep_version = boostdep_version
         self.git_url = git_url
         self.tmppath = tmppath
         self.outputdir = outputdir
         self.unsafe = unsafe
-        self._boostdep = None
+        self._boost_path = boost_path
+        self.cache = cache or BoostScanCache(None)
+        self._boostdep = boostdep
+        self._submodule_commits = None
 
     @property
     def boost_path(self) -> Path:
-        return self.tmppath / "boost"
+        return self._boost_path or self.tmppath / "boost"
+
+    @property
+    def submodule_commits(self) -> Dict[str, str]:
+        """Commit of every submodule of the checked out version, e.g. {"libs/filesystem": "1a2b..."}."""
+        if self._submodule_commits is None:
+            self._submodule_commits = {}
+            output = subprocess.check_output(["git", "-C", str(self.boost_path), "ls-tree", "-r", "HEAD"], text=True)
+            for line in output.splitlines():
+                info, path = line.split("\t", 1)
+                mode, kind, sha = info.split()
+                if kind == "commit":
+                    self._submodule_commits[path] = sha
+            self._submodule_commits[""] = subprocess.check_output(["git", "-C", str(self.boost_path), "rev-parse", "HEAD"], text=True).strip()
+        return self._submodule_commits
+
+    def _library_commit(self, component: str) -> Optional[str]:
+        return self.submodule_commits.get(f"libs/{component}")
 
     def do_git_update(self) -> None:
         if not self.boost_path.exists():
@@ -138,6 +192,29 @@ class BoostDependencyBuilder(object):
                 print("Checking out current master")
                 subprocess.check_call(["git", "checkout", "origin/master"])
 
+    def do_git_shallow_clone(self) -> None:
+        """Clone only what is needed to add worktrees for boost tags, see do_git_worktree_update."""
+        with chdir(self, self.tmppath):
+            print("Cloning boost git (shallow)")
+            subprocess.check_call(["git", "clone", "--depth", "1", "--no-checkout", "--", self.git_url, "boost"])
+
+    def do_git_worktree_update(self, main_path: Path) -> None:
+        """Check out the version in its own worktree of the main clone, with shallow submodules."""
+        tag = f"boost-{self.boost_version}"
+        print(f"Fetching {tag}")
+        subprocess.check_call(["git", "-C", str(main_path), "fetch", "--depth", "1", "origin", "tag", tag, "--no-tags"])
+        if not self.boost_path.exists():
+            print(f"Adding worktree {self.boost_path}")
+            subprocess.check_call(["git", "-C", str(main_path), "worktree", "add", "--detach", str(self.boost_path), tag])
+        else:
+            subprocess.check_call(["git", "-C", str(self.boost_path), "checkout", "--detach", tag])
+
+    def do_git_worktree_submodule_update(self) -> None:
+        with chdir(self, self.boost_path):
+            print(f"Updating submodules of boost-{self.boost_version}")
+            subprocess.check_call(["git", "submodule", "update", "--init", "--depth", "1", "--jobs", "8"])
+            subprocess.check_call(["git", "clean", "-d", "-f"])
+
     def do_git_submodule_update(self):
         with chdir(self, self.boost_path):
             if not self.unsafe:
@@ -190,16 +267,25 @@ class BoostDependencyBuilder(object):
         return list(res)
 
     def _grep_requirements(self, component: str) -> List[str]:
-        jam = self.boost_path / "libs" / component / "build" / "Jamfile.v2"
+        commit = self._library_commit(component)
+        requirements = self.cache.get("requirements", commit, component)
+        if requirements is None:
+            requirements = self._scan_requirements(self.boost_path, component)
+            self.cache.set("requirements", commit, component, requirements)
+        return requirements
+
+    @classmethod
+    def _scan_requirements(cls, boost_path: Path, component: str) -> List[str]:
+        jam = boost_path / "libs" / component / "build" / "Jamfile.v2"
         if not jam.is_file():
-            jam = self.boost_path / "libs" / component / "build" / "Jamfile"
+            jam = boost_path / "libs" / component / "build" / "Jamfile"
         if not jam.is_file():
             log.warning("Can't find Jamfile for %s. Unable to determine dependencies.", component)
             return []
         contents = jam.open().read()
 
-        using = self._grep_libs("\n(.*)using\\s+([^ ;:]+)\\s*", contents)
-        libs = self._grep_libs("\n(.*)\\s(?:searched-)?lib\\s+([^ \t\n;:]+)", contents)
+        using = cls._grep_libs("\n(.*)using\\s+([^ ;:]+)\\s*", contents)
+        libs = cls._grep_libs("\n(.*)\\s(?:searched-)?lib\\s+([^ \t\n;:]+)", contents)
 
         requirements = using + libs
         return requirements
@@ -226,30 +312,71 @@ class BoostDependencyBuilder(object):
             unknown_libs.add(req)
         return list(conan_requirements), system_libs, list(unknown_libs)
 
+    _BOOSTDEP_ARGUMENTS = ("--list-buildable", "--list-buildable-dependencies")
+
+    def _run_boostdep(self, argument: str) -> str:
+        superproject_commit = self.submodule_commits[""]
+        key = f"{self.boostdep_version}{argument}"
+        output = self.cache.get("boostdep", superproject_commit, key)
+        if output is None:
+            output = self._query_boostdep(self._boostdep, self.boost_path, argument)
+            self.cache.set("boostdep", superproject_commit, key, output)
+        return output
+
+    @staticmethod
+    def _query_boostdep(boostdep: Path, boost_path: Path, argument: str) -> str:
+        return subprocess.check_output([str(boostdep), argument], cwd=boost_path, text=True)
+
+    def pending_boostdep_queries(self) -> List[Tuple[str, Optional[str], str, Tuple]]:
+        """boostdep queries of this version missing from the cache, as (kind, commit, key, query) scans."""
+        superproject_commit = self.submodule_commits[""]
+        pending = []
+        for argument in self._BOOSTDEP_ARGUMENTS:
+            key = f"{self.boostdep_version}{argument}"
+            if superproject_commit and self.cache.get("boostdep", superproject_commit, key) is None:
+                pending.append(("boostdep", superproject_commit, key, (self._boostdep, self.boost_path, argument)))
+        return pending
+
+    def pending_scans(self) -> List[Tuple[str, Optional[str], str, Tuple]]:
+        """Jamfile scans of the buildable libraries of this version missing from the cache.
+
+        boostdep has to be queried first, to know the buildable libraries.
+        """
+        buildables = self._run_boostdep("--list-buildable").splitlines()
+        pending = []
+        for buildable in buildables:
+            commit = self._library_commit(buildable)
+            if not commit:
+                continue
+            if buildable in CONFIGURE_OPTIONS and self.cache.get("requirements", commit, buildable) is None:
+                pending.append(("requirements", commit, buildable, (self.boost_path, buildable)))
+            if self.cache.get("libraries", commit, buildable) is None:
+                pending.append(("libraries", commit, buildable, (self.boost_path, buildable)))
+        return pending
+
     def do_boostdep_collect(self) -> BoostDependencies:
-        with chdir(self, self.boost_path):
-            buildables = subprocess.check_output([self._boostdep, "--list-buildable"], text=True)
-            buildables = buildables.splitlines()
-            log.debug("`boostdep --list--buildable` returned these buildables: %s", buildables)
-
-            # modules = subprocess.check_output([self._boostdep_path, "--list-modules"])
-            # modules = modules.decode().splitlines()
-
-            dependency_tree = {}
-            buildable_dependencies = subprocess.check_output([self._boostdep, "--list-buildable-dependencies"], text=True)
-            log.debug("boostdep --list-buildable-dependencies returns: %s", buildable_dependencies)
-            for line in buildable_dependencies.splitlines():
-                if re.match(r"^[\s]*#.*", line):
-                    continue
-                match = re.match(r"([\S]+)\s*=\s*([^;]+)\s*;\s*", line)
-                if not match:
-                    continue
-                master = match.group(1)
-                dependencies = re.split(r"\s+", match.group(2).strip())
-                dependency_tree[master] = dependencies
-
-            log.debug("Using `boostdep --track-sources`, the following dependency tree was calculated:")
-            log.debug(pprint.pformat(dependency_tree))
+        buildables = self._run_boostdep("--list-buildable")
+        buildables = buildables.splitlines()
+        log.debug("`boostdep --list--buildable` returned these buildables: %s", buildables)
+
+        # modules = subprocess.check_output([self._boostdep_path, "--list-modules"])
+        # modules = modules.decode().splitlines()
+
+        dependency_tree = {}
+        buildable_dependencies = self._run_boostdep("--list-buildable-dependencies")
+        log.debug("boostdep --list-buildable-dependencies returns: %s", buildable_dependencies)
+        for line in buildable_dependencies.splitlines():
+            if re.match(r"^[\s]*#.*", line):
+                continue
+            match = re.match(r"([\S]+)\s*=\s*([^;]+)\s*;\s*", line)
+            if not match:
+                continue
+            master = match.group(1)
+            dependencies = re.split(r"\s+", match.group(2).strip())
+            dependency_tree[master] = dependencies
+
+        log.debug("Using `boostdep --track-sources`, the following dependency tree was calculated:")
+        log.debug(pprint.pformat(dependency_tree))
 
         filtered_dependency_tree = {k: [d for d in v if d in buildables] for k, v in dependency_tree.items() if k in buildables}
 
@@ -333,21 +460,34 @@ class BoostDependencyBuilder(object):
     def _boostify_library(lib: str) -> str:
         return f"boost_{lib}"
 
+    def _jam_libraries(self, buildable: str) -> set:
+        commit = self._library_commit(buildable)
+        buildable_libs = self.cache.get("libraries", commit, buildable)
+        if buildable_libs is None:
+            buildable_libs = self._scan_jam_libraries(self.boost_path, buildable)
+            self.cache.set("libraries", commit, buildable, buildable_libs)
+        return set(buildable_libs)
+
+    @staticmethod
+    def _scan_jam_libraries(boost_path: Path, buildable: str) -> List[str]:
+        construct_jam = lambda jam_ext : boost_path / "libs" / buildable / "build" / f"Jamfile{jam_ext}"
+        try:
+            buildable_jam = next(construct_jam(jam_ext) for jam_ext in ("", ".v2") if construct_jam(jam_ext).is_file())
+        except StopIteration:
+            raise Exception(f"Cannot find jam build file for {buildable}")
+        jam_text = buildable_jam.read_text()
+        buildable_libs = re.findall("[ \n](boost-)?lib ([a-zA-Z0-9_]+)[ \n]", jam_text)
+        buildable_libs = set(f"boost_{lib}" if lib_prefix else lib for lib_prefix, lib in buildable_libs)
+        buildable_libs = set(l[len("boost_"):] for l in buildable_libs if l.startswith("boost_"))  # list(filter(lambda l: l.startswith("boost"), buildable_libs))
+        return sorted(buildable_libs)
+
     def do_create_libraries(self, boost_dependencies: BoostDependencies):
         libraries = {}
         module_provides_extra = {}
 
         #  Look for the names of libraries in Jam build files
         for buildable in boost_dependencies.buildables:
-            construct_jam = lambda jam_ext : self.boost_path / "libs" / buildable / "build" / f"Jamfile{jam_ext}"
-            try:
-                buildable_jam = next(construct_jam(jam_ext) for jam_ext in ("", ".v2") if construct_jam(jam_ext).is_file())
-            except StopIteration:
-                raise Exception(f"Cannot find jam build file for {buildable}")
-            jam_text = buildable_jam.read_text()
-            buildable_libs = re.findall("[ \n](boost-)?lib ([a-zA-Z0-9_]+)[ \n]", jam_text)
-            buildable_libs = set(f"boost_{lib}" if lib_prefix else lib for lib_prefix, lib in buildable_libs)
-            buildable_libs = set(l[len("boost_"):] for l in buildable_libs if l.startswith("boost_"))  # list(filter(lambda l: l.startswith("boost"), buildable_libs))
+            buildable_libs = self._jam_libraries(buildable)
 
             if not buildable_libs:
                 # Some boost releases support multiple python versions
@@ -424,6 +564,41 @@ class BoostDependencyBuilder(object):
             yaml.dump(data, fout)
 
 
+_SCANS = {
+    "boostdep": BoostDependencyBuilder._query_boostdep,
+    "requirements": BoostDependencyBuilder._scan_requirements,
+    "libraries": BoostDependencyBuilder._scan_jam_libraries,
+}
+
+
+def _scan(job: Tuple[str, Tuple]):
+    """Process pool entry point: run one boostdep query or Jamfile scan."""
+    kind, arguments = job
+    return _SCANS[kind](*arguments)
+
+
+def _update_worktree(builder: BoostDependencyBuilder) -> None:
+    """Process pool entry point: update the submodules of a version checked out in a worktree."""
+    builder.do_git_worktree_submodule_update()
+
+
+def run_scans(executor: ProcessPoolExecutor, cache: BoostScanCache, pending: List[Tuple[str, Optional[str], str, Tuple]]) -> None:
+    """Run the pending scans in the process pool and add their results to the cache.
+
+    Scans of the same library at the same commit, e.g. of a submodule that did not change between two
+    versions, are only run once.
+    """
+    unique = {}
+    for kind, commit, key, arguments in pending:
+        unique.setdefault((kind, commit, key), arguments)
+    if not unique:
+        return
+    print(f"Running {len(unique)} scans")
+    jobs = [(kind, arguments) for (kind, _, _), arguments in unique.items()]
+    for (kind, commit, key), result in zip(unique, executor.map(_scan, jobs)):
+        cache.set(kind, commit, key, result)
+
+
 def main(args=None) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
@@ -433,10 +608,17 @@ def main(args=None) -> int:
     parser.add_argument("-U", dest="git_update", action="store_true", help="update the git repo")
     parser.add_argument("-o", dest="outputdir", default=None, type=Path, help="output dependency dir")
     parser.add_argument("-x", dest="unsafe", action="store_true", help="unsafe fast(er) operation")
+    parser.add_argument("-w", dest="worktrees", action="store_true",
+                        help="check out every version in its own git worktree of a single (shallow with -U) clone")
+    parser.add_argument("-j", dest="jobs", default=1, type=int,
+                        help="processes running the boostdep queries, the Jamfile scans and the submodule updates of the worktrees")
+    parser.add_argument("-c", dest="cache", default=None, type=Path,
+                        help="cache of the scans, keyed by submodule commit (default is boost-dependencies-cache.json in the temporary folder)")
+    parser.add_argument("-C", dest="no_cache", action="store_true", help="do not use the scan cache")
 
     version_group = parser.add_mutually_exclusive_group(required=True)
-    version_group.add_argument("-v", dest="boost_version", help="boost version")
-    version_group.add_argument("-A", dest="boost_version", action="store_const", const=None, help="All boost versions")
+    version_group.add_argument("-v", dest="boost_versions", action="append", help="boost version (can be repeated)")
+    version_group.add_argument("-A", dest="boost_versions", action="store_const", const=None, help="All boost versions")
     ns = parser.parse_args(args)
 
     logging.basicConfig(format="[%(levelname)s] %(message)s")
@@ -445,6 +627,7 @@ def main(args=None) -> int:
 
     if not ns.tmppath:
         ns.tmppath = Path(tempfile.gettempdir())
+    ns.tmppath = Path(ns.tmppath)
     print(f"Temporary folder is {ns.tmppath}")
     if not ns.outputdir:
         ns.outputdir = Path("dependencies")
@@ -452,14 +635,27 @@ def main(args=None) -> int:
 
     ns.outputdir.mkdir(exist_ok=True)
 
-    git_update_done = False
+    cache = BoostScanCache(None if ns.no_cache else (ns.cache or ns.tmppath / "boost-dependencies-cache.json"))
+    worktrees = ns.worktrees
 
-    if ns.boost_version is None:
+    if ns.boost_versions is None:
         conan_data = yaml.safe_load(Path("conandata.yml").open())
         boost_versions = list(conan_data["sources"].keys())
     else:
-        boost_versions = [ns.boost_version]
+        boost_versions = ns.boost_versions
+
+    executor = ProcessPoolExecutor(max_workers=max(1, ns.jobs))
+    try:
+        return _create_dependency_files(ns, boost_versions, cache, worktrees, executor)
+    finally:
+        executor.shutdown()
+
 
+def _create_dependency_files(ns, boost_versions: List[str], cache: BoostScanCache, worktrees: bool,
+                             executor: ProcessPoolExecutor) -> int:
+    git_update_done = False
+    main_path = ns.tmppath / "boost"
+    builders = []
     for boost_version in boost_versions:
         print(f"Starting {boost_version}")
         boost_collector = BoostDependencyBuilder(
@@ -469,21 +665,49 @@ def main(args=None) -> int:
             outputdir=ns.outputdir,
             tmppath=ns.tmppath,
             unsafe=ns.unsafe,
+            boost_path=ns.tmppath / "boost-worktrees" / f"boost-{boost_version}" if worktrees else None,
+            cache=cache,
+            boostdep=builders[0]._boostdep if builders else None,
         )
 
-        if not ns.git_update and not boost_collector.boost_path.exists():
+        if not ns.git_update and not main_path.exists():
             log.error("Boost directory does not exist. Re-execute this script with -U to run 'git update'.")
             return 1
 
         if ns.git_update and not git_update_done:
-            boost_collector.do_git_update()
+            if not worktrees:
+                boost_collector.do_git_update()
+            elif not main_path.exists():
+                boost_collector.do_git_shallow_clone()
             git_update_done = True
 
-        boost_collector.do_git_submodule_update()
-
-        boost_collector.do_install_boostdep()
-
-        boost_collector.do_create_dependency_file()
+        if not worktrees:
+            boost_collector.do_git_submodule_update()
+
+            boost_collector.do_install_boostdep()
+
+            run_scans(executor, cache, boost_collector.pending_boostdep_queries())
+            run_scans(executor, cache, boost_collector.pending_scans())
+            boost_collector.do_create_dependency_file()
+            cache.save()
+            continue
+
+        # Fetching tags and adding worktrees modify the main clone: this part is done serially
+        boost_collector.do_git_worktree_update(main_path)
+        if not builders:
+            boost_collector.do_install_boostdep()
+        builders.append(boost_collector)
+
+    if builders:
+        list(executor.map(_update_worktree, builders))
+        for builder in builders[1:]:
+            builder._boostdep = builders[0]._boostdep
+        # Every scan of every version is known before running them, so unchanged libraries are scanned once
+        run_scans(executor, cache, [query for builder in builders for query in builder.pending_boostdep_queries()])
+        run_scans(executor, cache, [scan for builder in builders for scan in builder.pending_scans()])
+        cache.save()
+        for builder in builders:
+            builder.do_create_dependency_file()
     return 0
 
 
@@ -3,6 +3,8 @@ from conan.errors import ConanException
 from conan.tools.build import can_run
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.files import chdir
+from io import StringIO
+import os
 
 
 class TestPackageConan(ConanFile):
@@ -46,6 +48,9 @@ class TestPackageConan(ConanFile):
         tc.cache_variables["WITH_STACKTRACE_ADDR2LINE"] = self.dependencies["boost"].conf_info.get("user.boost:stacktrace_addr2line_available")
         tc.cache_variables["WITH_STACKTRACE_BACKTRACE"] = self._boost_option("with_stacktrace_backtrace", False)
         tc.cache_variables["WITH_URL"] = not self._boost_option("without_url", True)
+        # Only the headers of the requested components are packaged with headers_subset
+        tc.cache_variables["WITH_LAMBDA"] = not self._boost_option("headers_subset", False) or \
+            "lambda" in str(self._boost_option("components", "")).replace(" ", "").split(",")
         if self.dependencies["boost"].options.namespace != 'boost' and not self.dependencies["boost"].options.namespace_alias:
             tc.cache_variables['BOOST_NAMESPACE'] = self.dependencies["boost"].options.namespace
         tc.generate()
@@ -70,3 +75,62 @@ class TestPackageConan(ConanFile):
             # non-Windows platforms, while still retaining the correct behaviour.
             env = "conanrun" if self.settings.os == "Windows" else "conanbuild"
             self.run(f"ctest --output-on-failure -C {self.settings.build_type}", env=env)
+        if self._boost_option("unity_build", False):
+            self._check_unity_build_symbols()
+
+    @staticmethod
+    def _is_elf_shared_library(library):
+        with open(library, "rb") as f:
+            header = f.read(18)
+        # ELF magic, then e_type ET_DYN (16 bits, in the byte order given by EI_DATA)
+        if len(header) < 18 or header[:4] != b"\x7fELF":
+            return False
+        return int.from_bytes(header[16:18], "little" if header[5] == 1 else "big") == 3
+
+    def _exported_symbols(self, library):
+        output = StringIO()
+        # The exported symbols of an ELF shared library are its dynamic symbols, the symbol table of
+        # static archives and Mach-O libraries is read as is
+        dynamic = "-D" if self._is_elf_shared_library(library) else ""
+        self.run(f'nm -g --defined-only -P {dynamic} "{library}"', stdout=output)
+        symbols = set()
+        for line in output.getvalue().splitlines():
+            fields = line.split()
+            # Skip the archive members and the weak/unique symbols (inline functions and templates,
+            # emitted or not depending on what each translation unit uses)
+            if len(fields) >= 2 and len(fields[1]) == 1 and fields[1] not in "WwVvu":
+                symbols.add(fields[0])
+        return symbols
+
+    def _check_unity_build_symbols(self):
+        # unity_build is not part of the package id: its libraries must export exactly the same symbols as a
+        # regular build, e.g. -c user.boost:abi_reference_package=<package folder of a regular build>
+        reference = self.conf.get("user.boost:abi_reference_package")
+        if not reference:
+            self.output.info("Set user.boost:abi_reference_package to compare the symbols of the unity build with a regular build")
+            return
+        if self.settings.os == "Windows":
+            self.output.info("Comparing the exported symbols needs nm, skipped on Windows")
+            return
+        libdir = os.path.join(self.dependencies["boost"].package_folder, "lib")
+        reference_libdir = os.path.join(reference, "lib")
+        if not os.path.isdir(reference_libdir):
+            raise ConanException(f"user.boost:abi_reference_package: {reference_libdir} not found, "
+                                 "it must be the package folder of a boost build without unity_build")
+        differences = []
+        for name in sorted(os.listdir(libdir)):
+            library = os.path.join(libdir, name)
+            if os.path.islink(library) or not name.endswith((".a", ".so", ".dylib")) and ".so." not in name:
+                continue
+            if not os.path.isfile(os.path.join(reference_libdir, name)):
+                differences.append(f"{name}: missing from {reference_libdir}")
+                continue
+            symbols = self._exported_symbols(library)
+            reference_symbols = self._exported_symbols(os.path.join(reference_libdir, name))
+            for symbol in sorted(reference_symbols - symbols)[:10]:
+                differences.append(f"{name}: missing {symbol}")
+            for symbol in sorted(symbols - reference_symbols)[:10]:
+                differences.append(f"{name}: additional {symbol}")
+            self.output.info(f"{name}: {len(symbols)} exported symbols, {len(reference_symbols)} in the reference")
+        if differences:
+            raise ConanException("The unity build does not export the same symbols as the reference build:\n" + "\n".join(differences))
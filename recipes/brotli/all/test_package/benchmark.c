@@ -0,0 +1,140 @@
+/*
+ * Throughput benchmark of the test_package, only run when enabled by the conf (see conanfile.py).
+ * Compresses and decompresses a deterministic corpus with a few settings and prints one JSON
+ * result per setting. Usage: benchmark [size in MiB] [iterations]
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <brotli/decode.h>
+#include <brotli/encode.h>
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+static double now(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+/* 32-bit LCG: the corpus is identical on every platform */
+static unsigned long next_random(unsigned long *state) {
+    *state = (*state * 1103515245UL + 12345UL) & 0xFFFFFFFFUL;
+    return *state >> 8;
+}
+
+/* Log-like text lines with pseudo-random fields, compressible like real text */
+static void fill_corpus(unsigned char *buffer, size_t size) {
+    static const char *const methods[] = {"GET", "GET", "GET", "POST", "PUT", "DELETE"};
+    static const char *const paths[] = {"/", "/index.html", "/api/v1/items", "/api/v1/users", "/static/app.js", "/health"};
+    static const char *const statuses[] = {"200", "200", "200", "304", "404", "500"};
+    unsigned long state = 42;
+    size_t offset = 0;
+    char line[256];
+    while (offset < size) {
+        unsigned long hour = next_random(&state) % 24, minute = next_random(&state) % 60, second = next_random(&state) % 60;
+        const char *method = methods[next_random(&state) % 6];
+        const char *path = paths[next_random(&state) % 6];
+        unsigned long id = next_random(&state) % 100000;
+        const char *status = statuses[next_random(&state) % 6];
+        unsigned long bytes = next_random(&state) % 65536;
+        size_t length = (size_t)sprintf(line, "2024-01-01T%02lu:%02lu:%02lu %s %s?id=%lu status=%s bytes=%lu\n",
+                                        hour, minute, second, method, path, id, status, bytes);
+        if (length > size - offset) {
+            length = size - offset;
+        }
+        memcpy(buffer + offset, line, length);
+        offset += length;
+    }
+}
+
+struct mode {
+    int level;
+    int threads;
+};
+
+static const struct mode modes[] = {{1, 1}, {5, 1}, {9, 1}};
+
+static size_t compressed_capacity(size_t size) {
+    return BrotliEncoderMaxCompressedSize(size);
+}
+
+static size_t compress_buffer(const struct mode *mode, const unsigned char *input, size_t size, unsigned char *output, size_t capacity) {
+    size_t output_size = capacity;
+    return BrotliEncoderCompress(mode->level, BROTLI_DEFAULT_WINDOW, BROTLI_MODE_TEXT, size, input, &output_size, output) ? output_size : 0;
+}
+
+static size_t decompress_buffer(const unsigned char *input, size_t size, unsigned char *output, size_t capacity) {
+    size_t output_size = capacity;
+    return BrotliDecoderDecompress(size, input, &output_size, output) == BROTLI_DECODER_RESULT_SUCCESS ? output_size : 0;
+}
+
+int main(int argc, char **argv) {
+    size_t size = (size_t)(argc > 1 ? atoi(argv[1]) : 16) << 20;
+    int iterations = argc > 2 ? atoi(argv[2]) : 3;
+    size_t capacity = compressed_capacity(size);
+    unsigned char *input = (unsigned char *)malloc(size);
+    unsigned char *compressed = (unsigned char *)malloc(capacity);
+    unsigned char *output = (unsigned char *)malloc(size);
+    size_t mode;
+
+    if (!input || !compressed || !output || iterations < 1) {
+        return EXIT_FAILURE;
+    }
+    fill_corpus(input, size);
+
+    for (mode = 0; mode < sizeof(modes) / sizeof(modes[0]); ++mode) {
+        double best_compress = 1e30, best_decompress = 1e30;
+        size_t compressed_size = 0, output_size = 0;
+        int i;
+        for (i = 0; i < iterations; ++i) {
+            double start = now(), elapsed;
+            compressed_size = compress_buffer(&modes[mode], input, size, compressed, capacity);
+            elapsed = now() - start;
+            if (compressed_size == 0) {
+                fprintf(stderr, "brotli: compression failed\n");
+                return EXIT_FAILURE;
+            }
+            if (elapsed < best_compress) {
+                best_compress = elapsed;
+            }
+            memset(output, 0, size);
+            start = now();
+            output_size = decompress_buffer(compressed, compressed_size, output, size);
+            elapsed = now() - start;
+            if (elapsed < best_decompress) {
+                best_decompress = elapsed;
+            }
+            if (output_size != size || memcmp(input, output, size) != 0) {
+                fprintf(stderr, "brotli: round trip mismatch\n");
+                return EXIT_FAILURE;
+            }
+        }
+        printf("{\"library\": \"brotli\", \"level\": %d, \"threads\": %d, \"input_bytes\": %lu, \"compressed_bytes\": %lu, "
+               "\"ratio\": %.4f, \"compress_mb_s\": %.2f, \"decompress_mb_s\": %.2f, \"iterations\": %d}\n",
+               modes[mode].level, modes[mode].threads, (unsigned long)size, (unsigned long)compressed_size,
+               (double)size / (double)compressed_size, (double)size / 1e6 / best_compress,
+               (double)size / 1e6 / best_decompress, iterations);
+    }
+
+    free(input);
+    free(compressed);
+    free(output);
+    return EXIT_SUCCESS;
+}
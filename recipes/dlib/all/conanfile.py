@@ -32,6 +32,7 @@ class DlibConan(ConanFile):
         "with_sse4": [True, False, "auto"],
         "with_avx": [True, False, "auto"],
         "with_openblas": [True, False],
+        "openblas_use_openmp": [True, False],
     }
     default_options = {
         "shared": False,
@@ -45,6 +46,7 @@ class DlibConan(ConanFile):
         "with_sse4": "auto",
         "with_avx": "auto",
         "with_openblas": True,
+        "openblas_use_openmp": False,
     }
 
     @property
@@ -85,6 +87,10 @@ class DlibConan(ConanFile):
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if not self.options.with_openblas:
+            self.options.rm_safe("openblas_use_openmp")
+        elif self.options.openblas_use_openmp:
+            self.options["openblas"].use_openmp = True
 
     def layout(self):
         cmake_layout(self, src_folder="src")
@@ -113,6 +119,8 @@ class DlibConan(ConanFile):
             )
         if is_msvc(self) and self.options.shared:
             raise ConanInvalidConfiguration(f"{self.ref} does not support shared on Windows. See https://github.com/davisking/dlib/issues/1483.")
+        if self.options.get_safe("openblas_use_openmp") and not self.dependencies["openblas"].options.use_openmp:
+            raise ConanInvalidConfiguration(f"{self.ref} option openblas_use_openmp=True requires openblas/*:use_openmp=True")
 
     def source(self):
         get(self, **self.conan_data["sources"][self.version], strip_root=True)
@@ -21,14 +21,21 @@ class FaissConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        "openblas_use_openmp": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "openblas_use_openmp": False,
     }
 
     implements = ["auto_shared_fpic"]
 
+    def configure(self):
+        if self.options.openblas_use_openmp:
+            # faiss parallelizes with OpenMP too: both then share one thread pool instead of oversubscribing the cores
+            self.options["openblas"].use_openmp = True
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
@@ -45,6 +52,8 @@ class FaissConan(ConanFile):
         if self.settings.compiler == "apple-clang":
             raise ConanInvalidConfiguration("OpenMP support is required, which is not "
                                             "available in Apple Clang")
+        if self.options.openblas_use_openmp and not self.dependencies["openblas"].options.use_openmp:
+            raise ConanInvalidConfiguration("faiss/*:openblas_use_openmp=True requires openblas/*:use_openmp=True")
 
     def source(self):
         get(self, **self.conan_data["sources"][self.version], strip_root=True)
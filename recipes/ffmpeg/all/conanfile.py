@@ -41,6 +41,10 @@ class FFMpegConan(ConanFile):
         "postproc": [True, False],
         "avfilter": [True, False],
         "with_asm": [True, False],
+        "threads": ["auto", "pthreads", "w32threads", False],
+        "lto": [True, False],
+        "cpu": [None, "ANY"],
+        "runtime_cpudetect": [True, False],
         "with_zlib": [True, False],
         "with_bzip2": [True, False],
         "with_lzma": [True, False],
@@ -70,6 +74,8 @@ class FFMpegConan(ConanFile):
         "with_vaapi": [True, False],
         "with_vdpau": [True, False],
         "with_vulkan": [True, False],
+        "with_nvcodec": [True, False],
+        "with_opencl": [True, False],
         "with_whisper": [True, False],
         "with_xcb": [True, False],
         "with_soxr": [True, False],
@@ -133,6 +139,10 @@ class FFMpegConan(ConanFile):
         "postproc": True,
         "avfilter": True,
         "with_asm": True,
+        "threads": "auto",
+        "lto": False,
+        "cpu": None,
+        "runtime_cpudetect": True,
         "with_zlib": True,
         "with_bzip2": True,
         "with_lzma": True,
@@ -162,6 +172,8 @@ class FFMpegConan(ConanFile):
         "with_vaapi": True,
         "with_vdpau": True,
         "with_vulkan": False,
+        "with_nvcodec": False,
+        "with_opencl": False,
         "with_whisper": False,
         "with_xcb": True,
         "with_soxr": False,
@@ -259,8 +271,16 @@ class FFMpegConan(ConanFile):
             "with_mediacodec": ["with_jni"],
             "with_xlib": ["avdevice"],
             "with_whisper": ["avfilter"],
+            "with_nvcodec": ["avcodec"],
         }
 
+    @property
+    def _threads(self):
+        if self.options.threads == "auto":
+            # the threading backend picked by configure when none is requested
+            return "w32threads" if self.settings.os == "Windows" else "pthreads"
+        return str(self.options.threads)
+
     @property
     def _version_supports_libsvtav1(self):
         return Version(self.version) >= "5.1.0"
@@ -294,6 +314,12 @@ class FFMpegConan(ConanFile):
             del self.options.with_pulse
             del self.options.with_xlib
             del self.options.with_libdrm
+        if self.settings.os not in ["Linux", "Windows"]:
+            # NVENC, NVDEC and CUVID are only available with the NVIDIA drivers of these systems
+            del self.options.with_nvcodec
+        if is_apple_os(self):
+            # OpenCL is deprecated there, and not provided by opencl-icd-loader
+            del self.options.with_opencl
         if self.settings.os != "Macos":
             del self.options.with_appkit
         if self.settings.os not in ["Macos", "iOS", "tvOS"]:
@@ -384,6 +410,14 @@ class FFMpegConan(ConanFile):
             self.requires("vdpau/system")
         if self.options.get_safe("with_vulkan"):
             self.requires("vulkan-loader/1.3.243.0")
+        if self.options.get_safe("with_nvcodec"):
+            # Only headers: the CUDA driver and the NVIDIA codec libraries are loaded at runtime
+            if Version(self.version) >= "5.0":
+                self.requires("nv-codec-headers/12.1.14.0")
+            else:
+                self.requires("nv-codec-headers/11.1.5.1")
+        if self.options.get_safe("with_opencl"):
+            self.requires("opencl-icd-loader/2023.12.14")
         if self.options.get_safe("with_libsvtav1"):
             self.requires("libsvtav1/2.1.0")
         if self.options.with_libaom:
@@ -412,10 +446,20 @@ class FFMpegConan(ConanFile):
                 raise ConanInvalidConfiguration("FFmpeg '{}' option requires '{}' option to be enabled".format(
                     dependency, "' or '".join(features)))
 
+        if self.options.threads == "w32threads" and self.settings.os != "Windows":
+            raise ConanInvalidConfiguration("FFmpeg option threads=w32threads is only available on Windows")
+        if self.options.threads == "pthreads" and is_msvc(self):
+            raise ConanInvalidConfiguration("FFmpeg option threads=pthreads is not supported with msvc, use threads=w32threads")
+
         if Version(self.version) >= "6.1" and conan_version.major == 1 and is_msvc(self) and self.options.shared:
             # Linking fails with "Argument list too long" for some reason on Conan v1
             raise ConanInvalidConfiguration("MSVC shared build is not supported for Conan v1")
 
+    def package_id(self):
+        # Same binary whether the default threading backend of the platform is requested explicitly or not, see _threads
+        if self.info.options.threads == "auto":
+            self.info.options.threads = "w32threads" if self.info.settings.os == "Windows" else "pthreads"
+
     def build_requirements(self):
         if self.settings.arch in ("x86", "x86_64"):
             if Version(self.version) >= "7.0":
@@ -539,6 +583,10 @@ class FFMpegConan(ConanFile):
             "--disable-doc",
             opt_enable_disable("cross-compile", cross_building(self)),
             opt_enable_disable("asm", self.options.with_asm),
+            opt_enable_disable("runtime-cpudetect", self.options.runtime_cpudetect),
+            opt_enable_disable("lto", self.options.lto),
+            opt_enable_disable("pthreads", self._threads == "pthreads"),
+            opt_enable_disable("w32threads", self._threads == "w32threads"),
             # Libraries
             opt_enable_disable("shared", self.options.shared),
             opt_enable_disable("static", not self.options.shared),
@@ -595,8 +643,12 @@ class FFMpegConan(ConanFile):
             opt_enable_disable("jni", self.options.get_safe("with_jni")),
             opt_enable_disable("mediacodec", self.options.get_safe("with_mediacodec")),
             opt_enable_disable("xlib", self.options.get_safe("with_xlib")),
-            "--disable-cuda",  # FIXME: CUDA support
-            "--disable-cuvid",  # FIXME: CUVID support
+            opt_enable_disable("ffnvcodec", self.options.get_safe("with_nvcodec")),
+            opt_enable_disable("cuda", self.options.get_safe("with_nvcodec")),
+            opt_enable_disable("cuvid", self.options.get_safe("with_nvcodec")),
+            opt_enable_disable("nvdec", self.options.get_safe("with_nvcodec")),
+            opt_enable_disable("nvenc", self.options.get_safe("with_nvcodec")),
+            opt_enable_disable("opencl", self.options.get_safe("with_opencl")),
             # Licenses
             opt_enable_disable("nonfree", self.options.get_safe("with_libfdk_aac") or (self.options.with_ssl and (
                 self.options.with_libx264 or self.options.with_libx265 or self.options.get_safe("postproc")))),
@@ -682,6 +734,12 @@ class FFMpegConan(ConanFile):
             # relocatable shared libs
             args.append("--install-name-dir=@rpath")
         args.append(f"--arch={self._target_arch}")
+        if self.options.cpu:
+            # baseline of the generated code (-march/-mcpu), e.g. "haswell", "znver3" or "cortex-a72"
+            args.append(f"--cpu={self.options.cpu}")
+        if self.options.lto and not self.options.shared and self.settings.compiler == "gcc":
+            # keep regular object code next to the GIMPLE bytecode, so that consumers can link without -flto
+            tc.extra_cflags.append("-ffat-lto-objects")
         if self.settings.build_type == "Debug":
             args.extend([
                 "--disable-optimizations",
@@ -775,6 +833,7 @@ class FFMpegConan(ConanFile):
         deps = PkgConfigDeps(self)
         deps.set_property("whisper-cpp", "pkg_config_name", "whisper")
         deps.set_property("openapv", "pkg_config_name", "oapv")
+        deps.set_property("opencl-icd-loader", "pkg_config_name", "OpenCL")
         deps.generate()
 
         if self.options.with_ssl == "openssl":
@@ -905,6 +964,9 @@ class FFMpegConan(ConanFile):
             if self.options.avdevice:
                 avdevice.system_libs = ["ole32", "psapi", "strmiids", "uuid", "oleaut32", "shlwapi", "gdi32", "vfw32"]
             avutil.system_libs = ["user32", "bcrypt"]
+            if self._threads == "pthreads":
+                # winpthreads of MinGW
+                avutil.system_libs.append("pthread")
             avformat.system_libs = ["secur32"]
         elif is_apple_os(self):
             if self.options.avdevice:
@@ -1026,3 +1088,17 @@ class FFMpegConan(ConanFile):
 
         if self.options.get_safe("with_vulkan"):
             avutil.requires.append("vulkan-loader::vulkan-loader")
+
+        if self.options.get_safe("with_nvcodec"):
+            # hwcontext_cuda in avutil, nvenc, nvdec and cuvid in avcodec
+            avutil.requires.append("nv-codec-headers::nv-codec-headers")
+            avcodec.requires.append("nv-codec-headers::nv-codec-headers")
+
+        if self.options.get_safe("with_opencl"):
+            # hwcontext_opencl in avutil, OpenCL filters in avfilter
+            avutil.requires.append("opencl-icd-loader::opencl-icd-loader")
+
+        if self.options.lto and not self.options.shared and self.settings.compiler in ("clang", "apple-clang"):
+            # the static libraries contain LLVM bitcode, which only an LTO link can consume
+            avutil.exelinkflags.append("-flto")
+            avutil.sharedlinkflags.append("-flto")
@@ -0,0 +1,310 @@
+/*
+ * Software codec benchmark of the test_package, only run when enabled by the conf (see conanfile.py).
+ * Renders a CIF video with the testsrc filter (or synthetic frames when avfilter is not available),
+ * then measures encoding it with the native MPEG-4 part 2 encoder, decoding it, and decoding plus
+ * re-encoding it (transcoding), in frames per second. Prints one JSON line with a single codec
+ * thread and one with the thread count picked by FFmpeg, which depends on the threading backend.
+ * No hardware device is used. Usage: benchmark [frames] [iterations]
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <libavcodec/avcodec.h>
+#include <libavutil/avutil.h>
+#include <libavutil/cpu.h>
+#include <libavutil/frame.h>
+#ifdef HAVE_FFMPEG_AVFILTER
+#include <libavfilter/avfilter.h>
+#include <libavfilter/buffersink.h>
+#endif
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+#define WIDTH 352
+#define HEIGHT 288
+
+static double now(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+#ifdef HAVE_FFMPEG_AVFILTER
+/* testsrc -> format=yuv420p -> buffersink, the equivalent of -f lavfi -i testsrc=size=cif:rate=25 */
+static int testsrc_frames(AVFrame **frames, int count) {
+    const AVFilter *testsrc = avfilter_get_by_name("testsrc");
+    const AVFilter *format = avfilter_get_by_name("format");
+    const AVFilter *buffersink = avfilter_get_by_name("buffersink");
+    AVFilterGraph *graph = avfilter_graph_alloc();
+    AVFilterContext *source_context = NULL, *format_context = NULL, *sink_context = NULL;
+    int i = 0;
+
+    if (graph != NULL && testsrc != NULL && format != NULL && buffersink != NULL &&
+        avfilter_graph_create_filter(&source_context, testsrc, "source", "size=352x288:rate=25", NULL, graph) >= 0 &&
+        avfilter_graph_create_filter(&format_context, format, "format", "pix_fmts=yuv420p", NULL, graph) >= 0 &&
+        avfilter_graph_create_filter(&sink_context, buffersink, "sink", NULL, NULL, graph) >= 0 &&
+        avfilter_link(source_context, 0, format_context, 0) >= 0 && avfilter_link(format_context, 0, sink_context, 0) >= 0 &&
+        avfilter_graph_config(graph, NULL) >= 0) {
+        for (; i < count; ++i) {
+            frames[i] = av_frame_alloc();
+            if (frames[i] == NULL || av_buffersink_get_frame(sink_context, frames[i]) < 0) {
+                break;
+            }
+            frames[i]->pts = i;
+        }
+    }
+    avfilter_graph_free(&graph);
+    return i == count;
+}
+#endif
+
+/* Moving gradients with some texture, so that the encoder has motion to search */
+static int synthetic_frames(AVFrame **frames, int count) {
+    int i, x, y;
+    for (i = 0; i < count; ++i) {
+        AVFrame *frame = frames[i] = av_frame_alloc();
+        if (frame == NULL) {
+            return 0;
+        }
+        frame->format = AV_PIX_FMT_YUV420P;
+        frame->width = WIDTH;
+        frame->height = HEIGHT;
+        frame->pts = i;
+        if (av_frame_get_buffer(frame, 0) < 0) {
+            return 0;
+        }
+        for (y = 0; y < HEIGHT; ++y) {
+            for (x = 0; x < WIDTH; ++x) {
+                frame->data[0][y * frame->linesize[0] + x] = (uint8_t)(x + y + i * 3 + ((x * y) >> 7));
+            }
+        }
+        for (y = 0; y < HEIGHT / 2; ++y) {
+            for (x = 0; x < WIDTH / 2; ++x) {
+                frame->data[1][y * frame->linesize[1] + x] = (uint8_t)(128 + y + i * 2);
+                frame->data[2][y * frame->linesize[2] + x] = (uint8_t)(64 + x + i * 5);
+            }
+        }
+    }
+    return 1;
+}
+
+/* thread_count 0 lets FFmpeg pick the number of threads */
+static AVCodecContext *open_encoder(int thread_count) {
+    const AVCodec *codec = avcodec_find_encoder(AV_CODEC_ID_MPEG4);
+    AVCodecContext *context = codec ? avcodec_alloc_context3(codec) : NULL;
+    if (context == NULL) {
+        return NULL;
+    }
+    context->width = WIDTH;
+    context->height = HEIGHT;
+    context->pix_fmt = AV_PIX_FMT_YUV420P;
+    context->time_base = (AVRational){1, 25};
+    context->bit_rate = 1000000;
+    context->gop_size = 25;
+    context->max_b_frames = 0;
+    context->thread_count = thread_count;
+    if (avcodec_open2(context, codec, NULL) < 0) {
+        avcodec_free_context(&context);
+    }
+    return context;
+}
+
+static AVCodecContext *open_decoder(int thread_count) {
+    const AVCodec *codec = avcodec_find_decoder(AV_CODEC_ID_MPEG4);
+    AVCodecContext *context = codec ? avcodec_alloc_context3(codec) : NULL;
+    if (context == NULL) {
+        return NULL;
+    }
+    context->thread_count = thread_count;
+    if (avcodec_open2(context, codec, NULL) < 0) {
+        avcodec_free_context(&context);
+    }
+    return context;
+}
+
+/* Sends a frame (NULL to flush) and keeps the packets when packets is not NULL. Returns the number of packets or -1 */
+static int encode(AVCodecContext *encoder, const AVFrame *frame, AVPacket *packet, AVPacket **packets, int count) {
+    int result = avcodec_send_frame(encoder, frame);
+    while (result >= 0) {
+        result = avcodec_receive_packet(encoder, packet);
+        if (result == AVERROR(EAGAIN) || result == AVERROR_EOF) {
+            return count;
+        } else if (result < 0) {
+            break;
+        }
+        if (packets != NULL) {
+            av_packet_free(&packets[count]);
+            packets[count] = av_packet_clone(packet);
+        }
+        ++count;
+        av_packet_unref(packet);
+    }
+    return -1;
+}
+
+/* Encodes all the frames into packets. Returns the number of packets or -1 */
+static int encode_frames(AVCodecContext *encoder, AVFrame **frames, int frame_count, AVPacket **packets) {
+    AVPacket *packet = av_packet_alloc();
+    int i, count = packet == NULL ? -1 : 0;
+    for (i = 0; i <= frame_count && count >= 0; ++i) {
+        /* the last iteration flushes the encoder */
+        count = encode(encoder, i < frame_count ? frames[i] : NULL, packet, packets, count);
+    }
+    av_packet_free(&packet);
+    return count;
+}
+
+/* Decodes the packets, and re-encodes the frames if encoder is not NULL. Returns the number of decoded frames or -1 */
+static int transcode(AVPacket **packets, int packet_count, int thread_count, AVCodecContext *encoder) {
+    AVCodecContext *decoder = open_decoder(thread_count);
+    AVFrame *frame = av_frame_alloc();
+    AVPacket *packet = av_packet_alloc();
+    int i, result = 0, frames = 0;
+
+    if (decoder == NULL || frame == NULL || packet == NULL) {
+        frames = -1;
+    }
+    for (i = 0; frames >= 0 && i <= packet_count; ++i) {
+        /* the last iteration flushes the decoder */
+        result = avcodec_send_packet(decoder, i < packet_count ? packets[i] : NULL);
+        while (result >= 0) {
+            result = avcodec_receive_frame(decoder, frame);
+            if (result == AVERROR(EAGAIN) || result == AVERROR_EOF) {
+                break;
+            } else if (result < 0) {
+                frames = -1;
+                break;
+            }
+            ++frames;
+            if (encoder != NULL && encode(encoder, frame, packet, NULL, 0) < 0) {
+                frames = -1;
+            }
+            av_frame_unref(frame);
+        }
+    }
+    if (frames >= 0 && encoder != NULL && encode(encoder, NULL, packet, NULL, 0) < 0) {
+        frames = -1;
+    }
+    avcodec_free_context(&decoder);
+    av_frame_free(&frame);
+    av_packet_free(&packet);
+    return frames;
+}
+
+int main(int argc, char **argv) {
+    static const int thread_counts[] = {1, 0};
+    int frame_count = argc > 1 ? atoi(argv[1]) : 100;
+    int iterations = argc > 2 ? atoi(argv[2]) : 3;
+    const char *source = "synthetic";
+    AVFrame **frames = NULL;
+    AVPacket **packets = NULL;
+    AVCodecContext *encoder = open_encoder(1);
+    int i, t, iteration, packet_count = 0, result = EXIT_FAILURE;
+
+    if (encoder == NULL) {
+        /* e.g. built with disable_all_encoders */
+        printf("benchmark: the mpeg4 encoder is not available, skipped\n");
+        return EXIT_SUCCESS;
+    }
+    avcodec_free_context(&encoder);
+    if (frame_count < 1 || iterations < 1) {
+        return EXIT_FAILURE;
+    }
+    frames = (AVFrame **)calloc((size_t)frame_count, sizeof(AVFrame *));
+    packets = (AVPacket **)calloc((size_t)frame_count, sizeof(AVPacket *));
+    if (frames == NULL || packets == NULL) {
+        goto end;
+    }
+
+    /* the input of the measurements, rendered once */
+#ifdef HAVE_FFMPEG_AVFILTER
+    if (testsrc_frames(frames, frame_count)) {
+        source = "testsrc";
+    } else {
+        for (i = 0; i < frame_count; ++i) {
+            av_frame_free(&frames[i]);
+        }
+    }
+#endif
+    if (frames[0] == NULL && !synthetic_frames(frames, frame_count)) {
+        goto end;
+    }
+
+    for (t = 0; t < (int)(sizeof(thread_counts) / sizeof(thread_counts[0])); ++t) {
+        double best_encode = 0.0, best_decode = 0.0, best_transcode = 0.0;
+        int threads = 0;
+        for (iteration = 0; iteration < iterations; ++iteration) {
+            double start, encode_time, decode_time, transcode_time;
+            int decoded;
+
+            start = now();
+            encoder = open_encoder(thread_counts[t]);
+            packet_count = encoder == NULL ? -1 : encode_frames(encoder, frames, frame_count, packets);
+            encode_time = now() - start;
+            if (packet_count != frame_count) {
+                fprintf(stderr, "benchmark: encoding failed\n");
+                goto end;
+            }
+            threads = encoder->thread_count;
+            avcodec_free_context(&encoder);
+
+            start = now();
+            decoded = transcode(packets, packet_count, thread_counts[t], NULL);
+            decode_time = now() - start;
+
+            start = now();
+            encoder = open_encoder(thread_counts[t]);
+            if (decoded != frame_count || encoder == NULL || transcode(packets, packet_count, thread_counts[t], encoder) != frame_count) {
+                fprintf(stderr, "benchmark: decoding or transcoding failed\n");
+                goto end;
+            }
+            transcode_time = now() - start;
+            avcodec_free_context(&encoder);
+
+            if (iteration == 0 || encode_time < best_encode) {
+                best_encode = encode_time;
+            }
+            if (iteration == 0 || decode_time < best_decode) {
+                best_decode = decode_time;
+            }
+            if (iteration == 0 || transcode_time < best_transcode) {
+                best_transcode = transcode_time;
+            }
+        }
+        printf("{\"library\": \"ffmpeg\", \"version\": \"%s\", \"source\": \"%s\", \"codec\": \"mpeg4\", \"width\": %d, \"height\": %d, "
+               "\"frames\": %d, \"threads\": %d, \"cpu_count\": %d, \"cpu_flags\": %d, \"encode_fps\": %.1f, \"decode_fps\": %.1f, "
+               "\"transcode_fps\": %.1f, \"iterations\": %d}\n",
+               av_version_info(), source, WIDTH, HEIGHT, frame_count, threads, av_cpu_count(), av_get_cpu_flags(),
+               (double)frame_count / best_encode, (double)frame_count / best_decode, (double)frame_count / best_transcode, iterations);
+    }
+    result = EXIT_SUCCESS;
+
+end:
+    for (i = 0; i < frame_count; ++i) {
+        if (frames != NULL) {
+            av_frame_free(&frames[i]);
+        }
+        if (packets != NULL) {
+            av_packet_free(&packets[i]);
+        }
+    }
+    free(frames);
+    free(packets);
+    avcodec_free_context(&encoder);
+    return result;
+}
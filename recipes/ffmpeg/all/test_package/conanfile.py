@@ -1,12 +1,12 @@
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import CMake, cmake_layout
+from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 import os
 
 
 class TestPackageConan(ConanFile):
     settings = "os", "arch", "compiler", "build_type"
-    generators = "CMakeDeps", "CMakeToolchain", "VirtualRunEnv"
+    generators = "CMakeDeps", "VirtualRunEnv"
     test_type = "explicit"
 
     def layout(self):
@@ -15,6 +15,23 @@ class TestPackageConan(ConanFile):
     def requirements(self):
         self.requires(self.tested_reference_str)
 
+    def generate(self):
+        ffmpeg = self.dependencies["ffmpeg"]
+        # Hardware device types that must have been built in, checked without any device present
+        hwdevices = {
+            "with_nvcodec": "cuda",
+            "with_opencl": "opencl",
+            "with_vaapi": "vaapi",
+            "with_vdpau": "vdpau",
+            "with_vulkan": "vulkan",
+            "with_videotoolbox": "videotoolbox",
+            "with_mediacodec": "mediacodec",
+        }
+        tc = CMakeToolchain(self)
+        tc.cache_variables["FFMPEG_EXPECTED_HWDEVICES"] = ",".join(
+            hwdevice for option, hwdevice in hwdevices.items() if ffmpeg.options.get_safe(option))
+        tc.generate()
+
     def build(self):
         cmake = CMake(self)
         cmake.configure()
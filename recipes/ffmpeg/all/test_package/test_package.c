@@ -20,6 +20,41 @@
 
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+
+#ifndef EXPECTED_HWDEVICES
+#define EXPECTED_HWDEVICES ""
+#endif
+
+/* Lists the hardware device types built in, and checks that the expected ones are there.
+   This only needs the libraries, not the devices, so it can run on any machine. */
+static int check_hwdevice_types(void)
+{
+    char expected[256];
+    char *name;
+    enum AVHWDeviceType type = AV_HWDEVICE_TYPE_NONE;
+    int missing = 0;
+
+    printf("hardware device types:");
+    while ((type = av_hwdevice_iterate_types(type)) != AV_HWDEVICE_TYPE_NONE) {
+        printf(" %s", av_hwdevice_get_type_name(type));
+    }
+    printf("\n");
+
+    snprintf(expected, sizeof(expected), "%s", EXPECTED_HWDEVICES);
+    for (name = strtok(expected, ","); name != NULL; name = strtok(NULL, ",")) {
+        int found = 0;
+        type = AV_HWDEVICE_TYPE_NONE;
+        while ((type = av_hwdevice_iterate_types(type)) != AV_HWDEVICE_TYPE_NONE) {
+            found = found || strcmp(av_hwdevice_get_type_name(type), name) == 0;
+        }
+        if (!found) {
+            fprintf(stderr, "hardware device type %s is not available\n", name);
+            missing = 1;
+        }
+    }
+    return missing;
+}
 
 int main()
 {
@@ -51,5 +86,5 @@ int main()
         printf("swscale is disabled!\n");
     #endif
 
-    return EXIT_SUCCESS;
+    return check_hwdevice_types() ? EXIT_FAILURE : EXIT_SUCCESS;
 }
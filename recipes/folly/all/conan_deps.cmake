@@ -28,7 +28,9 @@ custom_find_package(Glog GLOG)
 custom_find_package(LZ4 LZ4)
 custom_find_package(LibEvent LIBEVENT REQUIRED)
 custom_find_package(LibLZMA LIBLZMA)
-custom_find_package(Libsodium LIBSODIUM)
+if (NOT CMAKE_DISABLE_FIND_PACKAGE_Libsodium)
+    custom_find_package(Libsodium LIBSODIUM)
+endif()
 custom_find_package(OpenSSL OPENSSL REQUIRED)
 custom_find_package(Snappy SNAPPY)
 custom_find_package(ZLIB ZLIB)
@@ -39,7 +41,18 @@ if (NOT MSVC)
     custom_find_package(LibDwarf LIBDWARF)
 endif()
 if (UNIX AND NOT APPLE)
-    custom_find_package(LibUring LIBURING)
+    if (NOT CMAKE_DISABLE_FIND_PACKAGE_LibUring)
+        custom_find_package(LibUring LIBURING)
+    endif()
+    if (NOT CMAKE_DISABLE_FIND_PACKAGE_LibAIO)
+        custom_find_package(LibAIO LIBAIO)
+    endif()
     custom_find_package(LibUnwind LIBUNWIND)
     custom_find_package(Libiberty LIBIBERTY)
-endif()
\ No newline at end of file
+endif()
+
+# folly-deps.cmake does not look for jemalloc, FOLLY_USE_JEMALLOC is defined by the recipe
+if (FOLLY_CONAN_WITH_JEMALLOC)
+    find_package(jemalloc REQUIRED CONFIG)
+    link_libraries(jemalloc::jemalloc)
+endif()
@@ -26,10 +26,21 @@ class FollyConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # io_uring and Linux native AIO backends of folly/experimental/io and the IoUringBackend event base
+        "with_liburing": [True, False],
+        "with_libaio": [True, False],
+        # folly::usingJEMalloc() known at compile time, and JemallocNodumpAllocator
+        "with_jemalloc": [True, False],
+        # folly/crypto (Blake2xb, LtHash)
+        "with_libsodium": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "with_liburing": True,
+        "with_libaio": False,
+        "with_jemalloc": False,
+        "with_libsodium": True,
     }
 
     @property
@@ -53,6 +64,9 @@ class FollyConan(ConanFile):
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if self.settings.os != "Linux":
+            del self.options.with_liburing
+            del self.options.with_libaio
 
     def configure(self):
         if self.options.shared:
@@ -79,13 +93,18 @@ class FollyConan(ConanFile):
         self.requires("zstd/1.5.5", transitive_libs=True)
         if not is_msvc(self):
             self.requires("libdwarf/0.9.1")
-        self.requires("libsodium/1.0.20")
+        if self.options.with_libsodium:
+            self.requires("libsodium/1.0.20")
+        if self.options.with_jemalloc:
+            self.requires("jemalloc/5.3.0", transitive_headers=True, transitive_libs=True)
         self.requires("xz_utils/[>=5.4.5 <6]")
         if self.settings.os in ["Linux", "FreeBSD"]:
             self.requires("libiberty/9.1.0")
             self.requires("libunwind/1.8.0")
-        if self.settings.os == "Linux":
+        if self.options.get_safe("with_liburing"):
             self.requires("liburing/2.6")
+        if self.options.get_safe("with_libaio"):
+            self.requires("libaio/0.3.113")
         # INFO: Folly does not support fmt 11 on MSVC: https://github.com/facebook/folly/issues/2250
         self.requires("fmt/10.2.1", transitive_headers=True, transitive_libs=True)
 
@@ -128,6 +147,10 @@ class FollyConan(ConanFile):
             required_components = ", ".join(self._required_boost_components)
             raise ConanInvalidConfiguration(f"{self.ref} requires these Boost components: {required_components}. Try with '-o boost/*:without_{required_components}=False'")
 
+        if self.options.with_jemalloc and self.dependencies["jemalloc"].options.prefix:
+            # folly calls mallocx(), nallocx() and mallctl() without prefix
+            raise ConanInvalidConfiguration(f"{self.ref} requires jemalloc without prefix, use -o 'jemalloc/*:prefix='")
+
     def source(self):
         get(self, **self.conan_data["sources"][self.version], strip_root=False)
 
@@ -171,6 +194,14 @@ class FollyConan(ConanFile):
             tc.cache_variables["BOOST_LINK_STATIC"] = not self.dependencies["boost"].options.shared
 
         tc.cache_variables["CMAKE_POLICY_DEFAULT_CMP0074"] = "NEW"  # Honor Boost_ROOT set by boost recipe
+
+        # Sources depending on these libraries are only built when folly-deps.cmake finds them
+        tc.cache_variables["CMAKE_DISABLE_FIND_PACKAGE_LibUring"] = not self.options.get_safe("with_liburing")
+        tc.cache_variables["CMAKE_DISABLE_FIND_PACKAGE_LibAIO"] = not self.options.get_safe("with_libaio")
+        tc.cache_variables["CMAKE_DISABLE_FIND_PACKAGE_Libsodium"] = not self.options.with_libsodium
+        tc.cache_variables["FOLLY_CONAN_WITH_JEMALLOC"] = self.options.with_jemalloc
+        if self.options.with_jemalloc:
+            tc.preprocessor_definitions["FOLLY_USE_JEMALLOC"] = 1
         tc.generate()
 
         deps = CMakeDeps(self)
@@ -181,6 +212,7 @@ class FollyConan(ConanFile):
         deps.set_property("gflags", "cmake_file_name", "Gflags")
         deps.set_property("glog", "cmake_file_name", "Glog")
         deps.set_property("libdwarf", "cmake_file_name", "LibDwarf")
+        deps.set_property("libaio", "cmake_file_name", "LibAIO")
         deps.set_property("libevent", "cmake_file_name", "LibEvent")
         deps.set_property("libiberty", "cmake_file_name", "Libiberty")
         deps.set_property("libsodium", "cmake_file_name", "Libsodium")
@@ -240,15 +272,22 @@ class FollyConan(ConanFile):
             "snappy::snappy",
             "zlib::zlib",
             "zstd::zstd",
-            "libsodium::libsodium",
             "xz_utils::xz_utils",
         ]
+        if self.options.with_libsodium:
+            self.cpp_info.components["libfolly"].requires.append("libsodium::libsodium")
+        if self.options.with_jemalloc:
+            self.cpp_info.components["libfolly"].requires.append("jemalloc::jemalloc")
+            self.cpp_info.components["libfolly"].defines.append("FOLLY_USE_JEMALLOC=1")
+        if self.options.get_safe("with_liburing"):
+            self.cpp_info.components["libfolly"].requires.append("liburing::liburing")
+        if self.options.get_safe("with_libaio"):
+            self.cpp_info.components["libfolly"].requires.append("libaio::libaio")
         if not is_msvc(self):
             self.cpp_info.components["libfolly"].requires.append("libdwarf::libdwarf")
         if self.settings.os in ["Linux", "FreeBSD"]:
             self.cpp_info.components["libfolly"].requires.extend(["libiberty::libiberty", "libunwind::libunwind"])
         if self.settings.os == "Linux":
-            self.cpp_info.components["libfolly"].requires.append("liburing::liburing")
             self.cpp_info.components["libfolly"].system_libs.extend(["pthread", "dl", "rt"])
             self.cpp_info.components["libfolly"].defines.extend(["FOLLY_HAVE_ELF", "FOLLY_HAVE_DWARF"])
         elif self.settings.os == "Windows":
@@ -1,12 +1,21 @@
 #include <cstdlib>
 #include <iostream>
+#include <string>
 
 #include <folly/Format.h>
 #include <folly/IPAddress.h>
+#include <folly/container/F14Map.h>
+#include <folly/memory/Malloc.h>
 
 
 int main() {
     folly::fbstring address{"127.0.0.1"};
     folly::IPAddress::validate(address);
-    return EXIT_SUCCESS;
+
+    folly::F14FastMap<std::string, int> map{{"one", 1}, {"two", 2}};
+    map["three"] = 3;
+    // F14 uses SSE2 or NEON when the target has them, jemalloc when folly was built with it
+    std::cout << "F14 vector intrinsics: " << (FOLLY_F14_VECTOR_INTRINSICS_AVAILABLE ? "yes" : "no")
+              << ", jemalloc: " << (folly::usingJEMalloc() ? "yes" : "no") << std::endl;
+    return map.size() == 3 && map.at("three") == 3 ? EXIT_SUCCESS : EXIT_FAILURE;
 }
@@ -89,6 +89,10 @@ class GoogleCloudCppConan(ConanFile):
             self.options["protobuf"].shared = True
             self.options["grpc"].shared = True
 
+    def package_id(self):
+        # the public API uses absl::optional and absl::variant, whose definition follows abseil/*:use_std
+        self.info.requires["abseil"].full_package_mode()
+
     def validate(self):
         # As-of 2022-03, google-cloud-cpp only supports "Visual Studio >= 2019",
         # and Visual Studio < 2019 is out of mainline support.
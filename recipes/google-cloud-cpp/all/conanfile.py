@@ -69,6 +69,10 @@ class GoogleCloudCppConan(ConanFile):
         self.tool_requires("grpc/<host_version>")
         self.tool_requires("protobuf/<host_version>")
 
+    def package_id(self):
+        # the public API uses absl::optional and absl::variant, whose definition follows abseil/*:use_std
+        self.info.requires["abseil"].full_package_mode()
+
     def validate(self):
         if self.settings.os == "Windows" and self.options.shared:
             raise ConanInvalidConfiguration("Fails to compile for Windows as a DLL")
@@ -2,3 +2,9 @@
 if (TARGET check_epollexclusive)
     set_target_properties(check_epollexclusive PROPERTIES LINKER_LANGUAGE CXX)
 endif()
+
+if (CONAN_GRPC_WITH_TCMALLOC)
+    find_package(gperftools REQUIRED CONFIG)
+    # every library and executable of grpc allocates through tcmalloc
+    link_libraries(gperftools::tcmalloc_minimal)
+endif()
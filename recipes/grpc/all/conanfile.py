@@ -1,4 +1,5 @@
 import os
+import re
 import yaml
 
 from conan import ConanFile
@@ -38,7 +39,12 @@ class GrpcConan(ConanFile):
         "ruby_plugin": [True, False],
         "otel_plugin": [True, False],
         "secure": [True, False],
-        "with_libsystemd": [True, False]
+        "with_libsystemd": [True, False],
+        "with_tcmalloc": [True, False],
+        "poll_strategy": [None, "epoll1", "poll"],
+        "event_engine": [None, True, False],
+        "experiments": [None, "ANY"],
+        "experiments_are_final": [True, False],
     }
     default_options = {
         "shared": False,
@@ -54,7 +60,18 @@ class GrpcConan(ConanFile):
         "ruby_plugin": True,
         "otel_plugin": False,
         "secure": False,
-        "with_libsystemd": False
+        "with_libsystemd": False,
+        "with_tcmalloc": False,
+        # Runtime defaults of the consumers, set in their run environment (GRPC_POLL_STRATEGY and GRPC_EXPERIMENTS):
+        # - the poller of the posix iomgr and EventEngine, None keeps "all" (epoll1 on Linux, then poll)
+        "poll_strategy": None,
+        # - True or False enables or disables the event_engine_client and event_engine_listener experiments,
+        #   None keeps the defaults of the version
+        "event_engine": None,
+        # - comma separated experiments, "-" disables one, e.g. "event_engine_dns,-promise_based_client_call"
+        "experiments": None,
+        # Compiles the experiments with their default values, which can no longer be changed at runtime
+        "experiments_are_final": False,
     }
 
     _target_info = None
@@ -71,6 +88,16 @@ class GrpcConan(ConanFile):
     def _supports_libsystemd(self):
         return self.settings.os in ["Linux", "FreeBSD"] and Version(self.version) >= "1.52"
 
+    @property
+    def _experiments(self):
+        experiments = []
+        if str(self.options.get_safe("event_engine")) != "None":
+            prefix = "" if self.options.event_engine else "-"
+            experiments.extend(f"{prefix}{experiment}" for experiment in ("event_engine_client", "event_engine_listener"))
+        if self.options.experiments:
+            experiments.extend(experiment.strip() for experiment in str(self.options.experiments).split(",") if experiment.strip())
+        return experiments
+
     def export(self):
         copy(self, f"target_info/grpc_{self.version}.yml", src=self.recipe_folder, dst=self.export_folder)
 
@@ -86,6 +113,13 @@ class GrpcConan(ConanFile):
             del self.options.with_libsystemd
         if Version(self.version) < "1.65.0":
             del self.options.otel_plugin
+            del self.options.event_engine
+            del self.options.experiments_are_final
+        if self.settings.os == "Windows":
+            # GRPC_POLL_STRATEGY is only read by the posix pollers
+            del self.options.poll_strategy
+            # tcmalloc does not replace the allocator of the CRT by linking it
+            del self.options.with_tcmalloc
 
     def configure(self):
         if self.options.shared:
@@ -95,6 +129,10 @@ class GrpcConan(ConanFile):
             if cross_building(self):
                 self.options["grpc"].shared = True
 
+            if self.options.get_safe("with_tcmalloc"):
+                # a single allocator for the process, not one copy per shared library
+                self.options["gperftools"].shared = True
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
@@ -122,9 +160,17 @@ class GrpcConan(ConanFile):
                 self.requires("libsystemd/255")
         if self.options.get_safe("otel_plugin"):
             self.requires("opentelemetry-cpp/1.14.2")
+        if self.options.get_safe("with_tcmalloc"):
+            self.requires("gperftools/2.15")
 
     def package_id(self):
         del self.info.options.secure
+        # only set in the run environment of the consumers
+        self.info.options.rm_safe("poll_strategy")
+        self.info.options.rm_safe("event_engine")
+        del self.info.options.experiments
+        # grpc headers expose abseil types, whose definition follows the abseil options (see absl/base/options.h)
+        self.info.requires["abseil"].full_package_mode()
 
     def validate(self):
         check_min_vs(self, "190")
@@ -144,6 +190,23 @@ class GrpcConan(ConanFile):
                 "Please, use `protobuf:shared=True`.",
             )
 
+        if self.options.get_safe("poll_strategy") == "epoll1" and self.settings.os != "Linux":
+            raise ConanInvalidConfiguration("The epoll1 poll_strategy is only available on Linux")
+
+        for experiment in self._experiments:
+            if not re.fullmatch(r"-?[a-z0-9_]+", experiment):
+                raise ConanInvalidConfiguration(f"Invalid experiment '{experiment}', expected its name, "
+                                                "with a '-' prefix to disable it")
+
+        if self.options.get_safe("experiments_are_final") and self._experiments:
+            raise ConanInvalidConfiguration("experiments and event_engine cannot be set with experiments_are_final, "
+                                            "the experiments can no longer be changed at runtime")
+
+        if self.options.shared and self.options.get_safe("with_tcmalloc") and \
+                not self.dependencies.host["gperftools"].options.shared:
+            raise ConanInvalidConfiguration("If built as shared with tcmalloc, gperftools must be shared as well. "
+                                            "Please, use `gperftools:shared=True`.")
+
         abseil_cppstd = self.dependencies.host['abseil'].info.settings.compiler.cppstd
         if abseil_cppstd != self.settings.compiler.cppstd:
             raise ConanInvalidConfiguration(f"grpc and abseil must be built with the same compiler.cppstd setting")
@@ -220,6 +283,12 @@ class GrpcConan(ConanFile):
         if Version(self.version) >= "1.62.0":
             tc.cache_variables["gRPC_DOWNLOAD_ARCHIVES"] = False
 
+        # see conan_cmake_project_include.cmake
+        tc.cache_variables["CONAN_GRPC_WITH_TCMALLOC"] = self.options.get_safe("with_tcmalloc", False)
+
+        if self.options.get_safe("experiments_are_final"):
+            tc.preprocessor_definitions["GRPC_EXPERIMENTS_ARE_FINAL"] = 1
+
         tc.generate()
 
         cmake_deps = CMakeDeps(self)
@@ -324,6 +393,7 @@ class GrpcConan(ConanFile):
             system_libs = ["m", "pthread"]
 
         libsystemd = ["libsystemd::libsystemd"] if self._supports_libsystemd and self.options.with_libsystemd else []
+        tcmalloc = ["gperftools::tcmalloc_minimal"] if self.options.get_safe("with_tcmalloc") else []
 
         targets = self.target_info['grpc_targets']
         components = {}
@@ -334,7 +404,7 @@ class GrpcConan(ConanFile):
                 continue
             components[target['name']] = {
                 "lib": target['lib'],
-                "requires": target.get('requires', []) + libsystemd,
+                "requires": target.get('requires', []) + libsystemd + tcmalloc,
                 "system_libs": system_libs,
                 "frameworks": target.get('frameworks', []),
             }
@@ -346,6 +416,10 @@ class GrpcConan(ConanFile):
         self.cpp_info.resdirs = ["res"]
         ssl_roots_file_path = os.path.join(self.package_folder, "res", "grpc", "roots.pem")
         self.runenv_info.define_path("GRPC_DEFAULT_SSL_ROOTS_FILE_PATH", ssl_roots_file_path)
+        if self.options.get_safe("poll_strategy"):
+            self.runenv_info.define("GRPC_POLL_STRATEGY", str(self.options.poll_strategy))
+        if self._experiments:
+            self.runenv_info.define("GRPC_EXPERIMENTS", ",".join(self._experiments))
 
         for component, values in self._grpc_components.items():
             target = values.get("lib")
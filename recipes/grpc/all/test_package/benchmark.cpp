@@ -0,0 +1,88 @@
+/*
+ * Unary RPC throughput of the test_package, only run when enabled by the conf (see conanfile.py).
+ * An echo server listens on a loopback port of the same process, and one client thread keeps a fixed
+ * number of unary calls of 1 KiB in flight on one channel, until the given number of calls completed.
+ * Prints one JSON result, with the GRPC_POLL_STRATEGY and GRPC_EXPERIMENTS of the run environment.
+ * Usage: benchmark [calls] [iterations]
+ */
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <memory>
+#include <string>
+
+#include "echo_server.h"
+
+static const int kConcurrency = 32;
+static const size_t kRequestSize = 1024;
+
+// Returns the duration of the calls in seconds, or a negative value if one failed
+static double Run(grpc::GenericStub& stub, const grpc::ByteBuffer& request, long calls) {
+    grpc::CompletionQueue cq;
+    long started = 0, completed = 0;
+    bool failed = false;
+    void* tag = nullptr;
+    bool ok = false;
+
+    auto start = std::chrono::steady_clock::now();
+    for (; started < kConcurrency && started < calls; ++started) {
+        (new EchoCall)->Start(stub, request, &cq);
+    }
+    while (completed < started && cq.Next(&tag, &ok)) {
+        std::unique_ptr<EchoCall> call(static_cast<EchoCall*>(tag));
+        ++completed;
+        if (!ok || !call->status.ok() || call->response.Length() != request.Length()) {
+            failed = true;
+        }
+        if (!failed && started < calls) {
+            (new EchoCall)->Start(stub, request, &cq);
+            ++started;
+        }
+    }
+    std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - start;
+    cq.Shutdown();
+    while (cq.Next(&tag, &ok)) {
+        delete static_cast<EchoCall*>(tag);
+    }
+    return failed || completed != calls ? -1.0 : elapsed.count();
+}
+
+static std::string JsonString(const char* value) {
+    return value ? "\"" + std::string(value) + "\"" : "null";
+}
+
+int main(int argc, char** argv) {
+    long calls = argc > 1 ? std::atol(argv[1]) : 20000;
+    int iterations = argc > 2 ? std::atoi(argv[2]) : 3;
+    double best = 0.0;
+
+    if (calls < 1 || iterations < 1) {
+        return EXIT_FAILURE;
+    }
+    EchoServer server;
+    if (!server.Start()) {
+        std::fprintf(stderr, "benchmark: cannot start the echo server\n");
+        return EXIT_FAILURE;
+    }
+    grpc::GenericStub stub(grpc::CreateChannel(server.Target(), grpc::InsecureChannelCredentials()));
+    grpc::ByteBuffer request = ToByteBuffer(std::string(kRequestSize, 'x'));
+
+    // connects the channel and warms up the threads of both sides
+    Run(stub, request, kConcurrency * 4);
+    for (int iteration = 0; iteration < iterations; ++iteration) {
+        double elapsed = Run(stub, request, calls);
+        if (elapsed < 0) {
+            std::fprintf(stderr, "benchmark: echo call failed\n");
+            return EXIT_FAILURE;
+        }
+        if (iteration == 0 || elapsed < best) {
+            best = elapsed;
+        }
+    }
+    std::printf("{\"library\": \"grpc\", \"version\": \"%s\", \"concurrency\": %d, \"request_size\": %zu, \"calls\": %ld, "
+                "\"rpcs_per_s\": %.0f, \"grpc_poll_strategy\": %s, \"grpc_experiments\": %s, \"iterations\": %d}\n",
+                grpc::Version().c_str(), kConcurrency, kRequestSize, calls, calls / best,
+                JsonString(std::getenv("GRPC_POLL_STRATEGY")).c_str(), JsonString(std::getenv("GRPC_EXPERIMENTS")).c_str(),
+                iterations);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,92 @@
+// Generic callback service sending back the request of any unary call, listening on a loopback port
+// chosen by the system, and the client side of the calls. Generic services and stubs work on raw bytes,
+// so no code has to be generated from a .proto file.
+#pragma once
+
+#include <grpcpp/grpcpp.h>
+#include <grpcpp/generic/async_generic_service.h>
+#include <grpcpp/generic/generic_stub.h>
+
+#include <memory>
+#include <string>
+#include <vector>
+
+static const char kEchoMethod[] = "/test_package.Echo/Call";
+
+class EchoReactor final : public grpc::ServerGenericBidiReactor {
+public:
+    EchoReactor() { StartRead(&message_); }
+
+    void OnReadDone(bool ok) override {
+        if (ok) {
+            StartWriteAndFinish(&message_, grpc::WriteOptions(), grpc::Status::OK);
+        } else {
+            Finish(grpc::Status(grpc::StatusCode::INVALID_ARGUMENT, "no request"));
+        }
+    }
+
+    void OnDone() override { delete this; }
+
+private:
+    grpc::ByteBuffer message_;
+};
+
+class EchoService final : public grpc::CallbackGenericService {
+    grpc::ServerGenericBidiReactor* CreateReactor(grpc::GenericCallbackServerContext* /*context*/) override {
+        return new EchoReactor();
+    }
+};
+
+class EchoServer {
+public:
+    bool Start() {
+        grpc::ServerBuilder builder;
+        builder.AddListeningPort("127.0.0.1:0", grpc::InsecureServerCredentials(), &port_);
+        builder.RegisterCallbackGenericService(&service_);
+        server_ = builder.BuildAndStart();
+        return server_ && port_ > 0;
+    }
+
+    std::string Target() const { return "127.0.0.1:" + std::to_string(port_); }
+
+    ~EchoServer() {
+        if (server_) {
+            server_->Shutdown();
+        }
+    }
+
+private:
+    EchoService service_;
+    std::unique_ptr<grpc::Server> server_;
+    int port_ = 0;
+};
+
+// A unary call of the echo method, whose completion is signalled on the completion queue with the call as tag
+struct EchoCall {
+    grpc::ClientContext context;
+    grpc::ByteBuffer response;
+    grpc::Status status;
+    std::unique_ptr<grpc::GenericClientAsyncResponseReader> reader;
+
+    void Start(grpc::GenericStub& stub, const grpc::ByteBuffer& request, grpc::CompletionQueue* cq) {
+        reader = stub.PrepareUnaryCall(&context, kEchoMethod, request, cq);
+        reader->StartCall();
+        reader->Finish(&response, &status, this);
+    }
+};
+
+inline grpc::ByteBuffer ToByteBuffer(const std::string& data) {
+    grpc::Slice slice(data);
+    return grpc::ByteBuffer(&slice, 1);
+}
+
+inline std::string ToString(const grpc::ByteBuffer& buffer) {
+    std::vector<grpc::Slice> slices;
+    std::string data;
+    if (buffer.Dump(&slices).ok()) {
+        for (const grpc::Slice& slice : slices) {
+            data.append(reinterpret_cast<const char*>(slice.begin()), slice.size());
+        }
+    }
+    return data;
+}
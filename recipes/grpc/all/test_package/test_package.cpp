@@ -2,8 +2,32 @@
 #include <string>
 #include <grpcpp/grpcpp.h>
 
+#include "echo_server.h"
+
 
 int main(int argc, char** argv) {
   std::cout << "gPRC version: " << grpc::Version() << "\n";
+
+  // a few unary calls to a server of the same process, on a loopback port
+  EchoServer server;
+  if (!server.Start()) {
+    std::cerr << "cannot start the echo server\n";
+    return 1;
+  }
+  auto channel = grpc::CreateChannel(server.Target(), grpc::InsecureChannelCredentials());
+  grpc::GenericStub stub(channel);
+  grpc::CompletionQueue cq;
+  for (int i = 0; i < 3; ++i) {
+    const std::string request = "echo " + std::to_string(i);
+    EchoCall call;
+    call.Start(stub, ToByteBuffer(request), &cq);
+    void* tag = nullptr;
+    bool ok = false;
+    if (!cq.Next(&tag, &ok) || !ok || tag != &call || !call.status.ok() || ToString(call.response) != request) {
+      std::cerr << "echo call failed: " << call.status.error_message() << "\n";
+      return 1;
+    }
+  }
+  std::cout << "echo calls to " << server.Target() << ": ok\n";
   return 0;
 }
@@ -1,14 +1,16 @@
 import glob
 import hashlib
+import json
 import os
 import shutil
+import sys
 
 from conan import ConanFile
-from conan.errors import ConanInvalidConfiguration
+from conan.errors import ConanException, ConanInvalidConfiguration
 from conan.tools.apple import is_apple_os
 from conan.tools.build import cross_building, stdcpp_library, check_min_cppstd
 from conan.tools.env import Environment, VirtualBuildEnv
-from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, mkdir, rename, replace_in_file, rm, rmdir, save
+from conan.tools.files import apply_conandata_patches, copy, download, export_conandata_patches, get, mkdir, rename, replace_in_file, rm, rmdir, save, unzip
 from conan.tools.gnu import Autotools, AutotoolsToolchain
 from conan.tools.layout import basic_layout
 from conan.tools.microsoft import check_min_vs, is_msvc, unix_path
@@ -35,6 +37,9 @@ class ICUConan(ConanFile):
         "dat_package_file": [None, "ANY"],
         "with_icuio": [True, False],
         "with_extras": [True, False],
+        "data_filter_locales": [None, "ANY"],
+        "data_filter_excluded_features": [None, "ANY"],
+        "data_filter_file": [None, "ANY"],
     }
     default_options = {
         "shared": False,
@@ -44,6 +49,14 @@ class ICUConan(ConanFile):
         "dat_package_file": None,
         "with_icuio": True,
         "with_extras": False,
+        # ICU data filter (https://unicode-org.github.io/icu/userguide/icu_data/buildtool.html), all of the
+        # data is packaged by default:
+        # - comma separated locales to keep, with their parents and children, e.g. "en,de,fr_CA"
+        "data_filter_locales": None,
+        # - comma separated feature categories to drop, e.g. "conversion_mappings,brkitr_dictionaries,translit"
+        "data_filter_excluded_features": None,
+        # - path to a filter file, instead of the two options above
+        "data_filter_file": None,
     }
 
     @property
@@ -64,6 +77,15 @@ class ICUConan(ConanFile):
     def _settings_build(self):
         return getattr(self, "settings_build", self.settings)
 
+    @property
+    def _with_data_filter(self):
+        return bool(self.options.data_filter_locales or self.options.data_filter_excluded_features or
+                    self.options.data_filter_file)
+
+    @staticmethod
+    def _split_list(value):
+        return sorted({item.strip() for item in str(value).split(",") if item.strip()})
+
     @property
     def _enable_icu_tools(self):
         return self.settings.os not in ["iOS", "tvOS", "watchOS", "Emscripten"]
@@ -86,6 +108,15 @@ class ICUConan(ConanFile):
         if self.options.dat_package_file:
             if not os.path.exists(str(self.options.dat_package_file)):
                 raise ConanInvalidConfiguration("Non-existent dat_package_file specified")
+            if self._with_data_filter:
+                raise ConanInvalidConfiguration("dat_package_file cannot be combined with a data filter, "
+                                                "the filter applies to the data built from source")
+        if self.options.data_filter_file:
+            if not os.path.exists(str(self.options.data_filter_file)):
+                raise ConanInvalidConfiguration("Non-existent data_filter_file specified")
+            if self.options.data_filter_locales or self.options.data_filter_excluded_features:
+                raise ConanInvalidConfiguration("data_filter_file cannot be combined with data_filter_locales "
+                                                "and data_filter_excluded_features, add them to the file instead")
         if Version(self.version) >= "75.1":
             if self.settings.compiler.cppstd:
                 check_min_cppstd(self, self._min_cppstd)
@@ -109,6 +140,12 @@ class ICUConan(ConanFile):
     def package_id(self):
         if self.info.options.dat_package_file:
             self.info.options.dat_package_file = self._sha256sum(str(self.info.options.dat_package_file))
+        if self.info.options.data_filter_file:
+            self.info.options.data_filter_file = self._sha256sum(str(self.info.options.data_filter_file))
+        for option in ("data_filter_locales", "data_filter_excluded_features"):
+            # the order and the repetitions of the items do not change the filter
+            if self.info.options.get_safe(option):
+                setattr(self.info.options, option, ",".join(self._split_list(self.info.options.get_safe(option))))
 
     def build_requirements(self):
         if self._settings_build.os == "Windows":
@@ -119,8 +156,15 @@ class ICUConan(ConanFile):
         if cross_building(self) and hasattr(self, "settings_build"):
             self.tool_requires(str(self.ref))
 
+    @property
+    def _data_sources_archive(self):
+        return os.path.join(self.source_folder, "icu4c-data.zip")
+
     def source(self):
-        get(self, **self.conan_data["sources"][self.version], strip_root=True)
+        sources = self.conan_data["sources"][self.version]
+        get(self, **sources["source"], strip_root=True)
+        # extracted over source/data by _patch_sources() when a data filter is applied
+        download(self, **sources["data"], filename=self._data_sources_archive)
 
     def generate(self):
         env = VirtualBuildEnv(self)
@@ -180,15 +224,53 @@ class ICUConan(ConanFile):
                 env.define("icu_cv_host_frag", "mh-msys-msvc")
             env.vars(self).save_script("conanbuild_icu_msvc")
 
+        if self._with_data_filter:
+            # the data is built from source by the python data build tool, which applies the filter
+            env = Environment()
+            env.define_path("PYTHON", unix_path(self, sys.executable))
+            env.define_path("ICU_DATA_FILTER_FILE", self._data_filter_file)
+            env.vars(self).save_script("conanbuild_icu_data_filter")
+            if not self.options.data_filter_file:
+                save(self, self._data_filter_file, json.dumps(self._data_filter, indent=2))
+
+    @property
+    def _data_filter_file(self):
+        if self.options.data_filter_file:
+            return str(self.options.data_filter_file)
+        return os.path.join(self.generators_folder, "icu_data_filter.json")
+
+    @property
+    def _data_filter(self):
+        data_filter = {}
+        if self.options.data_filter_locales:
+            data_filter["localeFilter"] = {
+                "filterType": "locale",
+                "includelist": self._split_list(self.options.data_filter_locales),
+            }
+        if self.options.data_filter_excluded_features:
+            data_filter["featureFilters"] = {
+                feature: "exclude" for feature in self._split_list(self.options.data_filter_excluded_features)
+            }
+        return data_filter
+
     def _patch_sources(self):
         apply_conandata_patches(self)
 
-        replace_in_file(
-                self,
-                os.path.join(self.source_folder, "source", "configure"),
-                "if test -z \"$PYTHON\"",
-                "if true",
-        )
+        if self._with_data_filter:
+            # the data is built from its sources, which replace the prebuilt data of the source archive
+            data_folder = os.path.join(self.source_folder, "source", "data")
+            rmdir(self, data_folder)
+            unzip(self, self._data_sources_archive, destination=data_folder, strip_root=True)
+            if not os.path.isfile(os.path.join(data_folder, "locales", "root.txt")):
+                raise ConanException(f"{os.path.basename(self._data_sources_archive)} does not contain the ICU data sources")
+        else:
+            # use the prebuilt data rather than building it from source with python
+            replace_in_file(
+                    self,
+                    os.path.join(self.source_folder, "source", "configure"),
+                    "if test -z \"$PYTHON\"",
+                    "if true",
+            )
 
         if self._settings_build.os == "Windows":
             # https://unicode-org.atlassian.net/projects/ICU/issues/ICU-20545
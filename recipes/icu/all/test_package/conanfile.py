@@ -20,7 +20,35 @@ class TestPackageConan(ConanFile):
         cmake.configure()
         cmake.build()
 
+    def _test_locale_args(self):
+        """Arguments of test_locale for the data filter options of icu, None when they cannot be known"""
+        options = self.dependencies[self.tested_reference_str].options
+        if options.get_safe("data_filter_file"):
+            return None
+        args = []
+        excluded = {feature.strip() for feature in str(options.get_safe("data_filter_excluded_features") or "").split(",")}
+        if excluded & {"coll_tree", "coll_ucadata"}:
+            args.append("--skip-collation")
+        if "locales_tree" in excluded:
+            args.append("--skip-format")
+        locales = [locale.strip() for locale in str(options.get_safe("data_filter_locales") or "").split(",") if locale.strip()]
+        if not locales:
+            return args + ["de"]
+        args.append(locales[0])
+        languages = {locale.replace("-", "_").split("_")[0] for locale in locales}
+        filtered_out = next((language for language in ("ja", "fi", "hu", "el") if language not in languages), None)
+        if filtered_out:
+            args.append(filtered_out)
+        return args
+
     def test(self):
         if can_run(self):
             bin_path = os.path.join(self.cpp.build.bindirs[0], "test_package")
             self.run(bin_path, env="conanrun")
+
+            args = self._test_locale_args()
+            if args is None:
+                self.output.info("Skipping test_locale, the locales kept by data_filter_file are not known")
+            else:
+                bin_path = os.path.join(self.cpp.build.bindirs[0], "test_locale")
+                self.run(f"{bin_path} {' '.join(args)}", env="conanrun")
@@ -0,0 +1,96 @@
+// Checks that the data of a locale kept by the ICU data filter is still used for collation and formatting,
+// and that a locale which was filtered out falls back to another one.
+// Usage: test_locale [--skip-collation] [--skip-format] <locale> [<filtered out locale>]
+
+#include "unicode/coll.h"
+#include "unicode/datefmt.h"
+#include "unicode/locid.h"
+#include "unicode/numfmt.h"
+#include "unicode/unistr.h"
+
+#include <cstdio>
+#include <cstring>
+#include <memory>
+#include <string>
+
+using namespace icu;
+
+static std::string toUTF8(const UnicodeString &s) {
+    std::string out;
+    return s.toUTF8String(out);
+}
+
+static bool sameLanguage(const Locale &valid, const Locale &requested) {
+    return std::strcmp(valid.getLanguage(), requested.getLanguage()) == 0;
+}
+
+static bool checkCollation(const Locale &locale) {
+    UErrorCode status = U_ZERO_ERROR;
+    std::unique_ptr<Collator> collator(Collator::createInstance(locale, status));
+    if (U_FAILURE(status)) {
+        printf("cannot open a collator for %s: %s\n", locale.getName(), u_errorName(status));
+        return false;
+    }
+    Locale valid = collator->getLocale(ULOC_VALID_LOCALE, status);
+    // letters sort alphabetically whatever their case, in every tailoring
+    bool ordered = collator->compare(UnicodeString("a"), UnicodeString("B"), status) == UCOL_LESS &&
+                   collator->compare(UnicodeString("B"), UnicodeString("c"), status) == UCOL_LESS;
+    printf("collation of %s: data of %s, a < B < c: %s\n", locale.getName(), valid.getName(), ordered ? "yes" : "no");
+    return U_SUCCESS(status) && ordered && sameLanguage(valid, locale);
+}
+
+static bool checkFormat(const Locale &locale) {
+    UErrorCode status = U_ZERO_ERROR;
+    std::unique_ptr<NumberFormat> numberFormat(NumberFormat::createInstance(locale, status));
+    std::unique_ptr<DateFormat> dateFormat(DateFormat::createDateInstance(DateFormat::kLong, locale));
+    if (U_FAILURE(status) || !dateFormat) {
+        printf("cannot open the formatters for %s: %s\n", locale.getName(), u_errorName(status));
+        return false;
+    }
+    Locale valid = numberFormat->getLocale(ULOC_VALID_LOCALE, status);
+    UnicodeString number, date;
+    numberFormat->format(1234567.5, number);
+    // 2001-09-09T01:46:40Z, in the middle of the day in every time zone
+    dateFormat->format(1000000000000.0 + 10 * 3600 * 1000.0, date);
+    // the number must survive a round trip through the locale symbols
+    Formattable parsed;
+    numberFormat->parse(number, parsed, status);
+    bool roundTrip = U_SUCCESS(status) && parsed.getDouble(status) == 1234567.5;
+    printf("formatting for %s: data of %s, %s, %s\n", locale.getName(), valid.getName(), toUTF8(number).c_str(),
+           toUTF8(date).c_str());
+    return U_SUCCESS(status) && roundTrip && date.length() > 0 && sameLanguage(valid, locale);
+}
+
+static bool checkFilteredOut(const Locale &locale) {
+    UErrorCode status = U_ZERO_ERROR;
+    std::unique_ptr<NumberFormat> numberFormat(NumberFormat::createInstance(locale, status));
+    if (U_FAILURE(status)) {
+        printf("cannot open a formatter for %s: %s\n", locale.getName(), u_errorName(status));
+        return false;
+    }
+    Locale valid = numberFormat->getLocale(ULOC_VALID_LOCALE, status);
+    printf("filtered out %s: falls back to the data of %s\n", locale.getName(), valid.getName());
+    return U_SUCCESS(status) && !sameLanguage(valid, locale);
+}
+
+int main(int argc, char **argv) {
+    bool collation = true, format = true;
+    int i = 1;
+    for (; i < argc && std::strncmp(argv[i], "--", 2) == 0; ++i) {
+        if (std::strcmp(argv[i], "--skip-collation") == 0) {
+            collation = false;
+        } else if (std::strcmp(argv[i], "--skip-format") == 0) {
+            format = false;
+        }
+    }
+    if (i >= argc) {
+        printf("usage: %s [--skip-collation] [--skip-format] <locale> [<filtered out locale>]\n", argv[0]);
+        return 1;
+    }
+    Locale locale(argv[i]);
+    bool ok = (!collation || checkCollation(locale)) && (!format || checkFormat(locale));
+    if (ok && i + 1 < argc) {
+        ok = checkFilteredOut(Locale(argv[i + 1]));
+    }
+    return ok ? 0 : 1;
+}
@@ -113,6 +113,11 @@ class LibarchiveConan(ConanFile):
         if self.options.get_safe("with_pcre2"):
             self.requires("pcre2/10.43")
 
+    def package_id(self):
+        if self.options.with_lzma:
+            # The multithreaded encoder is used when found in liblzma at build time, see the threads option of xz_utils
+            self.info.requires["xz_utils"].full_package_mode()
+
     def build_requirements(self):
         if Version(self.version) >= "3.7.9":
             self.tool_requires("cmake/[>=3.17]")
@@ -8,6 +8,7 @@ from conan.tools.files import copy, download, get, load, replace_in_file, rm, rm
 from conan.tools.gnu import Autotools, AutotoolsToolchain, AutotoolsDeps, PkgConfigDeps
 from conan.tools.layout import basic_layout
 from conan.tools.microsoft import is_msvc, unix_path
+from conan.tools.scm import Version
 
 import os
 import re
@@ -53,6 +54,8 @@ class LibcurlConan(ConanFile):
         "with_libpsl": [True, False],
         "with_largemaxwritesize": [True, False],
         "with_nghttp2": [True, False],
+        # HTTP/3 with ngtcp2 (QUIC) and nghttp3
+        "with_ngtcp2": [True, False],
         "with_zlib": [True, False],
         "with_brotli": [True, False],
         "with_zstd": [True, False],
@@ -102,6 +105,7 @@ class LibcurlConan(ConanFile):
         "with_libpsl": False,
         "with_largemaxwritesize": False,
         "with_nghttp2": False,
+        "with_ngtcp2": False,
         "with_zlib": True,
         "with_brotli": False,
         "with_zstd": False,
@@ -170,6 +174,9 @@ class LibcurlConan(ConanFile):
             self.requires("mbedtls/3.5.0")
         if self.options.with_nghttp2:
             self.requires("libnghttp2/[>=1.59.0 <2]")
+        if self.options.with_ngtcp2:
+            self.requires("ngtcp2/1.16.0")
+            self.requires("nghttp3/1.12.0")
         if self.options.with_libssh2:
             self.requires("libssh2/1.11.0")
         if self.options.with_zlib:
@@ -197,6 +204,17 @@ class LibcurlConan(ConanFile):
                 raise ConanInvalidConfiguration("option with_ntlm=True requires openssl/*:no_des=False")
         if self.options.with_ssl == "wolfssl" and not self.dependencies["wolfssl"].options.with_curl:
             raise ConanInvalidConfiguration("option with_ssl=wolfssl requires wolfssl/*:with_curl=True")
+        if self.options.with_ngtcp2:
+            if not self.options.with_http:
+                raise ConanInvalidConfiguration("option with_ngtcp2=True requires with_http=True")
+            if self.options.with_ssl not in ("openssl", "wolfssl"):
+                raise ConanInvalidConfiguration("option with_ngtcp2=True requires with_ssl=openssl or with_ssl=wolfssl")
+            if self.dependencies["ngtcp2"].options.with_ssl != self.options.with_ssl:
+                raise ConanInvalidConfiguration(f"option with_ngtcp2=True requires ngtcp2/*:with_ssl={self.options.with_ssl}")
+            if self.options.with_ssl == "openssl" and Version(self.dependencies["openssl"].ref.version) < "3.5.0":
+                raise ConanInvalidConfiguration("option with_ngtcp2=True requires the QUIC TLS API of OpenSSL >= 3.5")
+            if self.options.with_ssl == "wolfssl" and not self.dependencies["wolfssl"].options.get_safe("with_quic"):
+                raise ConanInvalidConfiguration("option with_ngtcp2=True requires wolfssl/*:with_quic=True")
 
     def build_requirements(self):
         if self._is_using_cmake_build:
@@ -433,6 +451,12 @@ class LibcurlConan(ConanFile):
         else:
             tc.configure_args.append("--without-nghttp2")
 
+        if self.options.with_ngtcp2:
+            # Looked up with pkg-config, including the ngtcp2_crypto library matching the TLS backend
+            tc.configure_args.extend(["--with-ngtcp2", "--with-nghttp3"])
+        else:
+            tc.configure_args.extend(["--without-ngtcp2", "--without-nghttp3"])
+
         if self.options.with_zlib:
             path = unix_path(self, self.dependencies["zlib"].package_folder)
             tc.configure_args.append(f"--with-zlib={path}")
@@ -566,6 +590,7 @@ class LibcurlConan(ConanFile):
         tc.variables["CURL_USE_WOLFSSL"] = self.options.with_ssl == "wolfssl"
         tc.variables["CURL_USE_MBEDTLS"] = self.options.with_ssl == "mbedtls"
         tc.variables["USE_NGHTTP2"] = self.options.with_nghttp2
+        tc.variables["USE_NGTCP2"] = self.options.with_ngtcp2
         tc.variables["CURL_ZLIB"] = self.options.with_zlib
         tc.variables["CURL_BROTLI"] = self.options.with_brotli
         tc.variables["CURL_ZSTD"] = self.options.with_zstd
@@ -614,6 +639,10 @@ class LibcurlConan(ConanFile):
         tc.variables["HAVE_SSL_SET0_WBIO"] = False
         tc.variables["HAVE_OPENSSL_SRP"] = True
         tc.variables["HAVE_SSL_CTX_SET_QUIC_METHOD"] = True
+        if self.options.with_ngtcp2 and self.options.with_ssl == "openssl":
+            # OpenSSL >= 3.5 has its own QUIC TLS API (ngtcp2_crypto_ossl), not the one of quictls
+            tc.variables["HAVE_SSL_CTX_SET_QUIC_METHOD"] = False
+            tc.variables["HAVE_SSL_SET_QUIC_TLS_CBS"] = True
 
         if is_msvc(self):
             tc.cache_variables["CMAKE_TRY_COMPILE_CONFIGURATION"] = str(self.settings.build_type)
@@ -640,6 +669,13 @@ class LibcurlConan(ConanFile):
         if self.options.with_libidn:
             deps.set_property("libidn2", "cmake_file_name", "Libidn2")
             deps.set_property("libidn2", "cmake_additional_variables_prefixes", ["LIBIDN2"])
+
+        if self.options.with_ngtcp2:
+            for dependency in ("ngtcp2", "nghttp3"):
+                prefix = dependency.upper()
+                deps.set_property(dependency, "cmake_file_name", prefix)
+                deps.set_property(dependency, "cmake_additional_variables_prefixes", [prefix])
+                deps.set_property(dependency, "cmake_extra_variables", {f"{prefix}_FOUND": "1", f"{prefix}_VERSION": str(self.dependencies[dependency].ref.version)})
         deps.generate()
 
     def package(self):
@@ -714,6 +750,9 @@ class LibcurlConan(ConanFile):
             self.cpp_info.components["curl"].requires.append("mbedtls::mbedtls")
         if self.options.with_nghttp2:
             self.cpp_info.components["curl"].requires.append("libnghttp2::libnghttp2")
+        if self.options.with_ngtcp2:
+            ngtcp2_crypto = {"openssl": "ngtcp2_crypto_ossl", "wolfssl": "ngtcp2_crypto_wolfssl"}[str(self.options.with_ssl)]
+            self.cpp_info.components["curl"].requires.extend(["ngtcp2::ngtcp2", f"ngtcp2::{ngtcp2_crypto}", "nghttp3::nghttp3"])
         if self.options.with_libssh2:
             self.cpp_info.components["curl"].requires.append("libssh2::libssh2")
         if self.options.with_zlib:
@@ -1,6 +1,6 @@
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import cmake_layout, CMake
+from conan.tools.cmake import cmake_layout, CMake, CMakeToolchain
 import os
 import subprocess
 import re
@@ -8,7 +8,7 @@ import re
 
 class TestPackageConan(ConanFile):
     settings = "os", "arch", "compiler", "build_type"
-    generators = "CMakeDeps", "CMakeToolchain", "VirtualRunEnv"
+    generators = "CMakeDeps", "VirtualRunEnv"
     test_type = "explicit"
 
     def requirements(self):
@@ -17,6 +17,20 @@ class TestPackageConan(ConanFile):
     def layout(self):
         cmake_layout(self)
 
+    def generate(self):
+        tc = CMakeToolchain(self)
+        curl = self.dependencies[self.tested_reference_str]
+        # The HTTP/3 request is sent to a server built on the QUIC and TLS libraries of libcurl, which are not
+        # requirements of the test package: their headers and libraries are passed to CMake
+        if curl.options.get_safe("with_ngtcp2") and curl.options.with_ssl == "openssl":
+            cpp_infos = [self.dependencies[name].cpp_info.aggregated_components() for name in ("ngtcp2", "nghttp3", "openssl")]
+            tc.cache_variables["H3_SERVER_INCLUDE_DIRS"] = ";".join(d.replace("\\", "/") for info in cpp_infos for d in info.includedirs)
+            tc.cache_variables["H3_SERVER_LIBRARY_DIRS"] = ";".join(d.replace("\\", "/") for info in cpp_infos for d in info.libdirs)
+            tc.cache_variables["H3_SERVER_LIBRARIES"] = ";".join([lib for info in cpp_infos for lib in info.libs] +
+                                                                 [lib for info in cpp_infos for lib in info.system_libs])
+            tc.cache_variables["H3_SERVER_DEFINITIONS"] = ";".join(d for info in cpp_infos for d in info.defines)
+        tc.generate()
+
     def build(self):
         cmake = CMake(self)
         cmake.configure()
@@ -0,0 +1,695 @@
+/*
+ * HTTP/3 request with curl_easy_perform() and CURL_HTTP_VERSION_3ONLY, against a minimal HTTP/3 server
+ * listening on a loopback UDP socket and running in a thread of this process. The server is built on the
+ * ngtcp2, nghttp3 and OpenSSL packages libcurl uses, with a self-signed certificate: it answers GET
+ * REQUEST_PATH with RESPONSE_BODY, and any other request with a 404.
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <curl/curl.h>
+#include <nghttp3/nghttp3.h>
+#include <ngtcp2/ngtcp2.h>
+#include <ngtcp2/ngtcp2_crypto.h>
+#include <ngtcp2/ngtcp2_crypto_ossl.h>
+#include <openssl/evp.h>
+#include <openssl/rand.h>
+#include <openssl/ssl.h>
+#include <openssl/x509.h>
+
+#include <stdio.h>
+#include <string.h>
+
+#ifdef _WIN32
+#include <winsock2.h>
+#include <ws2tcpip.h>
+#include <windows.h>
+typedef SOCKET socket_t;
+#define close_socket closesocket
+#define THREAD_FUNCTION DWORD WINAPI
+#define THREAD_RETURN 0
+#else
+#include <arpa/inet.h>
+#include <fcntl.h>
+#include <netinet/in.h>
+#include <pthread.h>
+#include <sys/select.h>
+#include <sys/socket.h>
+#include <time.h>
+#include <unistd.h>
+typedef int socket_t;
+#define INVALID_SOCKET (-1)
+#define close_socket close
+#define THREAD_FUNCTION void *
+#define THREAD_RETURN NULL
+#endif
+
+#define REQUEST_PATH "/conan-test"
+#define RESPONSE_BODY "HTTP/3 response from the test server\n"
+#define SERVER_CID_LENGTH 18
+/* Both ends give up after this, whatever happens to the connection */
+#define DEADLINE_SECONDS 15
+
+struct h3_server {
+    socket_t fd;
+    struct sockaddr_in local;
+    struct sockaddr_in remote;
+    socklen_t remote_length;
+    SSL_CTX *ssl_ctx;
+    SSL *ssl;
+    ngtcp2_crypto_ossl_ctx *ossl_ctx;
+    ngtcp2_crypto_conn_ref conn_ref;
+    ngtcp2_conn *conn;
+    nghttp3_conn *h3;
+    int get;
+    int path;
+    int responded;
+    int closed;
+    char error[256];
+};
+
+struct response {
+    char body[256];
+    size_t length;
+};
+
+static ngtcp2_tstamp timestamp(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (ngtcp2_tstamp)((double)counter.QuadPart / (double)frequency.QuadPart * NGTCP2_SECONDS);
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (ngtcp2_tstamp)ts.tv_sec * NGTCP2_SECONDS + (ngtcp2_tstamp)ts.tv_nsec;
+#endif
+}
+
+static int set_non_blocking(socket_t fd) {
+#ifdef _WIN32
+    u_long mode = 1;
+    return ioctlsocket(fd, FIONBIO, &mode) == 0;
+#else
+    int flags = fcntl(fd, F_GETFL, 0);
+    return flags != -1 && fcntl(fd, F_SETFL, flags | O_NONBLOCK) == 0;
+#endif
+}
+
+static void wait_readable(socket_t fd, ngtcp2_duration timeout) {
+    fd_set readable;
+    struct timeval tv;
+    FD_ZERO(&readable);
+    FD_SET(fd, &readable);
+    tv.tv_sec = (long)(timeout / NGTCP2_SECONDS);
+    tv.tv_usec = (long)(timeout % NGTCP2_SECONDS / NGTCP2_MICROSECONDS);
+    select((int)fd + 1, &readable, NULL, NULL, &tv);
+}
+
+/* Self-signed certificate of the server, libcurl does not verify it */
+static int use_self_signed_certificate(SSL_CTX *ctx) {
+    EVP_PKEY *key = EVP_EC_gen("P-256");
+    X509 *certificate = X509_new();
+    X509_NAME *name;
+    int result = 0;
+
+    if (key != NULL && certificate != NULL) {
+        name = X509_get_subject_name(certificate);
+        result = X509_set_version(certificate, 2) &&
+                 ASN1_INTEGER_set(X509_get_serialNumber(certificate), 1) &&
+                 X509_gmtime_adj(X509_getm_notBefore(certificate), 0) != NULL &&
+                 X509_gmtime_adj(X509_getm_notAfter(certificate), 3600) != NULL &&
+                 X509_set_pubkey(certificate, key) &&
+                 X509_NAME_add_entry_by_txt(name, "CN", MBSTRING_ASC, (const unsigned char *)"localhost", -1, -1, 0) &&
+                 X509_set_issuer_name(certificate, name) &&
+                 X509_sign(certificate, key, EVP_sha256()) > 0 &&
+                 SSL_CTX_use_certificate(ctx, certificate) == 1 &&
+                 SSL_CTX_use_PrivateKey(ctx, key) == 1;
+    }
+    X509_free(certificate);
+    EVP_PKEY_free(key);
+    return result;
+}
+
+static int select_alpn(SSL *ssl, const unsigned char **out, unsigned char *outlen, const unsigned char *in,
+                       unsigned int inlen, void *arg) {
+    static const unsigned char h3[] = "\x02h3";
+    (void)ssl;
+    (void)arg;
+    if (SSL_select_next_proto((unsigned char **)out, outlen, h3, sizeof(h3) - 1, in, inlen) != OPENSSL_NPN_NEGOTIATED) {
+        return SSL_TLSEXT_ERR_ALERT_FATAL;
+    }
+    return SSL_TLSEXT_ERR_OK;
+}
+
+/* nghttp3 callbacks */
+
+static int rcbuf_equals(nghttp3_rcbuf *buffer, const char *value) {
+    nghttp3_vec vec = nghttp3_rcbuf_get_buf(buffer);
+    return vec.len == strlen(value) && memcmp(vec.base, value, vec.len) == 0;
+}
+
+static int h3_recv_header(nghttp3_conn *h3, int64_t stream_id, int32_t token, nghttp3_rcbuf *name,
+                          nghttp3_rcbuf *value, uint8_t flags, void *conn_user_data, void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)conn_user_data;
+    (void)h3;
+    (void)stream_id;
+    (void)token;
+    (void)flags;
+    (void)stream_user_data;
+    if (rcbuf_equals(name, ":method")) {
+        server->get = rcbuf_equals(value, "GET");
+    } else if (rcbuf_equals(name, ":path")) {
+        server->path = rcbuf_equals(value, REQUEST_PATH);
+    }
+    return 0;
+}
+
+static nghttp3_ssize read_response_body(nghttp3_conn *h3, int64_t stream_id, nghttp3_vec *vec, size_t veccnt,
+                                        uint32_t *pflags, void *conn_user_data, void *stream_user_data) {
+    (void)h3;
+    (void)stream_id;
+    (void)veccnt;
+    (void)conn_user_data;
+    (void)stream_user_data;
+    vec[0].base = (uint8_t *)RESPONSE_BODY;
+    vec[0].len = sizeof(RESPONSE_BODY) - 1;
+    *pflags |= NGHTTP3_DATA_FLAG_EOF;
+    return 1;
+}
+
+static nghttp3_nv header(const char *name, const char *value) {
+    nghttp3_nv nv;
+    nv.name = (const uint8_t *)name;
+    nv.value = (const uint8_t *)value;
+    nv.namelen = strlen(name);
+    nv.valuelen = strlen(value);
+    nv.flags = NGHTTP3_NV_FLAG_NONE;
+    return nv;
+}
+
+static int h3_end_stream(nghttp3_conn *h3, int64_t stream_id, void *conn_user_data, void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)conn_user_data;
+    nghttp3_data_reader reader;
+    nghttp3_nv headers[2];
+    (void)stream_user_data;
+    headers[0] = header(":status", server->get && server->path ? "200" : "404");
+    headers[1] = header("content-type", "text/plain");
+    reader.read_data = read_response_body;
+    if (nghttp3_conn_submit_response(h3, stream_id, headers, 2, &reader) != 0) {
+        snprintf(server->error, sizeof(server->error), "nghttp3_conn_submit_response failed");
+        return NGHTTP3_ERR_CALLBACK_FAILURE;
+    }
+    server->responded = 1;
+    return 0;
+}
+
+static int h3_acked_stream_data(nghttp3_conn *h3, int64_t stream_id, uint64_t datalen, void *conn_user_data,
+                                void *stream_user_data) {
+    (void)h3;
+    (void)stream_id;
+    (void)datalen;
+    (void)conn_user_data;
+    (void)stream_user_data;
+    return 0;
+}
+
+static int h3_deferred_consume(nghttp3_conn *h3, int64_t stream_id, size_t consumed, void *conn_user_data,
+                               void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)conn_user_data;
+    (void)h3;
+    (void)stream_user_data;
+    ngtcp2_conn_extend_max_stream_offset(server->conn, stream_id, consumed);
+    ngtcp2_conn_extend_max_offset(server->conn, consumed);
+    return 0;
+}
+
+/* Creates the HTTP/3 connection with its control and QPACK streams, once the client allows them */
+static int setup_h3(struct h3_server *server) {
+    nghttp3_callbacks callbacks;
+    nghttp3_settings settings;
+    const ngtcp2_transport_params *params;
+    int64_t control_stream_id, qpack_encoder_stream_id, qpack_decoder_stream_id;
+
+    if (server->h3 != NULL) {
+        return 0;
+    }
+    if (ngtcp2_conn_get_streams_uni_left(server->conn) < 3) {
+        snprintf(server->error, sizeof(server->error), "the client does not allow the 3 HTTP/3 unidirectional streams");
+        return -1;
+    }
+    memset(&callbacks, 0, sizeof(callbacks));
+    callbacks.acked_stream_data = h3_acked_stream_data;
+    callbacks.deferred_consume = h3_deferred_consume;
+    callbacks.recv_header = h3_recv_header;
+    callbacks.end_stream = h3_end_stream;
+    nghttp3_settings_default(&settings);
+    if (nghttp3_conn_server_new(&server->h3, &callbacks, &settings, nghttp3_mem_default(), server) != 0) {
+        snprintf(server->error, sizeof(server->error), "nghttp3_conn_server_new failed");
+        return -1;
+    }
+    params = ngtcp2_conn_get_local_transport_params(server->conn);
+    nghttp3_conn_set_max_client_streams_bidi(server->h3, params->initial_max_streams_bidi);
+    if (ngtcp2_conn_open_uni_stream(server->conn, &control_stream_id, NULL) != 0 ||
+        nghttp3_conn_bind_control_stream(server->h3, control_stream_id) != 0 ||
+        ngtcp2_conn_open_uni_stream(server->conn, &qpack_encoder_stream_id, NULL) != 0 ||
+        ngtcp2_conn_open_uni_stream(server->conn, &qpack_decoder_stream_id, NULL) != 0 ||
+        nghttp3_conn_bind_qpack_streams(server->h3, qpack_encoder_stream_id, qpack_decoder_stream_id) != 0) {
+        snprintf(server->error, sizeof(server->error), "cannot open the HTTP/3 control and QPACK streams");
+        return -1;
+    }
+    return 0;
+}
+
+/* ngtcp2 callbacks */
+
+static ngtcp2_conn *get_conn(ngtcp2_crypto_conn_ref *conn_ref) {
+    return ((struct h3_server *)conn_ref->user_data)->conn;
+}
+
+static void random_bytes(uint8_t *dest, size_t destlen, const ngtcp2_rand_ctx *rand_ctx) {
+    (void)rand_ctx;
+    RAND_bytes(dest, (int)destlen);
+}
+
+static int get_new_connection_id(ngtcp2_conn *conn, ngtcp2_cid *cid, uint8_t *token, size_t cidlen, void *user_data) {
+    (void)conn;
+    (void)user_data;
+    if (RAND_bytes(cid->data, (int)cidlen) != 1 || RAND_bytes(token, NGTCP2_STATELESS_RESET_TOKENLEN) != 1) {
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    cid->datalen = cidlen;
+    return 0;
+}
+
+static int handshake_completed(ngtcp2_conn *conn, void *user_data) {
+    (void)conn;
+    return setup_h3((struct h3_server *)user_data) == 0 ? 0 : NGTCP2_ERR_CALLBACK_FAILURE;
+}
+
+static int recv_stream_data(ngtcp2_conn *conn, uint32_t flags, int64_t stream_id, uint64_t offset, const uint8_t *data,
+                            size_t datalen, void *user_data, void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)user_data;
+    nghttp3_ssize consumed;
+    (void)offset;
+    (void)stream_user_data;
+    if (setup_h3(server) != 0) {
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    consumed = nghttp3_conn_read_stream(server->h3, stream_id, data, datalen, (flags & NGTCP2_STREAM_DATA_FLAG_FIN) != 0);
+    if (consumed < 0) {
+        snprintf(server->error, sizeof(server->error), "nghttp3_conn_read_stream: %s", nghttp3_strerror((int)consumed));
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    ngtcp2_conn_extend_max_stream_offset(conn, stream_id, (uint64_t)consumed);
+    ngtcp2_conn_extend_max_offset(conn, (uint64_t)consumed);
+    return 0;
+}
+
+static int acked_stream_data_offset(ngtcp2_conn *conn, int64_t stream_id, uint64_t offset, uint64_t datalen,
+                                    void *user_data, void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)user_data;
+    (void)conn;
+    (void)offset;
+    (void)stream_user_data;
+    if (server->h3 != NULL && nghttp3_conn_add_ack_offset(server->h3, stream_id, datalen) != 0) {
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    return 0;
+}
+
+static int stream_close(ngtcp2_conn *conn, uint32_t flags, int64_t stream_id, uint64_t app_error_code, void *user_data,
+                        void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)user_data;
+    int rv;
+    (void)conn;
+    (void)stream_user_data;
+    if (server->h3 == NULL) {
+        return 0;
+    }
+    if (!(flags & NGTCP2_STREAM_CLOSE_FLAG_APP_ERROR_CODE_SET)) {
+        app_error_code = NGHTTP3_H3_NO_ERROR;
+    }
+    rv = nghttp3_conn_close_stream(server->h3, stream_id, app_error_code);
+    if (rv != 0 && rv != NGHTTP3_ERR_STREAM_NOT_FOUND) {
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    return 0;
+}
+
+static int extend_max_stream_data(ngtcp2_conn *conn, int64_t stream_id, uint64_t max_data, void *user_data,
+                                  void *stream_user_data) {
+    struct h3_server *server = (struct h3_server *)user_data;
+    (void)conn;
+    (void)max_data;
+    (void)stream_user_data;
+    if (server->h3 != NULL && nghttp3_conn_unblock_stream(server->h3, stream_id) != 0) {
+        return NGTCP2_ERR_CALLBACK_FAILURE;
+    }
+    return 0;
+}
+
+static ngtcp2_path server_path(struct h3_server *server) {
+    ngtcp2_path path;
+    path.local.addr = (ngtcp2_sockaddr *)&server->local;
+    path.local.addrlen = sizeof(server->local);
+    path.remote.addr = (ngtcp2_sockaddr *)&server->remote;
+    path.remote.addrlen = server->remote_length;
+    path.user_data = NULL;
+    return path;
+}
+
+/* Creates the QUIC connection and its TLS session from the first Initial packet of the client */
+static int accept_connection(struct h3_server *server, const uint8_t *packet, size_t length) {
+    ngtcp2_callbacks callbacks;
+    ngtcp2_settings settings;
+    ngtcp2_transport_params params;
+    ngtcp2_pkt_hd hd;
+    ngtcp2_cid scid;
+    ngtcp2_path path = server_path(server);
+    int rv;
+
+    if (ngtcp2_accept(&hd, packet, length) != 0) {
+        snprintf(server->error, sizeof(server->error), "the first datagram is not a QUIC Initial packet");
+        return -1;
+    }
+
+    memset(&callbacks, 0, sizeof(callbacks));
+    callbacks.recv_client_initial = ngtcp2_crypto_recv_client_initial_cb;
+    callbacks.recv_crypto_data = ngtcp2_crypto_recv_crypto_data_cb;
+    callbacks.handshake_completed = handshake_completed;
+    callbacks.encrypt = ngtcp2_crypto_encrypt_cb;
+    callbacks.decrypt = ngtcp2_crypto_decrypt_cb;
+    callbacks.hp_mask = ngtcp2_crypto_hp_mask_cb;
+    callbacks.recv_stream_data = recv_stream_data;
+    callbacks.acked_stream_data_offset = acked_stream_data_offset;
+    callbacks.stream_close = stream_close;
+    callbacks.rand = random_bytes;
+    callbacks.get_new_connection_id = get_new_connection_id;
+    callbacks.update_key = ngtcp2_crypto_update_key_cb;
+    callbacks.extend_max_stream_data = extend_max_stream_data;
+    callbacks.delete_crypto_aead_ctx = ngtcp2_crypto_delete_crypto_aead_ctx_cb;
+    callbacks.delete_crypto_cipher_ctx = ngtcp2_crypto_delete_crypto_cipher_ctx_cb;
+    callbacks.get_path_challenge_data = ngtcp2_crypto_get_path_challenge_data_cb;
+    callbacks.version_negotiation = ngtcp2_crypto_version_negotiation_cb;
+
+    ngtcp2_settings_default(&settings);
+    settings.initial_ts = timestamp();
+
+    ngtcp2_transport_params_default(&params);
+    params.initial_max_stream_data_bidi_local = 256 * 1024;
+    params.initial_max_stream_data_bidi_remote = 256 * 1024;
+    params.initial_max_stream_data_uni = 256 * 1024;
+    params.initial_max_data = 1024 * 1024;
+    params.initial_max_streams_bidi = 16;
+    params.initial_max_streams_uni = 3;
+    params.max_idle_timeout = 5 * NGTCP2_SECONDS;
+    params.original_dcid = hd.dcid;
+    params.original_dcid_present = 1;
+
+    scid.datalen = SERVER_CID_LENGTH;
+    if (RAND_bytes(scid.data, SERVER_CID_LENGTH) != 1) {
+        return -1;
+    }
+    rv = ngtcp2_conn_server_new(&server->conn, &hd.scid, &scid, &path, hd.version, &callbacks, &settings, &params, NULL,
+                                server);
+    if (rv != 0) {
+        snprintf(server->error, sizeof(server->error), "ngtcp2_conn_server_new: %s", ngtcp2_strerror(rv));
+        return -1;
+    }
+
+    server->conn_ref.get_conn = get_conn;
+    server->conn_ref.user_data = server;
+    server->ssl = SSL_new(server->ssl_ctx);
+    if (server->ssl == NULL || ngtcp2_crypto_ossl_ctx_new(&server->ossl_ctx, server->ssl) != 0) {
+        snprintf(server->error, sizeof(server->error), "cannot create the TLS session");
+        return -1;
+    }
+    SSL_set_app_data(server->ssl, &server->conn_ref);
+    SSL_set_accept_state(server->ssl);
+    if (ngtcp2_crypto_ossl_configure_server_session(server->ssl) != 0) {
+        snprintf(server->error, sizeof(server->error), "ngtcp2_crypto_ossl_configure_server_session failed");
+        return -1;
+    }
+    ngtcp2_conn_set_tls_native_handle(server->conn, server->ossl_ctx);
+    return 0;
+}
+
+/* Reads the pending datagrams. Returns 1 once the client closed the connection, -1 on errors */
+static int read_datagrams(struct h3_server *server) {
+    uint8_t buffer[65536];
+    ngtcp2_pkt_info pi;
+    ngtcp2_path path;
+    long received;
+    int rv;
+
+    for (;;) {
+        server->remote_length = sizeof(server->remote);
+        received = (long)recvfrom(server->fd, (char *)buffer, sizeof(buffer), 0, (struct sockaddr *)&server->remote,
+                                  &server->remote_length);
+        if (received <= 0) {
+            return 0;
+        }
+        if (server->conn == NULL && accept_connection(server, buffer, (size_t)received) != 0) {
+            return -1;
+        }
+        memset(&pi, 0, sizeof(pi));
+        path = server_path(server);
+        rv = ngtcp2_conn_read_pkt(server->conn, &path, &pi, buffer, (size_t)received, timestamp());
+        if (rv == NGTCP2_ERR_DRAINING || rv == NGTCP2_ERR_CLOSING) {
+            return 1;
+        }
+        if (rv != 0) {
+            if (server->error[0] == '\0') {
+                snprintf(server->error, sizeof(server->error), "ngtcp2_conn_read_pkt: %s", ngtcp2_strerror(rv));
+            }
+            return -1;
+        }
+    }
+}
+
+/* Sends the packets ngtcp2 has to send, with the stream data nghttp3 has to write */
+static int write_datagrams(struct h3_server *server) {
+    uint8_t buffer[2048];
+    ngtcp2_path_storage ps;
+    ngtcp2_pkt_info pi;
+    ngtcp2_vec vec[16];
+    ngtcp2_ssize written, stream_data_length;
+    nghttp3_ssize veccnt;
+    int64_t stream_id;
+    uint32_t flags;
+    int fin, rv;
+
+    ngtcp2_path_storage_zero(&ps);
+    for (;;) {
+        stream_id = -1;
+        fin = 0;
+        veccnt = 0;
+        if (server->h3 != NULL && ngtcp2_conn_get_max_data_left(server->conn) > 0) {
+            veccnt = nghttp3_conn_writev_stream(server->h3, &stream_id, &fin, (nghttp3_vec *)vec, sizeof(vec) / sizeof(vec[0]));
+            if (veccnt < 0) {
+                snprintf(server->error, sizeof(server->error), "nghttp3_conn_writev_stream: %s", nghttp3_strerror((int)veccnt));
+                return -1;
+            }
+        }
+        flags = NGTCP2_WRITE_STREAM_FLAG_MORE;
+        if (fin) {
+            flags |= NGTCP2_WRITE_STREAM_FLAG_FIN;
+        }
+        written = ngtcp2_conn_writev_stream(server->conn, &ps.path, &pi, buffer, sizeof(buffer), &stream_data_length,
+                                            flags, stream_id, vec, (size_t)veccnt, timestamp());
+        if (written < 0) {
+            switch (written) {
+            case NGTCP2_ERR_STREAM_DATA_BLOCKED:
+                nghttp3_conn_block_stream(server->h3, stream_id);
+                continue;
+            case NGTCP2_ERR_STREAM_SHUT_WR:
+                nghttp3_conn_shutdown_stream_write(server->h3, stream_id);
+                continue;
+            case NGTCP2_ERR_WRITE_MORE:
+                rv = nghttp3_conn_add_write_offset(server->h3, stream_id, (size_t)stream_data_length);
+                if (rv != 0) {
+                    return -1;
+                }
+                continue;
+            }
+            snprintf(server->error, sizeof(server->error), "ngtcp2_conn_writev_stream: %s", ngtcp2_strerror((int)written));
+            return -1;
+        }
+        if (stream_id >= 0 && stream_data_length >= 0 &&
+            nghttp3_conn_add_write_offset(server->h3, stream_id, (size_t)stream_data_length) != 0) {
+            return -1;
+        }
+        if (written == 0) {
+            return 0;
+        }
+        sendto(server->fd, (const char *)buffer, (int)written, 0, (struct sockaddr *)&server->remote, server->remote_length);
+    }
+}
+
+static THREAD_FUNCTION serve(void *arg) {
+    struct h3_server *server = (struct h3_server *)arg;
+    ngtcp2_tstamp deadline = timestamp() + DEADLINE_SECONDS * NGTCP2_SECONDS;
+    ngtcp2_tstamp now, expiry;
+    int state = 0, rv;
+
+    while (state == 0) {
+        now = timestamp();
+        if (now >= deadline) {
+            snprintf(server->error, sizeof(server->error), "the connection was not closed after %d s", DEADLINE_SECONDS);
+            state = -1;
+            break;
+        }
+        expiry = now + 100 * NGTCP2_MILLISECONDS;
+        if (server->conn != NULL) {
+            if (ngtcp2_conn_get_expiry(server->conn) <= now) {
+                rv = ngtcp2_conn_handle_expiry(server->conn, now);
+                if (rv == NGTCP2_ERR_IDLE_CLOSE) {
+                    snprintf(server->error, sizeof(server->error), "the client did not close the connection");
+                    state = -1;
+                    break;
+                } else if (rv != 0) {
+                    snprintf(server->error, sizeof(server->error), "ngtcp2_conn_handle_expiry: %s", ngtcp2_strerror(rv));
+                    state = -1;
+                    break;
+                }
+            }
+            if (write_datagrams(server) != 0) {
+                state = -1;
+                break;
+            }
+            if (ngtcp2_conn_get_expiry(server->conn) < expiry) {
+                expiry = ngtcp2_conn_get_expiry(server->conn);
+            }
+        }
+        wait_readable(server->fd, expiry > now ? expiry - now : 0);
+        state = read_datagrams(server);
+        if (state == 0 && server->conn != NULL && write_datagrams(server) != 0) {
+            state = -1;
+        }
+    }
+    server->closed = state == 1;
+    return THREAD_RETURN;
+}
+
+static size_t write_response(char *data, size_t size, size_t count, void *userdata) {
+    struct response *response = (struct response *)userdata;
+    size_t length = size * count;
+    if (response->length + length >= sizeof(response->body)) {
+        return 0;
+    }
+    memcpy(response->body + response->length, data, length);
+    response->length += length;
+    response->body[response->length] = '\0';
+    return length;
+}
+
+static int request(unsigned port) {
+    struct response response;
+    char url[64];
+    long status = 0, http_version = 0;
+    CURLcode result;
+    CURL *curl = curl_easy_init();
+
+    if (curl == NULL) {
+        return 0;
+    }
+    memset(&response, 0, sizeof(response));
+    snprintf(url, sizeof(url), "https://127.0.0.1:%u" REQUEST_PATH, port);
+    curl_easy_setopt(curl, CURLOPT_URL, url);
+    curl_easy_setopt(curl, CURLOPT_HTTP_VERSION, (long)CURL_HTTP_VERSION_3ONLY);
+    curl_easy_setopt(curl, CURLOPT_SSL_VERIFYPEER, 0L);
+    curl_easy_setopt(curl, CURLOPT_SSL_VERIFYHOST, 0L);
+    curl_easy_setopt(curl, CURLOPT_TIMEOUT, 10L);
+    curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION, write_response);
+    curl_easy_setopt(curl, CURLOPT_WRITEDATA, &response);
+    result = curl_easy_perform(curl);
+    curl_easy_getinfo(curl, CURLINFO_RESPONSE_CODE, &status);
+    curl_easy_getinfo(curl, CURLINFO_HTTP_VERSION, &http_version);
+    /* closes the QUIC connection, which ends the server thread */
+    curl_easy_cleanup(curl);
+
+    if (result != CURLE_OK) {
+        fprintf(stderr, "h3_loopback: %s\n", curl_easy_strerror(result));
+        return 0;
+    }
+    printf("HTTP/3 request: status %ld, %s", status, response.body);
+    if (http_version != CURL_HTTP_VERSION_3 || status != 200 || strcmp(response.body, RESPONSE_BODY) != 0) {
+        fprintf(stderr, "h3_loopback: unexpected response (HTTP version %ld, status %ld)\n", http_version, status);
+        return 0;
+    }
+    return 1;
+}
+
+int h3_loopback(void) {
+    struct h3_server server;
+    socklen_t address_length = sizeof(server.local);
+    int ok = 0;
+#ifdef _WIN32
+    HANDLE thread;
+#else
+    pthread_t thread;
+#endif
+
+    memset(&server, 0, sizeof(server));
+    server.fd = socket(AF_INET, SOCK_DGRAM, 0);
+    server.ssl_ctx = SSL_CTX_new(TLS_server_method());
+    if (server.fd == INVALID_SOCKET || server.ssl_ctx == NULL || ngtcp2_crypto_ossl_init() != 0) {
+        fprintf(stderr, "h3_loopback: cannot create the server\n");
+        goto end;
+    }
+    SSL_CTX_set_min_proto_version(server.ssl_ctx, TLS1_3_VERSION);
+    SSL_CTX_set_alpn_select_cb(server.ssl_ctx, select_alpn, NULL);
+    if (!use_self_signed_certificate(server.ssl_ctx)) {
+        fprintf(stderr, "h3_loopback: cannot create the certificate of the server\n");
+        goto end;
+    }
+    server.local.sin_family = AF_INET;
+    server.local.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    server.local.sin_port = 0;
+    if (bind(server.fd, (struct sockaddr *)&server.local, sizeof(server.local)) != 0 ||
+        getsockname(server.fd, (struct sockaddr *)&server.local, &address_length) != 0 || !set_non_blocking(server.fd)) {
+        fprintf(stderr, "h3_loopback: cannot bind a loopback UDP socket\n");
+        goto end;
+    }
+
+#ifdef _WIN32
+    thread = CreateThread(NULL, 0, serve, &server, 0, NULL);
+    if (thread == NULL) {
+        goto end;
+    }
+    ok = request(ntohs(server.local.sin_port));
+    WaitForSingleObject(thread, INFINITE);
+    CloseHandle(thread);
+#else
+    if (pthread_create(&thread, NULL, serve, &server) != 0) {
+        goto end;
+    }
+    ok = request(ntohs(server.local.sin_port));
+    pthread_join(thread, NULL);
+#endif
+    if (server.error[0] != '\0') {
+        fprintf(stderr, "h3_loopback: server: %s\n", server.error);
+        ok = 0;
+    } else if (!server.responded || !server.closed) {
+        fprintf(stderr, "h3_loopback: the server did not answer a request and see the connection closed\n");
+        ok = 0;
+    }
+
+end:
+    nghttp3_conn_del(server.h3);
+    ngtcp2_conn_del(server.conn);
+    if (server.ossl_ctx != NULL) {
+        ngtcp2_crypto_ossl_ctx_del(server.ossl_ctx);
+    }
+    if (server.ssl != NULL) {
+        SSL_set_app_data(server.ssl, NULL);
+        SSL_free(server.ssl);
+    }
+    SSL_CTX_free(server.ssl_ctx);
+    if (server.fd != INVALID_SOCKET) {
+        close_socket(server.fd);
+    }
+    return ok ? 0 : 1;
+}
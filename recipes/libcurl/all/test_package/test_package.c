@@ -1,8 +1,24 @@
 #include <stdio.h>
 #include <curl/curl.h>
 
+#ifdef WITH_H3_SERVER
+int h3_loopback(void);
+#endif
+
 int main(void)
 {
+  const curl_version_info_data *info = curl_version_info(CURLVERSION_NOW);
+  int result = 0;
+
   printf("libcurl version %s\n", curl_version());
-  return 0;
+  if (info->features & CURL_VERSION_HTTP3) {
+#ifdef WITH_H3_SERVER
+    curl_global_init(CURL_GLOBAL_DEFAULT);
+    result = h3_loopback();
+    curl_global_cleanup();
+#else
+    printf("HTTP/3 request not tested: the test server needs ngtcp2 with OpenSSL\n");
+#endif
+  }
+  return result;
 }
@@ -1,6 +1,7 @@
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
-from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, rmdir
+from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, replace_in_file, rmdir
 from conan.tools.microsoft import is_msvc, check_min_vs
 from conan.tools.scm import Version
 import os
@@ -20,18 +21,38 @@ class LibuvConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # Default of the UV_USE_IO_URING environment variable: use io_uring for file operations on Linux
+        "with_io_uring": [True, False],
+        # Default of the UV_THREADPOOL_SIZE environment variable
+        "threadpool_size": ["ANY"],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "with_io_uring": True,
+        "threadpool_size": "4",
     }
 
+    @property
+    def _io_uring_upstream_default(self):
+        # Since 1.49.0, io_uring is only used for batching epoll_ctl calls unless UV_USE_IO_URING=1
+        return Version(self.version) < "1.49.0" and not self._io_uring_unsupported_arch
+
+    @property
+    def _io_uring_unsupported_arch(self):
+        # Never used by libuv there, whatever the value of UV_USE_IO_URING
+        return str(self.settings.arch).startswith(("armv5", "armv6", "armv7")) or self.settings.arch in ["ppc64", "ppc64le"]
+
     def export_sources(self):
         export_conandata_patches(self)
 
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if self.settings.os != "Linux" or Version(self.version) < "1.45.0":
+            del self.options.with_io_uring
+        else:
+            self.options.with_io_uring = self._io_uring_upstream_default
 
     def configure(self):
         if self.options.shared:
@@ -45,6 +66,10 @@ class LibuvConan(ConanFile):
     def validate(self):
         if is_msvc(self):
             check_min_vs(self, "190")
+        if self.options.get_safe("with_io_uring") and self._io_uring_unsupported_arch:
+            raise ConanInvalidConfiguration(f"{self.ref} does not support io_uring on {self.settings.arch}, use with_io_uring=False")
+        if not str(self.options.threadpool_size).isdigit() or not 1 <= int(self.options.threadpool_size) <= 1024:
+            raise ConanInvalidConfiguration("option threadpool_size must be an integer between 1 and 1024")
 
     def source(self):
         get(self, **self.conan_data["sources"][self.version], strip_root=True)
@@ -59,7 +84,19 @@ class LibuvConan(ConanFile):
             tc.cache_variables["CMAKE_POLICY_VERSION_MINIMUM"] = "3.5"  # CMake 4 support
         tc.generate()
 
+    def _patch_sources(self):
+        if bool(self.options.get_safe("with_io_uring", self._io_uring_upstream_default)) != self._io_uring_upstream_default:
+            replace_in_file(self, os.path.join(self.source_folder, "src", "unix", "linux.c"),
+                            'val = getenv("UV_USE_IO_URING");',
+                            'val = getenv("UV_USE_IO_URING");\n'
+                            f'    if (val == NULL) val = "{int(bool(self.options.with_io_uring))}";')
+        if int(self.options.threadpool_size) != 4:
+            replace_in_file(self, os.path.join(self.source_folder, "src", "threadpool.c"),
+                            'nthreads = ARRAY_SIZE(default_threads);\n  val = getenv("UV_THREADPOOL_SIZE");',
+                            f'nthreads = {self.options.threadpool_size};\n  val = getenv("UV_THREADPOOL_SIZE");')
+
     def build(self):
+        self._patch_sources()
         cmake = CMake(self)
         cmake.configure()
         cmake.build()
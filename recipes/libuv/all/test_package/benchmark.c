@@ -0,0 +1,176 @@
+/*
+ * uv_fs_read throughput: reads every block of a file of the given number of blocks once, in a
+ * random order, with N read requests in flight (the file is in the page cache after the first
+ * pass), for several values of N, and prints one JSON line per value.
+ * Usage: benchmark [reads] [iterations]
+ * On Linux, io_uring is used for the reads when enabled, see the UV_USE_IO_URING variable.
+ */
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <uv.h>
+
+#define BLOCK_SIZE 4096
+#define MAX_CONCURRENCY 256
+
+struct reader {
+    uv_fs_t request;
+    uv_buf_t buffer;
+    struct benchmark *benchmark;
+};
+
+struct benchmark {
+    uv_loop_t *loop;
+    uv_file file;
+    unsigned long blocks;
+    unsigned long submitted;
+    unsigned long completed;
+    unsigned int seed;
+    int failed;
+    struct reader readers[MAX_CONCURRENCY];
+};
+
+/* Deterministic pseudo random block order, the same for every run */
+static unsigned long next_block(struct benchmark *benchmark) {
+    benchmark->seed = benchmark->seed * 1103515245u + 12345u;
+    return (benchmark->seed >> 8) % benchmark->blocks;
+}
+
+static void on_read(uv_fs_t *request);
+
+static void submit(struct reader *reader) {
+    struct benchmark *benchmark = reader->benchmark;
+    int64_t offset = (int64_t)next_block(benchmark) * BLOCK_SIZE;
+    ++benchmark->submitted;
+    reader->request.data = reader;
+    if (uv_fs_read(benchmark->loop, &reader->request, benchmark->file, &reader->buffer, 1, offset, on_read) != 0) {
+        benchmark->failed = 1;
+    }
+}
+
+static void on_read(uv_fs_t *request) {
+    struct reader *reader = (struct reader *)request->data;
+    struct benchmark *benchmark = reader->benchmark;
+    if (request->result != BLOCK_SIZE) {
+        benchmark->failed = 1;
+    }
+    uv_fs_req_cleanup(request);
+    ++benchmark->completed;
+    if (!benchmark->failed && benchmark->submitted < benchmark->blocks) {
+        submit(reader);
+    }
+}
+
+static int create_file(uv_loop_t *loop, const char *path, unsigned long blocks) {
+    uv_fs_t request;
+    uv_buf_t buffer;
+    char *data = (char *)malloc(BLOCK_SIZE);
+    unsigned long i;
+    int ok = data != NULL;
+    uv_file file = uv_fs_open(loop, &request, path, UV_FS_O_CREAT | UV_FS_O_TRUNC | UV_FS_O_WRONLY, 0600, NULL);
+
+    uv_fs_req_cleanup(&request);
+    ok = ok && file >= 0;
+    buffer = uv_buf_init(data, BLOCK_SIZE);
+    for (i = 0; ok && i < blocks; ++i) {
+        memset(data, (int)(i & 0xFF), BLOCK_SIZE);
+        ok = uv_fs_write(loop, &request, file, &buffer, 1, -1, NULL) == BLOCK_SIZE;
+        uv_fs_req_cleanup(&request);
+    }
+    if (file >= 0) {
+        uv_fs_close(loop, &request, file, NULL);
+        uv_fs_req_cleanup(&request);
+    }
+    free(data);
+    return ok;
+}
+
+/* Reads every block once in a random order, with concurrency requests in flight */
+static double run(struct benchmark *benchmark, unsigned int concurrency) {
+    uint64_t start;
+    unsigned int i;
+
+    benchmark->submitted = benchmark->completed = 0;
+    benchmark->seed = 42;
+    start = uv_hrtime();
+    for (i = 0; i < concurrency && benchmark->submitted < benchmark->blocks; ++i) {
+        submit(&benchmark->readers[i]);
+    }
+    uv_run(benchmark->loop, UV_RUN_DEFAULT);
+    return (double)(uv_hrtime() - start) * 1e-9;
+}
+
+int main(int argc, char **argv) {
+    static const unsigned int concurrencies[] = {1, 16, 64, 256};
+    unsigned long reads = argc > 1 ? strtoul(argv[1], NULL, 10) : 4096;
+    int iterations = argc > 2 ? atoi(argv[2]) : 3;
+    const char *io_uring = getenv("UV_USE_IO_URING");
+    const char *threadpool_size = getenv("UV_THREADPOOL_SIZE");
+    struct benchmark *benchmark = (struct benchmark *)calloc(1, sizeof(struct benchmark));
+    char path[] = "libuv_benchmark.bin";
+    uv_fs_t request;
+    unsigned int i;
+    int iteration, result = EXIT_FAILURE;
+
+    if (benchmark == NULL) {
+        return EXIT_FAILURE;
+    }
+    benchmark->loop = uv_default_loop();
+    benchmark->file = -1;
+    benchmark->blocks = reads;
+    if (benchmark->blocks == 0 || iterations < 1 || !create_file(benchmark->loop, path, benchmark->blocks)) {
+        fprintf(stderr, "benchmark: cannot create %s\n", path);
+        goto end;
+    }
+    benchmark->file = uv_fs_open(benchmark->loop, &request, path, UV_FS_O_RDONLY, 0, NULL);
+    uv_fs_req_cleanup(&request);
+    if (benchmark->file < 0) {
+        goto end;
+    }
+    for (i = 0; i < MAX_CONCURRENCY; ++i) {
+        struct reader *reader = &benchmark->readers[i];
+        reader->benchmark = benchmark;
+        reader->buffer = uv_buf_init((char *)malloc(BLOCK_SIZE), BLOCK_SIZE);
+        if (reader->buffer.base == NULL) {
+            goto end;
+        }
+    }
+
+    /* warm up the page cache and the threadpool */
+    run(benchmark, MAX_CONCURRENCY);
+    for (i = 0; i < sizeof(concurrencies) / sizeof(concurrencies[0]); ++i) {
+        double best = 0.0;
+        for (iteration = 0; iteration < iterations; ++iteration) {
+            double elapsed = run(benchmark, concurrencies[i]);
+            if (benchmark->failed || benchmark->completed != benchmark->blocks) {
+                fprintf(stderr, "benchmark: uv_fs_read failed\n");
+                goto end;
+            }
+            if (iteration == 0 || elapsed < best) {
+                best = elapsed;
+            }
+        }
+        printf("{\"library\": \"libuv\", \"version\": \"%s\", \"concurrency\": %u, \"block_size\": %d, \"reads\": %lu, "
+               "\"reads_per_s\": %.0f, \"mb_s\": %.1f, \"uv_use_io_uring\": %s%s%s, \"uv_threadpool_size\": %s%s%s, \"iterations\": %d}\n",
+               uv_version_string(), concurrencies[i], BLOCK_SIZE, benchmark->blocks,
+               (double)benchmark->blocks / best, (double)benchmark->blocks * BLOCK_SIZE / 1e6 / best,
+               io_uring ? "\"" : "", io_uring ? io_uring : "null", io_uring ? "\"" : "",
+               threadpool_size ? "\"" : "", threadpool_size ? threadpool_size : "null", threadpool_size ? "\"" : "",
+               iterations);
+    }
+    result = EXIT_SUCCESS;
+
+end:
+    if (benchmark->file >= 0) {
+        uv_fs_close(benchmark->loop, &request, benchmark->file, NULL);
+        uv_fs_req_cleanup(&request);
+    }
+    uv_fs_unlink(benchmark->loop, &request, path, NULL);
+    uv_fs_req_cleanup(&request);
+    for (i = 0; i < MAX_CONCURRENCY; ++i) {
+        free(benchmark->readers[i].buffer.base);
+    }
+    uv_loop_close(benchmark->loop);
+    free(benchmark);
+    return result;
+}
@@ -1,12 +1,14 @@
 from conan import ConanFile
-from conan.errors import ConanInvalidConfiguration
-from conan.tools.apple import is_apple_os
+from conan.errors import ConanException, ConanInvalidConfiguration
+from conan.tools.apple import XCRun, is_apple_os
 from conan.tools.build import check_min_cppstd, cross_building
 from conan.tools.cmake import CMake, CMakeDeps, CMakeToolchain, cmake_layout
+from conan.tools.env import Environment
 from conan.tools.files import (
     apply_conandata_patches,
     collect_libs,
     get,
+    mkdir,
     rmdir,
     load,
     save,
@@ -19,10 +21,12 @@ from conan.tools.files import (
 from conan.tools.microsoft import is_msvc, msvc_runtime_flag
 from conan.tools.scm import Version
 
+from glob import glob
 import json
 import os
 from pathlib import Path, PurePosixPath
 import re
+import shutil
 import textwrap
 
 
@@ -150,6 +154,8 @@ class LLVMCoreConan(ConanFile):
         "rtti": [True, False],
         "threads": [True, False],
         "lto": ["On", "Off", "Full", "Thin"],
+        "pgo": [True, False],
+        "bolt": [True, False],
         "static_stdlib": [True, False],
         "unwind_tables": [True, False],
         "expensive_checks": [True, False],
@@ -181,6 +187,10 @@ class LLVMCoreConan(ConanFile):
         "rtti": True,
         "threads": True,
         "lto": "Off",
+        # instrumented build, training on the IR corpus in pgo/, then a build using the merged profile
+        "pgo": False,
+        # post-link layout optimization of libLLVM (shared) and of the opt and llc tools
+        "bolt": False,
         "static_stdlib": False,
         "unwind_tables": True,
         "expensive_checks": False,
@@ -220,6 +230,7 @@ class LLVMCoreConan(ConanFile):
 
     def export_sources(self):
         export_conandata_patches(self)
+        copy(self, "*.ll", os.path.join(self.recipe_folder, "pgo"), os.path.join(self.export_sources_folder, "pgo"))
 
     def config_options(self):
         if self.settings.os == "Windows":
@@ -239,6 +250,22 @@ class LLVMCoreConan(ConanFile):
     def layout(self):
         cmake_layout(self, src_folder="src")
 
+    @staticmethod
+    def _pgo_supported(settings):
+        # LLVM_BUILD_INSTRUMENTED and LLVM_PROFDATA_FILE are only implemented for clang
+        return str(settings.compiler) in ("clang", "apple-clang")
+
+    @staticmethod
+    def _bolt_supported(settings):
+        # llvm-bolt rewrites ELF binaries of these architectures
+        return settings.os == "Linux" and str(settings.arch) in ("x86_64", "armv8")
+
+    def package_id(self):
+        # The package id records what is applied, resolved in validate_build() as the options and settings cannot be
+        # read here: pgo and bolt fall back to a regular build where they are not supported or their tools are missing
+        self.info.options.pgo = self._applied_optimizations["pgo"]
+        self.info.options.bolt = self._applied_optimizations["bolt"]
+
     def requirements(self):
         if self.options.with_ffi:
             self.requires("libffi/3.4.6")
@@ -278,6 +305,11 @@ class LLVMCoreConan(ConanFile):
         if self.options.exceptions and not self.options.rtti:
             raise ConanInvalidConfiguration("Cannot enable exceptions without rtti support")
 
+        if self.options.pgo and not self._pgo_supported(self.settings):
+            self.output.warning("pgo requires clang, building without PGO")
+        if self.options.bolt and not self._bolt_supported(self.settings):
+            self.output.warning("bolt requires Linux on x86_64 or armv8, building without BOLT")
+
         if cross_building(self):
             # FIXME support cross compilation
             #  For Cross Building, LLVM builds a "native" toolchain in a subdirectory of the main build directory.
@@ -293,6 +325,22 @@ class LLVMCoreConan(ConanFile):
             elif self.options.shared:
                 raise ConanInvalidConfiguration("Shared Debug build is not supported on CCI due to resource limitations")
 
+        self._applied_optimizations = {"pgo": self._pgo, "bolt": self._bolt}
+        if self._optimizations_fallback:
+            if self.options.pgo and self._pgo_supported(self.settings) and not self._pgo:
+                self.output.warning("llvm-profdata not found, building without PGO. "
+                                    "Set the user.llvm-core:llvm_profdata conf to its path.")
+            if self.options.bolt and self._bolt_supported(self.settings) and not self._bolt:
+                self.output.warning("llvm-bolt or merge-fdata not found, building without BOLT. "
+                                    "Set the user.llvm-core:llvm_bolt and user.llvm-core:merge_fdata confs to their paths.")
+            return
+        required_tools = (["llvm-profdata"] if self._pgo else []) + (["llvm-bolt", "merge-fdata"] if self._bolt else [])
+        missing_tools = [tool for tool in required_tools if not self._find_llvm_tool(tool)]
+        if missing_tools:
+            confs = ", ".join(f"user.llvm-core:{tool.replace('-', '_')}" for tool in missing_tools)
+            raise ConanInvalidConfiguration(f"{', '.join(missing_tools)} not found, required by the pgo and bolt options. "
+                                            f"Set {confs} to the path of the tools, or put them in the PATH.")
+
     def source(self):
         sources = self.conan_data["sources"][self.version]
         if Version(self.version) < 15:
@@ -319,6 +367,52 @@ class LLVMCoreConan(ConanFile):
         if ram_per_link_job:
             cmake_definitions["LLVM_RAM_PER_LINK_JOB"] = ram_per_link_job
 
+    @property
+    def _optimizations_fallback(self):
+        # With user.llvm-core:optimizations_fallback=False, missing tools make validate_build() fail instead
+        return self.conf.get("user.llvm-core:optimizations_fallback", default=True, check_type=bool)
+
+    def _optimization_tools_found(self, names):
+        return not self._optimizations_fallback or all(self._find_llvm_tool(name) for name in names)
+
+    @property
+    def _pgo(self):
+        return bool(self.options.pgo) and self._pgo_supported(self.settings) and \
+            self._optimization_tools_found(["llvm-profdata"])
+
+    @property
+    def _bolt(self):
+        return bool(self.options.bolt) and self._bolt_supported(self.settings) and \
+            self._optimization_tools_found(["llvm-bolt", "merge-fdata"])
+
+    def _find_llvm_tool(self, name):
+        """
+        Path of an LLVM tool used to optimize the build: the value of the user.llvm-core:<name> conf (with
+        underscores, e.g. user.llvm-core:llvm_profdata), or the tool found next to the compiler or in the PATH.
+        For clang, the tool of the same major version is preferred, as the raw profile format depends on it.
+        """
+        tool = self.conf.get(f"user.llvm-core:{name.replace('-', '_')}", check_type=str)
+        if tool:
+            return shutil.which(tool)
+        candidates = []
+        compiler = self.conf.get("tools.build:compiler_executables", default={}, check_type=dict).get("cpp") or os.getenv("CXX")
+        compiler = shutil.which(compiler) if compiler else None
+        if compiler:
+            candidates.append(os.path.join(os.path.dirname(compiler), name))
+        if self.settings.compiler == "clang":
+            candidates.append(f"{name}-{Version(self.settings.compiler.version).major}")
+        candidates.append(name)
+        for candidate in candidates:
+            tool = shutil.which(candidate)
+            if tool:
+                return tool
+        if self.settings.compiler == "apple-clang":
+            try:
+                return XCRun(self).find(name)
+            except ConanException:
+                pass
+        return None
+
     @property
     def _targets_to_build(self):
         return self.options.targets if self.options.targets != "all" else self._all_targets
@@ -390,6 +484,11 @@ class LLVMCoreConan(ConanFile):
         else:
             cmake_variables["LLVM_USE_SANITIZER"] = self.options.use_sanitizer
 
+        if self._bolt:
+            # keeps the relocations, so that llvm-bolt can reorder the functions
+            tc.extra_exelinkflags.append("-Wl,--emit-relocs")
+            tc.extra_sharedlinkflags.append("-Wl,--emit-relocs")
+
         if self.settings.os == "Linux":
             # Workaround for: https://github.com/conan-io/conan/issues/13560
             libdirs_host = [l for dependency in self.dependencies.host.values() for l in dependency.cpp_info.aggregated_components().libdirs]
@@ -424,11 +523,127 @@ class LLVMCoreConan(ConanFile):
             set(GRAPHVIZ_IGNORE_TARGETS "{';'.join(exclude_patterns)}")
         """)
         save(self, PurePosixPath(self.build_folder) / "CMakeGraphVizOptions.cmake", graphviz_options)
-        if Version(self.version) < 18:
-            cmake.configure(cli_args=graphviz_args)
+
+        if self._pgo:
+            profile = self._pgo_train(cmake, graphviz_args)
+            self._configure(cmake, graphviz_args, {"LLVM_BUILD_INSTRUMENTED": "OFF", "LLVM_PROFDATA_FILE": profile})
         else:
-            cmake.configure(build_script_folder="llvm-main", cli_args=graphviz_args)
+            self._configure(cmake, graphviz_args)
         cmake.build()
+        if self._bolt:
+            self._bolt_optimize()
+        save(self, self._optimizations_file, json.dumps({"pgo": self._pgo, "bolt": self._bolt}))
+
+    def _configure(self, cmake, cli_args, variables=None):
+        if Version(self.version) < 18:
+            cmake.configure(variables=variables, cli_args=cli_args)
+        else:
+            cmake.configure(build_script_folder="llvm-main", variables=variables, cli_args=cli_args)
+
+    @property
+    def _training_folder(self):
+        return os.path.join(self.build_folder, "conan-training")
+
+    @property
+    def _optimizations_file(self):
+        return os.path.join(self._training_folder, "optimizations.json")
+
+    @property
+    def _native_target(self):
+        return {
+            "x86": "X86",
+            "x86_64": "X86",
+            "armv7": "ARM",
+            "armv8": "AArch64",
+            "ppc64": "PowerPC",
+            "ppc64le": "PowerPC",
+            "riscv64": "RISCV",
+            "s390x": "SystemZ",
+        }.get(str(self.settings.arch))
+
+    def _train(self):
+        """
+        Runs opt, and llc when the native target is built, from the build tree over the IR corpus in pgo/
+        """
+        bin_folder = os.path.join(self.build_folder, "bin")
+        opt = os.path.join(bin_folder, "opt")
+        llc = os.path.join(bin_folder, "llc")
+        run_llc = self._native_target in str(self._targets_to_build).split(";")
+        output_folder = os.path.join(self._training_folder, "output")
+        mkdir(self, output_folder)
+        for ir_file in sorted(glob(os.path.join(self.export_sources_folder, "pgo", "*.ll"))):
+            name = os.path.splitext(os.path.basename(ir_file))[0]
+            for level in ("-O1", "-O2", "-O3"):
+                optimized = os.path.join(output_folder, f"{name}{level}.ll")
+                self.run(f'"{opt}" {level} -S "{ir_file}" -o "{optimized}"')
+                if run_llc:
+                    self.run(f'"{llc}" {level} "{optimized}" -o "{optimized}.s"')
+                    self.run(f'"{llc}" {level} -filetype=obj "{optimized}" -o "{optimized}.o"')
+
+    def _pgo_train(self, cmake, cli_args):
+        """
+        Builds instrumented opt and llc, runs the training and merges the raw profiles.
+        Returns the path of the merged profile.
+        """
+        llvm_profdata = self._find_llvm_tool("llvm-profdata")
+        raw_folder = os.path.join(self._training_folder, "profiles")
+        rmdir(self, raw_folder)
+        self.output.info("Building instrumented opt and llc for PGO")
+        self._configure(cmake, cli_args, {"LLVM_BUILD_INSTRUMENTED": "IR", "LLVM_PROFILE_DATA_DIR": raw_folder})
+        cmake.build(target="opt")
+        cmake.build(target="llc")
+        env = Environment()
+        env.define("LLVM_PROFILE_FILE", os.path.join(raw_folder, "%p-%m.profraw"))
+        with env.vars(self).apply():
+            self._train()
+        raw_profiles = glob(os.path.join(raw_folder, "*.profraw"))
+        if not raw_profiles:
+            raise ConanException("The PGO training did not write any profile")
+        profile = os.path.join(self._training_folder, "llvm-core.profdata")
+        raw_profiles = " ".join(f'"{raw_profile}"' for raw_profile in raw_profiles)
+        self.run(f'"{llvm_profdata}" merge -output="{profile}" {raw_profiles}')
+        return profile
+
+    @property
+    def _bolt_binaries(self):
+        binaries = [os.path.join(self.build_folder, "bin", tool) for tool in ("opt", "llc")]
+        if self.options.shared:
+            binaries.extend(library for library in glob(os.path.join(self.build_folder, "lib", "libLLVM*.so*"))
+                            if not os.path.islink(library))
+        return binaries
+
+    def _bolt_optimize(self):
+        """
+        Instruments the binaries with llvm-bolt, runs the training with them, and rewrites them with the code
+        layout of the collected profile.
+        """
+        llvm_bolt = self._find_llvm_tool("llvm-bolt")
+        merge_fdata = self._find_llvm_tool("merge-fdata")
+        bolt_folder = os.path.join(self._training_folder, "bolt")
+        rmdir(self, bolt_folder)
+        mkdir(self, bolt_folder)
+        binaries = self._bolt_binaries
+        for binary in binaries:
+            # a rebuild after a failed step starts again from the binaries as linked
+            if not os.path.exists(f"{binary}.orig"):
+                rename(self, binary, f"{binary}.orig")
+        for binary in binaries:
+            fdata = os.path.join(bolt_folder, os.path.basename(binary))
+            self.run(f'"{llvm_bolt}" "{binary}.orig" -o "{binary}" -instrument '
+                     f'--instrumentation-file="{fdata}" --instrumentation-file-append-pid')
+        self._train()
+        for binary in binaries:
+            name = os.path.basename(binary)
+            profiles = glob(os.path.join(bolt_folder, f"{name}.*.fdata"))
+            if not profiles:
+                raise ConanException(f"The BOLT training did not write any profile for {name}")
+            merged = os.path.join(bolt_folder, f"{name}.merged.fdata")
+            profiles = " ".join(f'"{profile}"' for profile in profiles)
+            self.run(f'"{merge_fdata}" {profiles} -o "{merged}"')
+            self.run(f'"{llvm_bolt}" "{binary}.orig" -o "{binary}" -data="{merged}" -reorder-blocks=ext-tsp '
+                     "-reorder-functions=hfsort -split-functions -split-all-cold -icf=1 -use-gnu-stack")
+        for binary in binaries:
+            os.remove(f"{binary}.orig")
 
     @property
     def _package_folder_path(self):
@@ -447,7 +662,9 @@ class LLVMCoreConan(ConanFile):
 
         return {
             "components": components,
-            "native_arch": re.search(r"""^set\(LLVM_NATIVE_ARCH (\S*)\)$""", cmake_config, re.MULTILINE).group(1)
+            "native_arch": re.search(r"""^set\(LLVM_NATIVE_ARCH (\S*)\)$""", cmake_config, re.MULTILINE).group(1),
+            # what was applied, which is also what the package id records, see validate_build()
+            "optimizations": json.loads(load(self, self._optimizations_file)),
         }
 
     @property
@@ -0,0 +1,160 @@
+; A small bytecode interpreter: a dispatch switch, struct accesses, calls and string handling,
+; which is the control flow heavy code a JIT typically compiles.
+
+%struct.vm = type { i64*, i32, i32, i64 }
+%struct.entry = type { i8*, i64, %struct.entry* }
+
+@.names = private unnamed_addr constant [4 x [8 x i8]] [[8 x i8] c"push\00\00\00\00", [8 x i8] c"add\00\00\00\00\00", [8 x i8] c"mul\00\00\00\00\00", [8 x i8] c"halt\00\00\00\00"], align 1
+
+declare i8* @malloc(i64)
+declare void @free(i8*)
+declare void @llvm.memcpy.p0i8.p0i8.i64(i8* noalias nocapture writeonly, i8* noalias nocapture readonly, i64, i1 immarg)
+
+define internal void @push(%struct.vm* %vm, i64 %value) {
+  %stack.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 0
+  %stack = load i64*, i64** %stack.ptr, align 8
+  %top.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 1
+  %top = load i32, i32* %top.ptr, align 4
+  %index = sext i32 %top to i64
+  %slot = getelementptr inbounds i64, i64* %stack, i64 %index
+  store i64 %value, i64* %slot, align 8
+  %top.next = add nsw i32 %top, 1
+  store i32 %top.next, i32* %top.ptr, align 4
+  ret void
+}
+
+define internal i64 @pop(%struct.vm* %vm) {
+  %stack.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 0
+  %stack = load i64*, i64** %stack.ptr, align 8
+  %top.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 1
+  %top = load i32, i32* %top.ptr, align 4
+  %top.next = add nsw i32 %top, -1
+  store i32 %top.next, i32* %top.ptr, align 4
+  %index = sext i32 %top.next to i64
+  %slot = getelementptr inbounds i64, i64* %stack, i64 %index
+  %value = load i64, i64* %slot, align 8
+  ret i64 %value
+}
+
+; opcodes: 0 push immediate, 1 add, 2 mul, 3 halt, anything else is an error
+define i64 @run(i8* %code, i64 %length) {
+entry:
+  %vm = alloca %struct.vm, align 8
+  %memory = call i8* @malloc(i64 2048)
+  %stack = bitcast i8* %memory to i64*
+  %stack.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 0
+  store i64* %stack, i64** %stack.ptr, align 8
+  %top.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 1
+  store i32 0, i32* %top.ptr, align 4
+  %steps.ptr = getelementptr inbounds %struct.vm, %struct.vm* %vm, i32 0, i32 3
+  store i64 0, i64* %steps.ptr, align 8
+  br label %dispatch
+
+dispatch:
+  %pc = phi i64 [ 0, %entry ], [ %pc.next, %continue ], [ %pc.immediate, %push ]
+  %end = icmp uge i64 %pc, %length
+  br i1 %end, label %halt, label %fetch
+
+fetch:
+  %op.ptr = getelementptr inbounds i8, i8* %code, i64 %pc
+  %op = load i8, i8* %op.ptr, align 1
+  %steps = load i64, i64* %steps.ptr, align 8
+  %steps.next = add i64 %steps, 1
+  store i64 %steps.next, i64* %steps.ptr, align 8
+  %pc.next = add i64 %pc, 1
+  switch i8 %op, label %error [
+    i8 0, label %push
+    i8 1, label %add
+    i8 2, label %mul
+    i8 3, label %halt
+  ]
+
+push:
+  %imm.ptr = getelementptr inbounds i8, i8* %code, i64 %pc.next
+  %imm = load i8, i8* %imm.ptr, align 1
+  %imm.ext = zext i8 %imm to i64
+  call void @push(%struct.vm* %vm, i64 %imm.ext)
+  %pc.immediate = add i64 %pc, 2
+  br label %dispatch
+
+add:
+  %a1 = call i64 @pop(%struct.vm* %vm)
+  %b1 = call i64 @pop(%struct.vm* %vm)
+  %sum = add i64 %a1, %b1
+  call void @push(%struct.vm* %vm, i64 %sum)
+  br label %continue
+
+mul:
+  %a2 = call i64 @pop(%struct.vm* %vm)
+  %b2 = call i64 @pop(%struct.vm* %vm)
+  %product = mul i64 %a2, %b2
+  call void @push(%struct.vm* %vm, i64 %product)
+  br label %continue
+
+continue:
+  br label %dispatch
+
+error:
+  call void @free(i8* %memory)
+  ret i64 -1
+
+halt:
+  %top = load i32, i32* %top.ptr, align 4
+  %has.result = icmp sgt i32 %top, 0
+  br i1 %has.result, label %result, label %empty
+
+result:
+  %value = call i64 @pop(%struct.vm* %vm)
+  call void @free(i8* %memory)
+  ret i64 %value
+
+empty:
+  call void @free(i8* %memory)
+  ret i64 0
+}
+
+; FNV-1a over a NUL terminated string
+define i64 @hash(i8* %string) {
+entry:
+  br label %loop
+
+loop:
+  %p = phi i8* [ %string, %entry ], [ %p.next, %body ]
+  %h = phi i64 [ -3750763034362895579, %entry ], [ %h.next, %body ]
+  %c = load i8, i8* %p, align 1
+  %end = icmp eq i8 %c, 0
+  br i1 %end, label %exit, label %body
+
+body:
+  %c.ext = zext i8 %c to i64
+  %x = xor i64 %h, %c.ext
+  %h.next = mul i64 %x, 1099511628211
+  %p.next = getelementptr inbounds i8, i8* %p, i64 1
+  br label %loop
+
+exit:
+  ret i64 %h
+}
+
+define %struct.entry* @insert(%struct.entry* %head, i8* %key, i64 %length) {
+  %memory = call i8* @malloc(i64 24)
+  %node = bitcast i8* %memory to %struct.entry*
+  %copy = call i8* @malloc(i64 %length)
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %copy, i8* %key, i64 %length, i1 false)
+  %key.ptr = getelementptr inbounds %struct.entry, %struct.entry* %node, i32 0, i32 0
+  store i8* %copy, i8** %key.ptr, align 8
+  %hash = call i64 @hash(i8* %copy)
+  %hash.ptr = getelementptr inbounds %struct.entry, %struct.entry* %node, i32 0, i32 1
+  store i64 %hash, i64* %hash.ptr, align 8
+  %next.ptr = getelementptr inbounds %struct.entry, %struct.entry* %node, i32 0, i32 2
+  store %struct.entry* %head, %struct.entry** %next.ptr, align 8
+  ret %struct.entry* %node
+}
+
+define i8* @opcode_name(i32 %op) {
+  %valid = icmp ult i32 %op, 4
+  %index = select i1 %valid, i32 %op, i32 3
+  %index.ext = zext i32 %index to i64
+  %name = getelementptr inbounds [4 x [8 x i8]], [4 x [8 x i8]]* @.names, i64 0, i64 %index.ext, i64 0
+  ret i8* %name
+}
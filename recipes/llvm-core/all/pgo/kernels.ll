@@ -0,0 +1,139 @@
+; Numeric kernels: loops the vectorizer, unroller and scheduler work on.
+; Typed pointers are used, so the corpus parses with every LLVM version of the recipe.
+
+define double @dot(double* %a, double* %b, i64 %n) {
+entry:
+  %empty = icmp eq i64 %n, 0
+  br i1 %empty, label %exit, label %loop
+
+loop:
+  %i = phi i64 [ 0, %entry ], [ %next, %loop ]
+  %sum = phi double [ 0.0, %entry ], [ %acc, %loop ]
+  %pa = getelementptr inbounds double, double* %a, i64 %i
+  %pb = getelementptr inbounds double, double* %b, i64 %i
+  %va = load double, double* %pa, align 8
+  %vb = load double, double* %pb, align 8
+  %mul = fmul fast double %va, %vb
+  %acc = fadd fast double %sum, %mul
+  %next = add nuw i64 %i, 1
+  %done = icmp eq i64 %next, %n
+  br i1 %done, label %exit, label %loop
+
+exit:
+  %result = phi double [ 0.0, %entry ], [ %acc, %loop ]
+  ret double %result
+}
+
+; c[i][j] += a[i][k] * b[k][j], row major n x n
+define void @matmul(float* noalias %a, float* noalias %b, float* noalias %c, i64 %n) {
+entry:
+  %empty = icmp eq i64 %n, 0
+  br i1 %empty, label %exit, label %loop.i
+
+loop.i:
+  %i = phi i64 [ 0, %entry ], [ %i.next, %latch.i ]
+  %row = mul i64 %i, %n
+  br label %loop.k
+
+loop.k:
+  %k = phi i64 [ 0, %loop.i ], [ %k.next, %latch.k ]
+  %aik.index = add i64 %row, %k
+  %aik.ptr = getelementptr inbounds float, float* %a, i64 %aik.index
+  %aik = load float, float* %aik.ptr, align 4
+  %brow = mul i64 %k, %n
+  br label %loop.j
+
+loop.j:
+  %j = phi i64 [ 0, %loop.k ], [ %j.next, %loop.j ]
+  %bkj.index = add i64 %brow, %j
+  %bkj.ptr = getelementptr inbounds float, float* %b, i64 %bkj.index
+  %bkj = load float, float* %bkj.ptr, align 4
+  %cij.index = add i64 %row, %j
+  %cij.ptr = getelementptr inbounds float, float* %c, i64 %cij.index
+  %cij = load float, float* %cij.ptr, align 4
+  %prod = fmul float %aik, %bkj
+  %sum = fadd float %cij, %prod
+  store float %sum, float* %cij.ptr, align 4
+  %j.next = add nuw i64 %j, 1
+  %j.done = icmp eq i64 %j.next, %n
+  br i1 %j.done, label %latch.k, label %loop.j
+
+latch.k:
+  %k.next = add nuw i64 %k, 1
+  %k.done = icmp eq i64 %k.next, %n
+  br i1 %k.done, label %latch.i, label %loop.k
+
+latch.i:
+  %i.next = add nuw i64 %i, 1
+  %i.done = icmp eq i64 %i.next, %n
+  br i1 %i.done, label %exit, label %loop.i
+
+exit:
+  ret void
+}
+
+define void @saxpy(i32 %n, float %alpha, float* noalias %x, float* noalias %y) {
+entry:
+  %positive = icmp sgt i32 %n, 0
+  br i1 %positive, label %loop, label %exit
+
+loop:
+  %i = phi i32 [ 0, %entry ], [ %next, %loop ]
+  %index = sext i32 %i to i64
+  %px = getelementptr inbounds float, float* %x, i64 %index
+  %py = getelementptr inbounds float, float* %y, i64 %index
+  %vx = load float, float* %px, align 4
+  %vy = load float, float* %py, align 4
+  %scaled = fmul float %alpha, %vx
+  %sum = fadd float %scaled, %vy
+  store float %sum, float* %py, align 4
+  %next = add nsw i32 %i, 1
+  %done = icmp eq i32 %next, %n
+  br i1 %done, label %exit, label %loop
+
+exit:
+  ret void
+}
+
+define <4 x i32> @mix(<4 x i32> %a, <4 x i32> %b) {
+  %sum = add <4 x i32> %a, %b
+  %shuffled = shufflevector <4 x i32> %sum, <4 x i32> %b, <4 x i32> <i32 3, i32 6, i32 1, i32 4>
+  %rotated = shl <4 x i32> %shuffled, <i32 1, i32 2, i32 3, i32 4>
+  %mixed = xor <4 x i32> %rotated, %a
+  ret <4 x i32> %mixed
+}
+
+define i64 @fib(i64 %n) {
+entry:
+  %small = icmp ult i64 %n, 2
+  br i1 %small, label %base, label %recurse
+
+base:
+  ret i64 %n
+
+recurse:
+  %n1 = sub i64 %n, 1
+  %n2 = sub i64 %n, 2
+  %f1 = call i64 @fib(i64 %n1)
+  %f2 = call i64 @fib(i64 %n2)
+  %f = add i64 %f1, %f2
+  ret i64 %f
+}
+
+define i32 @gcd(i32 %a, i32 %b) {
+entry:
+  br label %loop
+
+loop:
+  %x = phi i32 [ %a, %entry ], [ %y, %body ]
+  %y = phi i32 [ %b, %entry ], [ %r, %body ]
+  %zero = icmp eq i32 %y, 0
+  br i1 %zero, label %exit, label %body
+
+body:
+  %r = urem i32 %x, %y
+  br label %loop
+
+exit:
+  ret i32 %x
+}
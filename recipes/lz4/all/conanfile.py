@@ -1,4 +1,5 @@
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, rmdir, save
 from conan.tools.microsoft import is_msvc
@@ -21,10 +22,23 @@ class LZ4Conan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # Tuning macros of lz4.c, "auto" keeps the upstream choice for the target
+        "heapmode": [True, False],
+        "memory_usage": list(range(10, 21)),
+        "fast_dec_loop": ["auto", True, False],
+        "force_memory_access": ["auto", 0, 1, 2],
+        "build_programs": [True, False],
+        "programs_threads": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "heapmode": False,
+        "memory_usage": 14,
+        "fast_dec_loop": "auto",
+        "force_memory_access": "auto",
+        "build_programs": False,
+        "programs_threads": True,
     }
 
     def export_sources(self):
@@ -33,27 +47,52 @@ class LZ4Conan(ConanFile):
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        if Version(self.version) < "1.10.0":
+            # multithreaded compression was added to the lz4 CLI in 1.10.0
+            del self.options.programs_threads
 
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if not self.options.build_programs:
+            self.options.rm_safe("programs_threads")
         self.settings.rm_safe("compiler.cppstd")
         self.settings.rm_safe("compiler.libcxx")
 
     def layout(self):
         cmake_layout(self, src_folder="src")
 
+    def validate(self):
+        if self.options.force_memory_access == 1 and is_msvc(self):
+            raise ConanInvalidConfiguration("force_memory_access=1 relies on the packed attribute of GCC compatible compilers")
+        if self.options.force_memory_access == 2 and str(self.settings.arch).startswith(("armv4", "armv5", "mips", "sparc")):
+            raise ConanInvalidConfiguration(f"force_memory_access=2 needs unaligned memory accesses, which {self.settings.arch} does not support")
+        if int(self.options.memory_usage) >= 20 and not self.options.heapmode:
+            # LZ4_compress_default() would put a state of more than 1 MiB on the stack
+            raise ConanInvalidConfiguration("memory_usage=20 requires heapmode=True")
+
     def source(self):
         get(self, **self.conan_data["sources"][self.version],
             destination=self.source_folder, strip_root=True)
 
     def generate(self):
         tc = CMakeToolchain(self)
-        tc.variables["LZ4_BUILD_CLI"] = False
+        tc.variables["LZ4_BUILD_CLI"] = self.options.build_programs
         if Version(self.version) < "1.10.0":
             tc.variables["LZ4_BUILD_LEGACY_LZ4C"] = False
         tc.variables["LZ4_BUNDLED_MODE"] = False
         tc.variables["LZ4_POSITION_INDEPENDENT_LIB"] = self.options.get_safe("fPIC", True)
+        tc.preprocessor_definitions["LZ4_HEAPMODE"] = 1 if self.options.heapmode else 0
+        tc.preprocessor_definitions["LZ4_MEMORY_USAGE"] = self.options.memory_usage
+        if self.options.fast_dec_loop != "auto":
+            tc.preprocessor_definitions["LZ4_FAST_DEC_LOOP"] = 1 if self.options.fast_dec_loop else 0
+        if self.options.force_memory_access != "auto":
+            tc.preprocessor_definitions["LZ4_FORCE_MEMORY_ACCESS"] = self.options.force_memory_access
+        if self.options.get_safe("programs_threads") is not None:
+            # The CLI only compresses with several threads on POSIX systems when built with LZ4IO_MULTITHREAD
+            tc.preprocessor_definitions["LZ4IO_MULTITHREAD"] = 1 if self.options.programs_threads else 0
+            if self.options.programs_threads and self.settings.os in ["Linux", "FreeBSD"]:
+                tc.extra_exelinkflags.append("-pthread")
         # Generate a relocatable shared lib on Macos
         tc.cache_variables["CMAKE_POLICY_DEFAULT_CMP0042"] = "NEW"
         # Honor BUILD_SHARED_LIBS (see https://github.com/conan-io/conan/issues/11840)
@@ -94,3 +133,6 @@ class LZ4Conan(ConanFile):
         self.cpp_info.libs = ["lz4"]
         if is_msvc(self) and self.options.shared:
             self.cpp_info.defines.append("LZ4_DLL_IMPORT=1")
+        if self.options.memory_usage != 14:
+            # The size of LZ4_stream_t in lz4.h depends on it, consumers must see the same value
+            self.cpp_info.defines.append(f"LZ4_MEMORY_USAGE={self.options.memory_usage}")
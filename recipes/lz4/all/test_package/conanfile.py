@@ -30,3 +30,5 @@ class TestPackageConan(ConanFile):
         if can_run(self):
             bin_path = os.path.join(self.cpp.build.bindirs[0], "test_package")
             self.run(bin_path, env="conanrun")
+            if self.dependencies["lz4"].options.build_programs:
+                self.run("lz4 --version", env="conanrun")
@@ -3,11 +3,32 @@
 
 
 #include <stdio.h>
+#include <string.h>
 #include "lz4.h"
 
 int main(int argc, char** argv)
 {
+    /* LZ4_stream_t is sized by LZ4_MEMORY_USAGE, which must match the one of the library */
+    LZ4_stream_t stream;
+    const char input[] = "LZ4 test_package, LZ4 test_package, LZ4 test_package";
+    char compressed[LZ4_COMPRESSBOUND(sizeof(input))];
+    char decompressed[sizeof(input)];
+    int compressed_size, decompressed_size;
+
 	(void)argc; (void)argv;
     printf("Hello World ! LZ4 Library version = %d\n", LZ4_versionNumber());
+    printf("LZ4_MEMORY_USAGE = %d, state size = %d\n", LZ4_MEMORY_USAGE, LZ4_sizeofState());
+    if (LZ4_sizeofState() != (int)sizeof(LZ4_stream_t)) {
+        fprintf(stderr, "LZ4_stream_t is %d bytes in the library and %d bytes here\n", LZ4_sizeofState(), (int)sizeof(LZ4_stream_t));
+        return 1;
+    }
+
+    LZ4_initStream(&stream, sizeof(stream));
+    compressed_size = LZ4_compress_fast_continue(&stream, input, compressed, (int)sizeof(input), (int)sizeof(compressed), 1);
+    decompressed_size = LZ4_decompress_safe(compressed, decompressed, compressed_size, (int)sizeof(decompressed));
+    if (decompressed_size != (int)sizeof(input) || memcmp(input, decompressed, sizeof(input)) != 0) {
+        fprintf(stderr, "LZ4 round trip failed\n");
+        return 1;
+    }
     return 0;
 }
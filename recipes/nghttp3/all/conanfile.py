@@ -81,3 +81,5 @@ class Nghttp3Conan(ConanFile):
             self.cpp_info.defines.append("NGHTTP3_STATICLIB")
 
         self.cpp_info.set_property("pkg_config_name", "nghttp3")
+        # name of the .pc file installed by upstream, looked up by libcurl's configure
+        self.cpp_info.set_property("pkg_config_aliases", ["libnghttp3"])
@@ -0,0 +1,129 @@
+from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
+from conan.tools.cmake import CMake, CMakeDeps, CMakeToolchain, cmake_layout
+from conan.tools.env import VirtualBuildEnv
+from conan.tools.files import copy, get, rmdir
+from conan.tools.scm import Version
+import os
+
+
+required_conan_version = ">=1.53.0"
+
+
+class Ngtcp2Conan(ConanFile):
+    name = "ngtcp2"
+    description = "ngtcp2 project is an effort to implement IETF QUIC protocol"
+    license = "MIT"
+    url = "https://github.com/conan-io/conan-center-index"
+    homepage = "https://nghttp2.org/ngtcp2/"
+    topics = ("quic", "http3", "udp", "transport")
+    package_type = "library"
+    settings = "os", "arch", "compiler", "build_type"
+    options = {
+        "shared": [True, False],
+        "fPIC": [True, False],
+        # TLS library used by the ngtcp2_crypto helper library, the QUIC core is TLS agnostic
+        "with_ssl": [False, "openssl", "wolfssl"],
+    }
+    default_options = {
+        "shared": False,
+        "fPIC": True,
+        "with_ssl": "openssl",
+    }
+
+    @property
+    def _crypto_backend(self):
+        # Suffix of the ngtcp2_crypto_<backend> library, "ossl" is the OpenSSL >= 3.5 QUIC TLS API
+        return {"openssl": "ossl", "wolfssl": "wolfssl"}.get(str(self.options.with_ssl))
+
+    def config_options(self):
+        if self.settings.os == "Windows":
+            del self.options.fPIC
+
+    def configure(self):
+        if self.options.shared:
+            self.options.rm_safe("fPIC")
+        self.settings.rm_safe("compiler.libcxx")
+        self.settings.rm_safe("compiler.cppstd")
+
+    def layout(self):
+        cmake_layout(self, src_folder="src")
+
+    def requirements(self):
+        if self.options.with_ssl == "openssl":
+            self.requires("openssl/[>=3.5 <4]")
+        elif self.options.with_ssl == "wolfssl":
+            self.requires("wolfssl/5.6.6")
+
+    def validate(self):
+        if self.options.with_ssl == "openssl" and Version(self.version) < "1.12.0":
+            raise ConanInvalidConfiguration(f"{self.ref} has no crypto helper for the OpenSSL QUIC TLS API, use version 1.12.0 or later")
+        if self.options.with_ssl == "wolfssl" and not self.dependencies["wolfssl"].options.get_safe("with_quic"):
+            raise ConanInvalidConfiguration("option with_ssl=wolfssl requires wolfssl/*:with_quic=True")
+
+    def build_requirements(self):
+        self.tool_requires("cmake/[>=3.20 <4]")
+
+    def source(self):
+        get(self, **self.conan_data["sources"][self.version], strip_root=True)
+
+    def generate(self):
+        from conan.tools.apple import is_apple_os
+
+        tc = CMakeToolchain(self)
+        tc.variables["ENABLE_SHARED_LIB"] = self.options.shared
+        tc.variables["ENABLE_STATIC_LIB"] = not self.options.shared
+        tc.variables["ENABLE_LIB_ONLY"] = True
+        # Only build the crypto helper of the requested TLS library, never the ones found on the system
+        tc.variables["ENABLE_OPENSSL"] = self.options.with_ssl == "openssl"
+        tc.variables["ENABLE_WOLFSSL"] = self.options.with_ssl == "wolfssl"
+        tc.variables["ENABLE_QUICTLS"] = False
+        tc.variables["ENABLE_LIBRESSL"] = False
+        tc.variables["ENABLE_GNUTLS"] = False
+        tc.variables["ENABLE_BORINGSSL"] = False
+        tc.variables["ENABLE_PICOTLS"] = False
+        if is_apple_os(self):
+            # workaround for: install TARGETS given no BUNDLE DESTINATION for MACOSX_BUNDLE executable
+            tc.cache_variables["CMAKE_MACOSX_BUNDLE"] = False
+        tc.variables["BUILD_TESTING"] = False
+        tc.generate()
+        deps = CMakeDeps(self)
+        deps.set_property("wolfssl", "cmake_additional_variables_prefixes", ["WOLFSSL"])
+        deps.generate()
+        tc = VirtualBuildEnv(self)
+        tc.generate(scope="build")
+
+    def build(self):
+        cmake = CMake(self)
+        cmake.configure()
+        cmake.build()
+
+    def package(self):
+        copy(self, pattern="COPYING", dst=os.path.join(self.package_folder, "licenses"), src=self.source_folder)
+        cmake = CMake(self)
+        cmake.install()
+        rmdir(self, os.path.join(self.package_folder, "share"))
+        rmdir(self, os.path.join(self.package_folder, "lib", "pkgconfig"))
+        rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
+
+    def package_info(self):
+        self.cpp_info.set_property("cmake_file_name", "ngtcp2")
+
+        self.cpp_info.components["ngtcp2"].set_property("cmake_target_name", "ngtcp2::ngtcp2")
+        self.cpp_info.components["ngtcp2"].set_property("pkg_config_name", "libngtcp2")
+        self.cpp_info.components["ngtcp2"].libs = ["ngtcp2"]
+        if self.settings.os == "Windows" and not self.options.shared:
+            self.cpp_info.components["ngtcp2"].defines.append("NGTCP2_STATICLIB")
+
+        if self.options.with_ssl:
+            crypto = f"ngtcp2_crypto_{self._crypto_backend}"
+            self.cpp_info.components[crypto].set_property("cmake_target_name", f"ngtcp2::{crypto}")
+            self.cpp_info.components[crypto].set_property("pkg_config_name", f"lib{crypto}")
+            self.cpp_info.components[crypto].libs = [crypto]
+            self.cpp_info.components[crypto].requires = ["ngtcp2"]
+            if self.options.with_ssl == "openssl":
+                self.cpp_info.components[crypto].requires.extend(["openssl::ssl", "openssl::crypto"])
+            else:
+                self.cpp_info.components[crypto].requires.append("wolfssl::wolfssl")
+            if self.settings.os == "Windows" and not self.options.shared:
+                self.cpp_info.components[crypto].defines.append("NGTCP2_STATICLIB")
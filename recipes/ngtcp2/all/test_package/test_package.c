@@ -0,0 +1,40 @@
+#include <stdio.h>
+
+#include <ngtcp2/ngtcp2.h>
+#if defined(TEST_NGTCP2_CRYPTO_OSSL)
+#include <ngtcp2/ngtcp2_crypto_ossl.h>
+#elif defined(TEST_NGTCP2_CRYPTO_WOLFSSL)
+#include <wolfssl/options.h>
+#include <wolfssl/ssl.h>
+#include <ngtcp2/ngtcp2_crypto_wolfssl.h>
+#endif
+
+int main(void)
+{
+    const ngtcp2_info *info = ngtcp2_version(0);
+    if (info == NULL) {
+        printf("ngtcp2: cannot get version\n");
+        return 1;
+    }
+    printf("ngtcp2 ver=%d version=%s\n", info->version_num, info->version_str);
+
+#if defined(TEST_NGTCP2_CRYPTO_OSSL)
+    if (ngtcp2_crypto_ossl_init() != 0) {
+        printf("ngtcp2_crypto_ossl: initialization failed\n");
+        return 1;
+    }
+    printf("ngtcp2_crypto_ossl: initialized\n");
+#elif defined(TEST_NGTCP2_CRYPTO_WOLFSSL)
+    {
+        WOLFSSL_CTX *ctx = wolfSSL_CTX_new(wolfTLSv1_3_client_method());
+        int result = ctx != NULL ? ngtcp2_crypto_wolfssl_configure_client_context(ctx) : -1;
+        wolfSSL_CTX_free(ctx);
+        if (result != 0) {
+            printf("ngtcp2_crypto_wolfssl: cannot configure a client context\n");
+            return 1;
+        }
+        printf("ngtcp2_crypto_wolfssl: client context configured\n");
+    }
+#endif
+    return 0;
+}
@@ -76,7 +76,11 @@ class OpenblasConan(ConanFile):
         "use_thread": [True, False],
         "use_locking": [True, False],
         "dynamic_arch": [True, False],
-        "target": [None] + available_openblas_targets
+        "target": [None] + available_openblas_targets,
+        "use_openmp": [True, False],
+        "num_threads": [None, "ANY"],
+        "num_parallel": ["ANY"],
+        "buffer_size": [None] + list(range(20, 31)),
     }
     default_options = {
         "shared": False,
@@ -87,6 +91,10 @@ class OpenblasConan(ConanFile):
         "use_locking": True,
         "dynamic_arch": False,
         "target": None,
+        "use_openmp": False,
+        "num_threads": 256,
+        "num_parallel": 1,
+        "buffer_size": None,
     }
     options_description = {
         "build_lapack": "Build LAPACK and LAPACKE",
@@ -95,6 +103,11 @@ class OpenblasConan(ConanFile):
         "use_locking": "Use locks even in single-threaded builds to make them callable from multiple threads",
         "dynamic_arch": "Include support for multiple CPU targets, with automatic selection at runtime (x86/x86_64, aarch64 or ppc only)",
         "target": "OpenBLAS TARGET variable (see TargetList.txt)",
+        "use_openmp": "Use OpenMP instead of the pthreads based thread server",
+        "num_threads": "Maximum number of threads (NUM_THREADS), also the limit of OPENBLAS_NUM_THREADS at runtime. "
+                       "The default covers hosts of up to 256 logical processors, None compiles in the number of processors of the build machine",
+        "num_parallel": "Maximum number of OpenMP parallel regions allowed to call OpenBLAS concurrently (NUM_PARALLEL)",
+        "buffer_size": "Size of the per-thread buffer as a power of 2 (BUFFERSIZE), the default depends on the target",
     }
     short_paths = True
 
@@ -112,6 +125,8 @@ class OpenblasConan(ConanFile):
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+        if not self.options.use_openmp:
+            self.options.rm_safe("num_parallel")
 
         # When cross-compiling, OpenBLAS requires explicitly setting TARGET
         if cross_building(self, skip_x64_x86=True) and not self.options.target:
@@ -132,6 +147,15 @@ class OpenblasConan(ConanFile):
             if self.settings.compiler not in ["gcc", "clang"]:
                 # ld: unknown option: --allow-multiple-definition on apple-clang
                 raise ConanInvalidConfiguration(f'"{self.name}/*:build_relapack=True" option is only supported for GCC and Clang')
+        if self.options.use_openmp:
+            if not self.options.use_thread:
+                raise ConanInvalidConfiguration(f'"{self.name}/*:use_openmp=True" option requires "{self.name}/*:use_thread=True"')
+            if self.settings.compiler == "apple-clang":
+                raise ConanInvalidConfiguration(f'"{self.name}/*:use_openmp=True" option is not supported with apple-clang, which has no OpenMP runtime')
+        for option in ("num_threads", "num_parallel"):
+            value = str(self.options.get_safe(option, 1))
+            if value != "None" and (not value.isdigit() or int(value) < 1):
+                raise ConanInvalidConfiguration(f'"{self.name}/*:{option}" option must be a positive integer, got "{value}"')
 
     def validate_build(self):
         # If we're cross-compiling, and the user didn't provide the target, and
@@ -164,6 +188,14 @@ class OpenblasConan(ConanFile):
         tc.variables["DYNAMIC_ARCH"] = self.options.dynamic_arch
         tc.variables["USE_THREAD"] = self.options.use_thread
         tc.variables["USE_LOCKING"] = self.options.use_locking
+        tc.variables["USE_OPENMP"] = self.options.use_openmp
+        # Otherwise the number of cores of the build machine is compiled in as the ceiling
+        if self.options.num_threads:
+            tc.variables["NUM_THREADS"] = int(self.options.num_threads)
+        if self.options.get_safe("num_parallel"):
+            tc.variables["NUM_PARALLEL"] = int(self.options.num_parallel)
+        if self.options.buffer_size:
+            tc.variables["BUFFERSIZE"] = int(self.options.buffer_size)
 
         tc.variables["MSVC_STATIC_CRT"] = is_msvc_static_runtime(self)
 
@@ -203,12 +235,14 @@ class OpenblasConan(ConanFile):
         # CMake config file:
         # - OpenBLAS always has one and only one of these components: openmp, pthread or serial.
         # - Whatever if this component is requested or not, official CMake imported target is always OpenBLAS::OpenBLAS
-        # - TODO: add openmp component when implemented in this recipe
         self.cpp_info.set_property("cmake_file_name", "OpenBLAS")
         self.cpp_info.set_property("cmake_target_name", "OpenBLAS::OpenBLAS")
         self.cpp_info.set_property("pkg_config_name", "openblas")
         # 'pthread' causes issues without namespace
-        cmake_component_name = "pthread" if self.options.use_thread else "serial"  # TODO: how to model this in CMakeDeps?
+        if self.options.use_openmp:
+            cmake_component_name = "openmp"
+        else:
+            cmake_component_name = "pthread" if self.options.use_thread else "serial"  # TODO: how to model this in CMakeDeps?
         self.cpp_info.components["openblas_component"].set_property("cmake_target_name", f"OpenBLAS::{cmake_component_name}")
         self.cpp_info.components["openblas_component"].set_property("pkg_config_name", "openblas")
         self.cpp_info.components["openblas_component"].includedirs.append(os.path.join("include", "openblas"))
@@ -219,6 +253,10 @@ class OpenblasConan(ConanFile):
                 self.cpp_info.components["openblas_component"].system_libs.append("pthread")
             if self.options.build_lapack and self._fortran_compiler:
                 self.cpp_info.components["openblas_component"].system_libs.append("gfortran")
+        if self.options.use_openmp and not self.options.shared and self.settings.compiler in ("gcc", "clang"):
+            # OpenMP runtime of the compiler (libgomp or libomp)
+            self.cpp_info.components["openblas_component"].exelinkflags.append("-fopenmp")
+            self.cpp_info.components["openblas_component"].sharedlinkflags.append("-fopenmp")
 
         self.buildenv_info.define_path("OpenBLAS_HOME", self.package_folder)
         self.runenv_info.define_path("OpenBLAS_HOME", self.package_folder)
@@ -0,0 +1,94 @@
+/*
+ * DGEMM benchmark of the test_package, only run when enabled by the conf (see conanfile.py).
+ * Multiplies square matrices of the given order, with 1, 2, 4... threads up to the number of
+ * cores, and prints one JSON result per thread count.
+ * Usage: benchmark [matrix order] [iterations]
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <cblas.h>
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+static double now(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+/* Deterministic values in [-1, 1), identical on every platform */
+static void fill_matrix(double *matrix, size_t count, unsigned long state) {
+    size_t i;
+    for (i = 0; i < count; ++i) {
+        state = (state * 1103515245UL + 12345UL) & 0xFFFFFFFFUL;
+        matrix[i] = (double)(state >> 8) / 8388608.0 - 1.0;
+    }
+}
+
+static void dgemm(int n, const double *a, const double *b, double *c) {
+    cblas_dgemm(CblasColMajor, CblasNoTrans, CblasNoTrans, n, n, n, 1.0, a, n, b, n, 0.0, c, n);
+}
+
+int main(int argc, char **argv) {
+    int n = argc > 1 ? atoi(argv[1]) : 1024;
+    int iterations = argc > 2 ? atoi(argv[2]) : 3;
+    int procs = openblas_get_num_procs();
+    size_t count = n > 0 ? (size_t)n * (size_t)n : 0;
+    double *a = (double *)malloc(count * sizeof(double));
+    double *b = (double *)malloc(count * sizeof(double));
+    double *c = (double *)malloc(count * sizeof(double));
+    int threads, iteration, result = EXIT_FAILURE;
+
+    if (a == NULL || b == NULL || c == NULL || n < 1 || iterations < 1) {
+        fprintf(stderr, "benchmark: invalid size or out of memory\n");
+        goto end;
+    }
+    fill_matrix(a, count, 1);
+    fill_matrix(b, count, 2);
+
+    for (threads = 1; threads <= procs; threads = threads * 2 > procs && threads < procs ? procs : threads * 2) {
+        double best = 0.0;
+        openblas_set_num_threads(threads);
+        /* starts the threads and touches the buffers */
+        dgemm(n, a, b, c);
+        for (iteration = 0; iteration < iterations; ++iteration) {
+            double start = now(), elapsed;
+            dgemm(n, a, b, c);
+            elapsed = now() - start;
+            if (iteration == 0 || elapsed < best) {
+                best = elapsed;
+            }
+        }
+        printf("{\"library\": \"openblas\", \"config\": \"%s\", \"core\": \"%s\", \"parallel\": %d, \"n\": %d, "
+               "\"threads\": %d, \"cores\": %d, \"gflops\": %.2f, \"iterations\": %d}\n",
+               openblas_get_config(), openblas_get_corename(), openblas_get_parallel(), n,
+               openblas_get_num_threads(), procs, 2.0 * n * n * (double)n / best / 1e9, iterations);
+        if (openblas_get_num_threads() < threads) {
+            /* serial build, or compiled in ceiling reached */
+            break;
+        }
+    }
+    result = EXIT_SUCCESS;
+
+end:
+    free(a);
+    free(b);
+    free(c);
+    return result;
+}
@@ -1,13 +1,13 @@
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import cmake_layout, CMake
+from conan.tools.cmake import cmake_layout, CMake, CMakeToolchain
 import os
 
 
 # It will become the standard on Conan 2.x
 class TestPackageConan(ConanFile):
     settings = "os", "arch", "compiler", "build_type"
-    generators = "CMakeDeps", "CMakeToolchain", "VirtualRunEnv"
+    generators = "CMakeDeps", "VirtualRunEnv"
     test_type = "explicit"
 
     def requirements(self):
@@ -16,6 +16,18 @@ class TestPackageConan(ConanFile):
     def layout(self):
         cmake_layout(self)
 
+    def generate(self):
+        openblas = self.dependencies["openblas"]
+        if openblas.options.get_safe("use_openmp"):
+            parallel = 2
+        else:
+            parallel = 1 if openblas.options.use_thread else 0
+        tc = CMakeToolchain(self)
+        tc.cache_variables["OPENBLAS_EXPECTED_PARALLEL"] = str(parallel)
+        # None: the number of cores of the build machine, not checked
+        tc.cache_variables["OPENBLAS_EXPECTED_NUM_THREADS"] = str(openblas.options.get_safe("num_threads") or 0)
+        tc.generate()
+
     def build(self):
         cmake = CMake(self)
         cmake.configure()
@@ -1,5 +1,39 @@
 #include <cblas.h>
 #include <stdio.h>
+#include <stdlib.h>
+
+#ifndef EXPECTED_PARALLEL
+#define EXPECTED_PARALLEL -1
+#endif
+#ifndef EXPECTED_NUM_THREADS
+#define EXPECTED_NUM_THREADS 0
+#endif
+
+// The threading backend (0: serial, 1: pthreads, 2: OpenMP) and the compiled in thread ceiling
+static int check_threading()
+{
+  const int parallel = openblas_get_parallel();
+  const int procs = openblas_get_num_procs();
+  int num_threads;
+
+  printf("%s, core %s, parallel %d, %d processor(s)\n", openblas_get_config(), openblas_get_corename(), parallel, procs);
+  if (EXPECTED_PARALLEL >= 0 && parallel != EXPECTED_PARALLEL) {
+    fprintf(stderr, "unexpected threading backend %d, expected %d\n", parallel, EXPECTED_PARALLEL);
+    return 1;
+  }
+  if (parallel != 0 && EXPECTED_NUM_THREADS > 0) {
+    // requests above the ceiling are capped to it
+    openblas_set_num_threads(EXPECTED_NUM_THREADS + 1);
+    num_threads = openblas_get_num_threads();
+    openblas_set_num_threads(procs);
+    printf("maximum number of threads: %d\n", num_threads);
+    if (num_threads != EXPECTED_NUM_THREADS) {
+      fprintf(stderr, "unexpected maximum number of threads %d, expected %d\n", num_threads, EXPECTED_NUM_THREADS);
+      return 1;
+    }
+  }
+  return 0;
+}
 
 int main()
 {
@@ -12,4 +46,6 @@ int main()
   for(i=0; i<9; i++)
     printf("%lf ", C[i]);
   printf("\n");
+
+  return check_threading() ? EXIT_FAILURE : EXIT_SUCCESS;
 }
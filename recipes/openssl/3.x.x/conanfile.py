@@ -1,8 +1,8 @@
 from conan import ConanFile
-from conan.errors import ConanInvalidConfiguration
+from conan.errors import ConanException, ConanInvalidConfiguration
 from conan.tools.apple import fix_apple_shared_install_name, is_apple_os, XCRun
 from conan.tools.build import build_jobs
-from conan.tools.files import chdir, copy, get, replace_in_file, rm, rmdir, save
+from conan.tools.files import chdir, copy, get, load, replace_in_file, rm, rmdir, save
 from conan.tools.gnu import AutotoolsToolchain
 from conan.tools.layout import basic_layout
 from conan.tools.microsoft import is_msvc, msvc_runtime_flag, unix_path
@@ -10,6 +10,7 @@ from conan.tools.scm import Version
 
 import fnmatch
 import os
+import re
 import textwrap
 
 required_conan_version = ">=1.57.0"
@@ -32,6 +33,8 @@ class OpenSSLConan(ConanFile):
         "capieng_dialog": [True, False],
         "enable_capieng": [True, False],
         "enable_trace": [True, False],
+        # kernel TLS offload (Linux, FreeBSD): also needs SSL_OP_ENABLE_KTLS at runtime
+        "enable_ktls": [True, False],
         "no_aria": [True, False],
         "no_apps": [True, False],
         "no_autoload_config": [True, False],
@@ -115,6 +118,8 @@ class OpenSSLConan(ConanFile):
             self.options.rm_safe("enable_capieng")
         else:
             self.options.rm_safe("fPIC")
+        if self.settings.os not in ["Linux", "FreeBSD"]:
+            self.options.rm_safe("enable_ktls")
 
     def configure(self):
         if self.options.shared:
@@ -128,10 +133,25 @@ class OpenSSLConan(ConanFile):
     def requirements(self):
         if not self.options.no_zlib:
             self.requires("zlib/[>=1.2.11 <2]")
+        if self.options.get_safe("enable_ktls") and self.settings.os == "Linux":
+            # <linux/tls.h>, not exposed by the public headers
+            self.requires("linux-headers-generic/6.5.9", visible=False)
 
     def validate(self):
         if self.settings.os == "iOS" and self.options.shared:
             raise ConanInvalidConfiguration("OpenSSL 3 does not support building shared libraries for iOS")
+        if self.options.no_threads and not self.options.no_async:
+            # Async jobs are only implemented with threads, without them ASYNC_is_capable() is always false
+            raise ConanInvalidConfiguration(f"{self.ref} option no_threads=True requires no_async=True")
+        if self.options.get_safe("enable_ktls"):
+            if self.options.no_sock:
+                raise ConanInvalidConfiguration(f"{self.ref} option enable_ktls requires no_sock=False")
+            if self.settings.os == "Linux":
+                linux_headers_version = self.dependencies["linux-headers-generic"].ref.version
+                if Version(linux_headers_version) < "4.13":
+                    raise ConanInvalidConfiguration(
+                        f"{self.ref} option enable_ktls requires Linux headers >= 4.13 (TLS ULP), "
+                        f"linux-headers-generic/{linux_headers_version} is too old")
 
     def build_requirements(self):
         if self.settings_build.os == "Windows":
@@ -415,6 +435,11 @@ class OpenSSLConan(ConanFile):
         tc = AutotoolsToolchain(self)
         env = tc.environment()
         env.define_path("PERL", self._perl)
+        if self.options.get_safe("enable_ktls") and self.settings.os == "Linux":
+            # Configure checks <linux/tls.h> with the bare compiler, without CFLAGS: use the search path
+            # of the compiler, looked up after -I and before the system headers
+            linux_headers = self.dependencies["linux-headers-generic"].cpp_info.includedirs[0]
+            env.prepend_path("C_INCLUDE_PATH", linux_headers)
         if self.settings.compiler == "apple-clang":
             xcrun = XCRun(self)
             env.define_path("CROSS_SDK", os.path.basename(xcrun.sdk_path))
@@ -513,6 +538,8 @@ class OpenSSLConan(ConanFile):
                 self._replace_runtime_in_file(os.path.join("Configurations", "10-main.conf"))
 
             self.run(f"{self._perl} ./Configure {args}", env="conanbuild")
+            if self.options.get_safe("enable_ktls"):
+                self._check_ktls_enabled()
             if self._use_nmake:
                 # When `--prefix=/`, the scripts derive `\` without escaping, which
                 # causes issues on Windows
@@ -527,6 +554,14 @@ class OpenSSLConan(ConanFile):
                         replace_in_file(self, mkinstallvars_pl, "$ENV{$k} = $v;", """$v =~ s|\\\\|/|g; $ENV{$k} = $v;""")
             self._run_make()
 
+    def _check_ktls_enabled(self):
+        # Configure silently disables kTLS when the kernel headers are missing or too old
+        configdata = load(self, os.path.join(self.source_folder, "configdata.pm"))
+        disabled = re.search(r"our %disabled = \((.*?)\);", configdata, re.DOTALL)
+        reason = re.search(r'"ktls"\s*=>\s*"([^"]*)"', disabled.group(1)) if disabled else None
+        if reason:
+            raise ConanException(f"enable_ktls: Configure disabled kTLS ({reason.group(1)})")
+
     def _make_install(self):
         with chdir(self, self.source_folder):
             self._run_make(targets=["install_sw"], parallel=False, install=True)
@@ -0,0 +1,36 @@
+#include <openssl/async.h>
+
+#include <stdio.h>
+
+static int job(void *arg)
+{
+    (void)arg;
+    /* suspend once, resumed by the second ASYNC_start_job() call */
+    ASYNC_pause_job();
+    return 42;
+}
+
+int async_job()
+{
+    ASYNC_JOB *current = NULL;
+    ASYNC_WAIT_CTX *wait_ctx;
+    int result = 0, status, pauses = 0;
+
+    if (!ASYNC_is_capable()) {
+        /* e.g. no makecontext() in the C library, or built with no-threads */
+        printf("OpenSSL async jobs: not supported on this platform\n");
+        return 0;
+    }
+
+    wait_ctx = ASYNC_WAIT_CTX_new();
+    if (wait_ctx == NULL) {
+        return 1;
+    }
+    while ((status = ASYNC_start_job(&current, wait_ctx, &result, job, NULL, 0)) == ASYNC_PAUSE) {
+        ++pauses;
+    }
+    ASYNC_WAIT_CTX_free(wait_ctx);
+
+    printf("OpenSSL async jobs: supported, job returned %d after %d pause(s)\n", result, pauses);
+    return status == ASYNC_FINISH && result == 42 && pauses == 1 ? 0 : 1;
+}
@@ -20,11 +20,18 @@ class TestPackageConan(ConanFile):
             ((not self.dependencies["openssl"].options.no_md4) or
               (not self.dependencies["openssl"].options.no_rmd160)))
 
+    def _with_tls_loopback(self):
+        # A TLS 1.3 key exchange needs ECDHE or DHE
+        openssl = self.dependencies["openssl"]
+        return not openssl.options.no_sock and not (openssl.options.no_ec and openssl.options.no_dh)
+
     def generate(self):
         tc = CMakeToolchain(self)
         tc.cache_variables["OPENSSL_WITH_LEGACY"] = self._with_legacy()
         tc.cache_variables["OPENSSL_WITH_MD4"] = not self.dependencies["openssl"].options.no_md4
         tc.cache_variables["OPENSSL_WITH_RIPEMD160"] = not self.dependencies["openssl"].options.no_rmd160
+        tc.cache_variables["OPENSSL_WITH_ASYNC"] = not self.dependencies["openssl"].options.no_async
+        tc.cache_variables["OPENSSL_WITH_TLS_LOOPBACK"] = self._with_tls_loopback()
         tc.generate()
 
     def build(self):
@@ -36,3 +43,7 @@ class TestPackageConan(ConanFile):
         if can_run(self):
             bin_path = os.path.join(self.cpp.build.bindirs[0], "test_package")
             self.run(bin_path, env="conanrun")
+            if self._with_tls_loopback():
+                # Loopback TLS transfer, reports whether kTLS was engaged (enable_ktls option, tls kernel module)
+                bin_path = os.path.join(self.cpp.build.bindirs[0], "tls_loopback")
+                self.run(bin_path, env="conanrun")
@@ -3,6 +3,7 @@
 
 void digest();
 int digest_legacy();
+int async_job();
 
 int main()
 {
@@ -20,5 +21,12 @@ int main()
 	}
 #endif
 
+#if defined(TEST_OPENSSL_ASYNC)
+	if (async_job() != 0) {
+		printf("Error testing the async_job() function\n");
+		return 1;
+	}
+#endif
+
 	return 0;
 }
@@ -0,0 +1,285 @@
+/*
+ * TLS handshake and bulk transfer over a loopback TCP connection, both ends driven from this
+ * thread with non-blocking sockets. Reports whether kernel TLS (kTLS) offload was engaged on
+ * each side and the achieved throughput. Usage: tls_loopback [size in MiB]
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <openssl/bio.h>
+#include <openssl/err.h>
+#include <openssl/evp.h>
+#include <openssl/ssl.h>
+#include <openssl/x509.h>
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _WIN32
+#include <winsock2.h>
+#include <ws2tcpip.h>
+#include <windows.h>
+typedef SOCKET socket_t;
+#define close_socket closesocket
+#else
+#include <arpa/inet.h>
+#include <fcntl.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <sys/socket.h>
+#include <time.h>
+#include <unistd.h>
+typedef int socket_t;
+#define INVALID_SOCKET (-1)
+#define close_socket close
+#endif
+
+#define CHUNK_SIZE 16384
+
+static double now(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+static int set_non_blocking(socket_t fd) {
+#ifdef _WIN32
+    u_long mode = 1;
+    return ioctlsocket(fd, FIONBIO, &mode) == 0;
+#else
+    int flags = fcntl(fd, F_GETFL, 0);
+    return flags != -1 && fcntl(fd, F_SETFL, flags | O_NONBLOCK) == 0;
+#endif
+}
+
+/* Connected pair of non-blocking TCP sockets on 127.0.0.1: kTLS needs TCP, socketpair() is not enough */
+static int loopback_pair(socket_t *client, socket_t *server) {
+    struct sockaddr_in address;
+    socklen_t length = sizeof(address);
+    int one = 1;
+    socket_t listener = socket(AF_INET, SOCK_STREAM, 0);
+
+    *client = *server = INVALID_SOCKET;
+    if (listener == INVALID_SOCKET) {
+        return 0;
+    }
+    memset(&address, 0, sizeof(address));
+    address.sin_family = AF_INET;
+    address.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    address.sin_port = 0;
+    if (bind(listener, (struct sockaddr *)&address, sizeof(address)) != 0 || listen(listener, 1) != 0 ||
+        getsockname(listener, (struct sockaddr *)&address, &length) != 0) {
+        close_socket(listener);
+        return 0;
+    }
+    *client = socket(AF_INET, SOCK_STREAM, 0);
+    if (*client == INVALID_SOCKET || connect(*client, (struct sockaddr *)&address, sizeof(address)) != 0) {
+        close_socket(listener);
+        return 0;
+    }
+    *server = accept(listener, NULL, NULL);
+    close_socket(listener);
+    if (*server == INVALID_SOCKET) {
+        return 0;
+    }
+    setsockopt(*client, IPPROTO_TCP, TCP_NODELAY, (const char *)&one, sizeof(one));
+    setsockopt(*server, IPPROTO_TCP, TCP_NODELAY, (const char *)&one, sizeof(one));
+    return set_non_blocking(*client) && set_non_blocking(*server);
+}
+
+/* Self-signed certificate for the server, with a key type the library was built with */
+static int use_self_signed_certificate(SSL_CTX *ctx) {
+#ifndef OPENSSL_NO_RSA
+    EVP_PKEY *key = EVP_RSA_gen(2048);
+#else
+    EVP_PKEY *key = EVP_EC_gen("P-256");
+#endif
+    X509 *certificate = X509_new();
+    X509_NAME *name;
+    int result = 0;
+
+    if (key != NULL && certificate != NULL) {
+        name = X509_get_subject_name(certificate);
+        result = X509_set_version(certificate, 2) &&
+                 ASN1_INTEGER_set(X509_get_serialNumber(certificate), 1) &&
+                 X509_gmtime_adj(X509_getm_notBefore(certificate), 0) != NULL &&
+                 X509_gmtime_adj(X509_getm_notAfter(certificate), 3600) != NULL &&
+                 X509_set_pubkey(certificate, key) &&
+                 X509_NAME_add_entry_by_txt(name, "CN", MBSTRING_ASC, (const unsigned char *)"localhost", -1, -1, 0) &&
+                 X509_set_issuer_name(certificate, name) &&
+                 X509_sign(certificate, key, EVP_sha256()) > 0 &&
+                 SSL_CTX_use_certificate(ctx, certificate) == 1 &&
+                 SSL_CTX_use_PrivateKey(ctx, key) == 1;
+    }
+    X509_free(certificate);
+    EVP_PKEY_free(key);
+    return result;
+}
+
+/* ERR_print_errors_fp() is not available with no_stdio */
+static int print_error(const char *message, size_t length, void *context) {
+    (void)context;
+    fprintf(stderr, "%.*s", (int)length, message);
+    return 1;
+}
+
+static int would_block(SSL *ssl, int result) {
+    int error = SSL_get_error(ssl, result);
+    return error == SSL_ERROR_WANT_READ || error == SSL_ERROR_WANT_WRITE;
+}
+
+static int handshake(SSL *client, SSL *server) {
+    int client_done = 0, server_done = 0;
+    while (!client_done || !server_done) {
+        if (!client_done) {
+            int result = SSL_connect(client);
+            if (result == 1) {
+                client_done = 1;
+            } else if (!would_block(client, result)) {
+                return 0;
+            }
+        }
+        if (!server_done) {
+            int result = SSL_accept(server);
+            if (result == 1) {
+                server_done = 1;
+            } else if (!would_block(server, result)) {
+                return 0;
+            }
+        }
+    }
+    return 1;
+}
+
+static unsigned char pattern(size_t offset) {
+    return (unsigned char)((offset * 31 + offset / 4096) & 0xFF);
+}
+
+/* Client writes size bytes, server reads and checks them */
+static int transfer(SSL *client, SSL *server, size_t size) {
+    unsigned char *send_buffer = (unsigned char *)malloc(CHUNK_SIZE);
+    unsigned char *receive_buffer = (unsigned char *)malloc(CHUNK_SIZE);
+    size_t sent = 0, received = 0, i;
+    int ok = send_buffer != NULL && receive_buffer != NULL;
+
+    while (ok && received < size) {
+        if (sent < size) {
+            /* the same buffer and length must be passed again after SSL_ERROR_WANT_WRITE */
+            int length = (int)(size - sent < CHUNK_SIZE ? size - sent : CHUNK_SIZE);
+            int result;
+            for (i = 0; i < (size_t)length; ++i) {
+                send_buffer[i] = pattern(sent + i);
+            }
+            result = SSL_write(client, send_buffer, length);
+            if (result > 0) {
+                sent += (size_t)result;
+            } else if (!would_block(client, result)) {
+                ok = 0;
+            }
+        }
+        while (ok && received < sent) {
+            int result = SSL_read(server, receive_buffer, CHUNK_SIZE);
+            if (result > 0) {
+                for (i = 0; i < (size_t)result; ++i) {
+                    if (receive_buffer[i] != pattern(received + i)) {
+                        fprintf(stderr, "tls_loopback: corrupted data at offset %lu\n", (unsigned long)(received + i));
+                        ok = 0;
+                        break;
+                    }
+                }
+                received += (size_t)result;
+            } else if (would_block(server, result)) {
+                break;
+            } else {
+                ok = 0;
+            }
+        }
+    }
+    free(send_buffer);
+    free(receive_buffer);
+    return ok;
+}
+
+int main(int argc, char **argv) {
+    size_t size = (size_t)(argc > 1 ? atoi(argv[1]) : 16) << 20;
+    SSL_CTX *client_ctx = NULL, *server_ctx = NULL;
+    SSL *client = NULL, *server = NULL;
+    socket_t client_fd = INVALID_SOCKET, server_fd = INVALID_SOCKET;
+    double start, elapsed;
+    int result = EXIT_FAILURE;
+
+#ifdef _WIN32
+    WSADATA wsa_data;
+    if (WSAStartup(MAKEWORD(2, 2), &wsa_data) != 0) {
+        return EXIT_FAILURE;
+    }
+#endif
+
+    client_ctx = SSL_CTX_new(TLS_client_method());
+    server_ctx = SSL_CTX_new(TLS_server_method());
+    if (client_ctx == NULL || server_ctx == NULL || !use_self_signed_certificate(server_ctx)) {
+        fprintf(stderr, "tls_loopback: cannot create the TLS contexts\n");
+        goto end;
+    }
+    /* kTLS is opt-in at runtime, it is only used if the library was built with enable-ktls */
+    SSL_CTX_set_options(client_ctx, SSL_OP_ENABLE_KTLS);
+    SSL_CTX_set_options(server_ctx, SSL_OP_ENABLE_KTLS);
+
+    if (!loopback_pair(&client_fd, &server_fd)) {
+        fprintf(stderr, "tls_loopback: cannot create a loopback TCP connection\n");
+        goto end;
+    }
+    client = SSL_new(client_ctx);
+    server = SSL_new(server_ctx);
+    if (client == NULL || server == NULL || !SSL_set_fd(client, (int)client_fd) || !SSL_set_fd(server, (int)server_fd)) {
+        goto end;
+    }
+    if (!handshake(client, server)) {
+        fprintf(stderr, "tls_loopback: handshake failed\n");
+        goto end;
+    }
+    printf("TLS loopback: %s, %s\n", SSL_get_version(client), SSL_get_cipher_name(client));
+
+    start = now();
+    if (!transfer(client, server, size)) {
+        fprintf(stderr, "tls_loopback: transfer failed\n");
+        goto end;
+    }
+    elapsed = now() - start;
+
+    /* BIO_get_ktls_* are always 0 when the library was built without kTLS */
+    printf("kTLS send (client): %s, kTLS receive (server): %s\n",
+           BIO_get_ktls_send(SSL_get_wbio(client)) ? "yes" : "no",
+           BIO_get_ktls_recv(SSL_get_rbio(server)) ? "yes" : "no");
+    printf("transferred %lu MiB in %.3f s: %.1f MB/s\n", (unsigned long)(size >> 20), elapsed,
+           (double)size / 1e6 / (elapsed > 0 ? elapsed : 1e-9));
+    result = EXIT_SUCCESS;
+
+end:
+    if (result != EXIT_SUCCESS) {
+        ERR_print_errors_cb(print_error, NULL);
+    }
+    SSL_free(client);
+    SSL_free(server);
+    SSL_CTX_free(client_ctx);
+    SSL_CTX_free(server_ctx);
+    if (client_fd != INVALID_SOCKET) {
+        close_socket(client_fd);
+    }
+    if (server_fd != INVALID_SOCKET) {
+        close_socket(server_fd);
+    }
+#ifdef _WIN32
+    WSACleanup();
+#endif
+    return result;
+}
@@ -95,6 +95,11 @@ class ProtobufConan(ConanFile):
             "msvc": "191",
         }
 
+    def package_id(self):
+        if self._protobuf_release >= "22.0":
+            # headers and generated code use absl::string_view, which is std::string_view or not depending on abseil/*:use_std
+            self.info.requires["abseil"].full_package_mode()
+
     def validate(self):
         if self.options.shared and is_msvc_static_runtime(self):
             raise ConanInvalidConfiguration("Protobuf can't be built with shared + MT(d) runtimes")
@@ -42,6 +42,11 @@ class Re2Conan(ConanFile):
         elif Version(self.version) >= "20230601":
             self.requires("abseil/20240116.1", transitive_headers=True)
 
+    def package_id(self):
+        if Version(self.version) >= "20230601":
+            # re2.h takes absl::string_view, an alias of std::string_view or not depending on abseil/*:use_std
+            self.info.requires["abseil"].full_package_mode()
+
     def validate(self):
         if Version(self.version) >= "20250805":
             min_cppstd = 17
@@ -53,6 +53,10 @@ class S2GeometryConan(ConanFile):
         if Version(self.version) >= "0.12.0":
             self.tool_requires("cmake/[>=3.18 <4]")
 
+    def package_id(self):
+        # the s2 API uses absl::string_view and absl::Span, built for the abseil options in use
+        self.info.requires["abseil"].full_package_mode()
+
     def validate(self):
         check_min_cppstd(self, 14 if Version(self.version) < "0.12.0" else 17)
 
@@ -48,6 +48,13 @@ class Sqlite3Conan(ConanFile):
         "build_executable": [True, False],
         "enable_default_vfs": [True, False],
         "enable_dbpage_vtab": [True, False],
+        "default_mmap_size": [None, "ANY"],
+        "max_mmap_size": [None, "ANY"],
+        "default_cache_size": [None, "ANY"],
+        "default_page_size": [None, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536],
+        "default_wal_synchronous": [None, "off", "normal", "full", "extra"],
+        "dqs": [0, 1, 2, 3],
+        "like_doesnt_match_blobs": [True, False],
     }
     default_options = {
         "shared": False,
@@ -80,6 +87,13 @@ class Sqlite3Conan(ConanFile):
         "build_executable": True,
         "enable_default_vfs": True,
         "enable_dbpage_vtab": False,
+        "default_mmap_size": None,      # Uses default value from source (0, memory-mapped I/O disabled)
+        "max_mmap_size": None,          # Uses default value from source
+        "default_cache_size": None,     # Uses default value from source (-2000, i.e. 2000 KiB)
+        "default_page_size": None,      # Uses default value from source (4096)
+        "default_wal_synchronous": None,  # Same as the synchronous setting of the rollback journal modes
+        "dqs": 3,                       # Double-quoted string literals accepted in DML and DDL, as in the source
+        "like_doesnt_match_blobs": False,
     }
 
     exports_sources = "CMakeLists.txt"
@@ -109,6 +123,21 @@ class Sqlite3Conan(ConanFile):
             if self.options.omit_load_extension:
                 raise ConanInvalidConfiguration("build_executable=True requires omit_load_extension=True")
 
+        # "0" is a meaningful value for these options, so they are compared to "None" rather than tested for truth
+        for option in ("default_mmap_size", "max_mmap_size", "default_cache_size"):
+            value = str(self.options.get_safe(option))
+            if value != "None" and not value.lstrip("-").isdigit():
+                raise ConanInvalidConfiguration(f"{option} must be an integer, got '{value}'")
+        for option in ("default_mmap_size", "max_mmap_size"):
+            if str(self.options.get_safe(option)).startswith("-"):
+                raise ConanInvalidConfiguration(f"{option} must be a number of bytes, got '{self.options.get_safe(option)}'")
+        if str(self.options.default_cache_size) in ("0", "-0"):
+            raise ConanInvalidConfiguration("default_cache_size must be a number of pages (positive) or of KiB (negative), not 0")
+        if str(self.options.default_mmap_size) != "None" and str(self.options.max_mmap_size) != "None" and \
+                int(self.options.default_mmap_size) > int(self.options.max_mmap_size):
+            # SQLite would silently lower the default to the maximum
+            raise ConanInvalidConfiguration("default_mmap_size cannot be greater than max_mmap_size")
+
     def source(self):
         get(self, **self.conan_data["sources"][self.version], strip_root=True)
 
@@ -153,6 +182,18 @@ class Sqlite3Conan(ConanFile):
             tc.variables["MAX_BLOB_SIZE"] = self.options.max_blob_size
         tc.variables["DISABLE_DEFAULT_VFS"] = not self.options.enable_default_vfs
         tc.variables["ENABLE_DBPAGE_VTAB"] = self.options.enable_dbpage_vtab
+        if str(self.options.default_mmap_size) != "None":
+            tc.variables["DEFAULT_MMAP_SIZE"] = self.options.default_mmap_size
+        if str(self.options.max_mmap_size) != "None":
+            tc.variables["MAX_MMAP_SIZE"] = self.options.max_mmap_size
+        if self.options.default_cache_size:
+            tc.variables["DEFAULT_CACHE_SIZE"] = self.options.default_cache_size
+        if self.options.default_page_size:
+            tc.variables["DEFAULT_PAGE_SIZE"] = self.options.default_page_size
+        if str(self.options.default_wal_synchronous) != "None":
+            tc.variables["DEFAULT_WAL_SYNCHRONOUS"] = ["off", "normal", "full", "extra"].index(str(self.options.default_wal_synchronous))
+        tc.variables["DQS"] = self.options.dqs
+        tc.variables["LIKE_DOESNT_MATCH_BLOBS"] = self.options.like_doesnt_match_blobs
         tc.generate()
 
     def build(self):
@@ -0,0 +1,167 @@
+/*
+ * WAL mode benchmark of the test_package, only run when enabled by the conf (see conanfile.py).
+ * Inserts the given number of rows of about 100 bytes, in transactions of 1000 rows, then looks
+ * them up by primary key in a pseudo random order. The pragmas are left to their compiled in
+ * defaults, which are reported. Prints one JSON result per operation.
+ * Usage: benchmark [rows] [iterations]
+ */
+#if !defined(_WIN32) && !defined(_POSIX_C_SOURCE)
+#define _POSIX_C_SOURCE 200112L
+#endif
+
+#include <sqlite3.h>
+
+#include <stdio.h>
+#include <stdlib.h>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+#define DATABASE "sqlite3_benchmark.db"
+#define ROW_SIZE 100
+#define ROWS_PER_TRANSACTION 1000
+
+static double now(void) {
+#ifdef _WIN32
+    LARGE_INTEGER frequency, counter;
+    QueryPerformanceFrequency(&frequency);
+    QueryPerformanceCounter(&counter);
+    return (double)counter.QuadPart / (double)frequency.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+#endif
+}
+
+/* 32-bit LCG: the same keys and payloads on every platform */
+static unsigned long next_random(unsigned long *state) {
+    *state = (*state * 1103515245UL + 12345UL) & 0xFFFFFFFFUL;
+    return *state >> 8;
+}
+
+static void remove_database(void) {
+    remove(DATABASE);
+    remove(DATABASE "-wal");
+    remove(DATABASE "-shm");
+}
+
+static sqlite3_int64 pragma(sqlite3 *db, const char *name) {
+    char sql[64];
+    sqlite3_stmt *stmt = NULL;
+    sqlite3_int64 value = -1;
+    snprintf(sql, sizeof(sql), "PRAGMA %s", name);
+    if (sqlite3_prepare_v2(db, sql, -1, &stmt, NULL) == SQLITE_OK && sqlite3_step(stmt) == SQLITE_ROW) {
+        value = sqlite3_column_int64(stmt, 0);
+    }
+    sqlite3_finalize(stmt);
+    return value;
+}
+
+static int insert_rows(sqlite3 *db, long rows) {
+    char payload[ROW_SIZE - 8];
+    sqlite3_stmt *stmt = NULL;
+    unsigned long state = 42;
+    long i;
+    int ok = sqlite3_prepare_v2(db, "INSERT INTO items (id, payload) VALUES (?, ?)", -1, &stmt, NULL) == SQLITE_OK;
+    for (i = 0; ok && i < rows; ++i) {
+        size_t j;
+        if (i % ROWS_PER_TRANSACTION == 0) {
+            ok = sqlite3_exec(db, "BEGIN", NULL, NULL, NULL) == SQLITE_OK;
+        }
+        for (j = 0; j < sizeof(payload); ++j) {
+            payload[j] = (char)('a' + next_random(&state) % 26);
+        }
+        sqlite3_bind_int64(stmt, 1, i);
+        sqlite3_bind_text(stmt, 2, payload, (int)sizeof(payload), SQLITE_STATIC);
+        ok = ok && sqlite3_step(stmt) == SQLITE_DONE;
+        sqlite3_reset(stmt);
+        if (ok && (i % ROWS_PER_TRANSACTION == ROWS_PER_TRANSACTION - 1 || i == rows - 1)) {
+            ok = sqlite3_exec(db, "COMMIT", NULL, NULL, NULL) == SQLITE_OK;
+        }
+    }
+    sqlite3_finalize(stmt);
+    return ok;
+}
+
+static int lookup_rows(sqlite3 *db, long rows) {
+    sqlite3_stmt *stmt = NULL;
+    unsigned long state = 7;
+    long i, found = 0;
+    int ok = sqlite3_prepare_v2(db, "SELECT payload FROM items WHERE id = ?", -1, &stmt, NULL) == SQLITE_OK;
+    for (i = 0; ok && i < rows; ++i) {
+        sqlite3_bind_int64(stmt, 1, (sqlite3_int64)(next_random(&state) % (unsigned long)rows));
+        if (sqlite3_step(stmt) == SQLITE_ROW && sqlite3_column_bytes(stmt, 0) == ROW_SIZE - 8) {
+            ++found;
+        }
+        sqlite3_reset(stmt);
+    }
+    sqlite3_finalize(stmt);
+    return ok && found == rows;
+}
+
+int main(int argc, char **argv) {
+    static const char *const operations[] = {"insert", "lookup"};
+    long rows = argc > 1 ? atol(argv[1]) : 100000;
+    int iterations = argc > 2 ? atoi(argv[2]) : 3;
+    double best[2] = {0.0, 0.0};
+    sqlite3_int64 synchronous = -1, page_size = -1, cache_size = 0, mmap_size = -1;
+    int iteration, i;
+
+    if (rows < 1 || iterations < 1) {
+        return EXIT_FAILURE;
+    }
+    for (iteration = 0; iteration < iterations; ++iteration) {
+        sqlite3 *db = NULL;
+        double start, elapsed[2];
+        int ok;
+
+        remove_database();
+        ok = sqlite3_open(DATABASE, &db) == SQLITE_OK &&
+             sqlite3_exec(db, "PRAGMA journal_mode=WAL", NULL, NULL, NULL) == SQLITE_OK &&
+             sqlite3_exec(db, "CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT NOT NULL)", NULL, NULL, NULL) == SQLITE_OK;
+        sqlite3_close(db);
+        db = NULL;
+        /* the WAL default synchronous setting is applied when a WAL database is opened */
+        ok = ok && sqlite3_open(DATABASE, &db) == SQLITE_OK;
+        if (ok) {
+            synchronous = pragma(db, "synchronous");
+            page_size = pragma(db, "page_size");
+            cache_size = pragma(db, "cache_size");
+            mmap_size = pragma(db, "mmap_size");
+        }
+
+        start = now();
+        ok = ok && insert_rows(db, rows);
+        elapsed[0] = now() - start;
+        start = now();
+        ok = ok && lookup_rows(db, rows);
+        elapsed[1] = now() - start;
+        if (!ok) {
+            fprintf(stderr, "benchmark: %s\n", db != NULL ? sqlite3_errmsg(db) : "cannot open " DATABASE);
+            sqlite3_close(db);
+            remove_database();
+            return EXIT_FAILURE;
+        }
+        sqlite3_close(db);
+
+        for (i = 0; i < 2; ++i) {
+            if (iteration == 0 || elapsed[i] < best[i]) {
+                best[i] = elapsed[i];
+            }
+        }
+    }
+    remove_database();
+
+    for (i = 0; i < 2; ++i) {
+        printf("{\"library\": \"sqlite3\", \"version\": \"%s\", \"operation\": \"%s\", \"journal_mode\": \"wal\", \"rows\": %ld, "
+               "\"rows_per_s\": %.0f, \"synchronous\": %lld, \"page_size\": %lld, \"cache_size\": %lld, \"mmap_size\": %lld, "
+               "\"iterations\": %d}\n",
+               sqlite3_libversion(), operations[i], rows, (double)rows / best[i], (long long)synchronous,
+               (long long)page_size, (long long)cache_size, (long long)mmap_size, iterations);
+    }
+    return EXIT_SUCCESS;
+}
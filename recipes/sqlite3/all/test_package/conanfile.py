@@ -1,12 +1,12 @@
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import CMake, cmake_layout
+from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 import os
 
 
 class TestPackageConan(ConanFile):
     settings = "os", "arch", "compiler", "build_type"
-    generators = "CMakeToolchain", "CMakeDeps", "VirtualRunEnv"
+    generators = "CMakeDeps", "VirtualRunEnv"
     test_type = "explicit"
 
     def layout(self):
@@ -15,6 +15,26 @@ class TestPackageConan(ConanFile):
     def requirements(self):
         self.requires(self.tested_reference_str)
 
+    def generate(self):
+        options = self.dependencies["sqlite3"].options
+        expected = {}
+        if str(options.get_safe("default_mmap_size")) != "None":
+            expected["MMAP_SIZE"] = options.default_mmap_size
+        if options.get_safe("default_cache_size"):
+            expected["CACHE_SIZE"] = options.default_cache_size
+        if options.get_safe("default_page_size"):
+            expected["PAGE_SIZE"] = options.default_page_size
+        if str(options.get_safe("default_wal_synchronous")) != "None":
+            expected["WAL_SYNCHRONOUS"] = ["off", "normal", "full", "extra"].index(str(options.default_wal_synchronous))
+        if options.get_safe("dqs") is not None:
+            expected["DQS"] = options.dqs
+        if options.get_safe("like_doesnt_match_blobs") is not None:
+            expected["LIKE_DOESNT_MATCH_BLOBS"] = 1 if options.like_doesnt_match_blobs else 0
+        tc = CMakeToolchain(self)
+        for name, value in expected.items():
+            tc.cache_variables[f"SQLITE3_EXPECTED_{name}"] = str(value)
+        tc.generate()
+
     def build(self):
         cmake = CMake(self)
         cmake.configure()
@@ -1,7 +1,75 @@
 #include <stdio.h>
+#include <stdlib.h>
 #include <sqlite3.h>
 
+#define DATABASE "test_package.db"
+
+static sqlite3_int64 pragma(sqlite3 *db, const char *sql) {
+    sqlite3_stmt *stmt = NULL;
+    sqlite3_int64 value = -1;
+    if (sqlite3_prepare_v2(db, sql, -1, &stmt, NULL) == SQLITE_OK && sqlite3_step(stmt) == SQLITE_ROW) {
+        value = sqlite3_column_int64(stmt, 0);
+    }
+    sqlite3_finalize(stmt);
+    return value;
+}
+
+static int check(const char *name, sqlite3_int64 value, sqlite3_int64 expected) {
+    printf("%s: %lld\n", name, (long long)value);
+    if (value != expected) {
+        fprintf(stderr, "unexpected %s %lld, expected %lld\n", name, (long long)value, (long long)expected);
+        return 1;
+    }
+    return 0;
+}
+
+/* Compile time defaults set by the recipe options, only checked when set */
+static int check_defaults(void) {
+    sqlite3 *db = NULL;
+    int failures = 0;
+
+    remove(DATABASE);
+    remove(DATABASE "-wal");
+    remove(DATABASE "-shm");
+    if (sqlite3_open(DATABASE, &db) != SQLITE_OK ||
+        sqlite3_exec(db, "PRAGMA journal_mode=WAL; CREATE TABLE t (x)", NULL, NULL, NULL) != SQLITE_OK) {
+        fprintf(stderr, "cannot create %s\n", DATABASE);
+        sqlite3_close(db);
+        return 1;
+    }
+    sqlite3_close(db);
+    /* the WAL default synchronous setting is applied when a WAL database is opened */
+    if (sqlite3_open(DATABASE, &db) != SQLITE_OK) {
+        sqlite3_close(db);
+        return 1;
+    }
+#ifdef EXPECTED_MMAP_SIZE
+    failures += check("mmap_size", pragma(db, "PRAGMA mmap_size"), EXPECTED_MMAP_SIZE);
+#endif
+#ifdef EXPECTED_CACHE_SIZE
+    failures += check("cache_size", pragma(db, "PRAGMA cache_size"), EXPECTED_CACHE_SIZE);
+#endif
+#ifdef EXPECTED_PAGE_SIZE
+    failures += check("page_size", pragma(db, "PRAGMA page_size"), EXPECTED_PAGE_SIZE);
+#endif
+#ifdef EXPECTED_WAL_SYNCHRONOUS
+    failures += check("synchronous (WAL)", pragma(db, "PRAGMA synchronous"), EXPECTED_WAL_SYNCHRONOUS);
+#endif
+#ifdef EXPECTED_DQS
+    /* bit 0: double-quoted string literals accepted in DML statements */
+    failures += check("double-quoted string literal in DML", pragma(db, "SELECT \"dqs\" = 'dqs'") == 1, (EXPECTED_DQS & 1) != 0);
+#endif
+#ifdef EXPECTED_LIKE_DOESNT_MATCH_BLOBS
+    failures += check("BLOB matched by LIKE", pragma(db, "SELECT x'61' LIKE 'a'") == 1, !EXPECTED_LIKE_DOESNT_MATCH_BLOBS);
+#endif
+    sqlite3_close(db);
+    remove(DATABASE);
+    remove(DATABASE "-wal");
+    remove(DATABASE "-shm");
+    return failures;
+}
+
 int main() {
     printf("SQLite Version: %s\n", sqlite3_libversion());
-    return 0;
+    return check_defaults() ? EXIT_FAILURE : EXIT_SUCCESS;
 }
@@ -1,4 +1,5 @@
 from conan import ConanFile
+from conan.errors import ConanInvalidConfiguration
 from conan.tools.apple import fix_apple_shared_install_name
 from conan.tools.cmake import CMake, CMakeToolchain
 from conan.tools.env import VirtualBuildEnv
@@ -29,10 +30,19 @@ class XZUtilsConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # Multithreaded encoder and decoder (lzma_stream_encoder_mt, lzma_stream_decoder_mt)
+        "threads": [True, False],
+        # Assembly and CPU instruction (CLMUL, ARM64 CRC32...) implementations of the checks
+        "assembler": [True, False],
+        # Smaller but slower library
+        "small": [True, False],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "threads": True,
+        "assembler": True,
+        "small": False,
     }
 
     @property
@@ -79,6 +89,10 @@ class XZUtilsConan(ConanFile):
     def layout(self):
         basic_layout(self, src_folder="src")
 
+    def validate(self):
+        if self._use_msbuild and (not self.options.threads or not self.options.assembler or self.options.small):
+            raise ConanInvalidConfiguration(f"{self.ref} can only be built with the default threads, assembler and small options by Visual Studio")
+
     def build_requirements(self):
         if self._settings_build.os == "Windows" and not self._use_msbuild and (Version(self.version) < "5.8.1" or self.settings.os == "Android"):
             self.win_bash = True
@@ -98,6 +112,11 @@ class XZUtilsConan(ConanFile):
         elif self._use_cmake:
             tc = CMakeToolchain(self)
             tc.cache_variables["BUILD_SHARED_LIBS"] = self.options.shared
+            tc.cache_variables["XZ_THREADS"] = "yes" if self.options.threads else "no"
+            tc.cache_variables["XZ_SMALL"] = self.options.small
+            if not self.options.assembler:
+                for variable in ["XZ_ASM_I386", "XZ_CLMUL_CRC", "XZ_ARM64_CRC32", "XZ_LOONGARCH_CRC32"]:
+                    tc.cache_variables[variable] = False
             tc.generate()
         else:
             env = VirtualBuildEnv(self)
@@ -106,6 +125,17 @@ class XZUtilsConan(ConanFile):
             tc.configure_args.append("--disable-doc")
             if self.settings.build_type == "Debug":
                 tc.configure_args.append("--enable-debug")
+            tc.configure_args.append(f"--enable-threads={'yes' if self.options.threads else 'no'}")
+            if self.options.small:
+                tc.configure_args.append("--enable-small")
+            if not self.options.assembler:
+                tc.configure_args.append("--disable-assembler")
+                if Version(self.version) >= "5.4.0":
+                    tc.configure_args.append("--disable-clmul-crc")
+                if Version(self.version) >= "5.6.0":
+                    tc.configure_args.append("--disable-arm64-crc32")
+                if Version(self.version) >= "5.8.0":
+                    tc.configure_args.append("--disable-loongarch-crc32")
             tc.generate()
 
     @property
@@ -229,5 +259,5 @@ class XZUtilsConan(ConanFile):
         self.cpp_info.libs = ["lzma"]
         if not self.options.shared:
             self.cpp_info.defines.append("LZMA_API_STATIC")
-        if self.settings.os in ["Linux", "FreeBSD"]:
+        if self.settings.os in ["Linux", "FreeBSD"] and self.options.threads:
             self.cpp_info.system_libs.append("pthread")
@@ -1,8 +1,51 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <lzma.h>
 
+#ifdef LZMA_WITH_THREADS
+/* Round trip through the multithreaded encoder, only available when built with threads */
+static int mt_round_trip(void) {
+    static const char text[] = "Hello Conan! Hello Conan! Hello Conan! Hello Conan! Hello Conan!";
+    uint8_t compressed[512];
+    uint8_t output[sizeof(text)];
+    uint64_t memory_limit = UINT64_MAX;
+    size_t input_position = 0, output_size = 0;
+    lzma_stream stream = LZMA_STREAM_INIT;
+    lzma_mt options;
+    lzma_ret result;
+
+    memset(&options, 0, sizeof(options));
+    options.threads = 2;
+    options.preset = LZMA_PRESET_DEFAULT;
+    options.check = LZMA_CHECK_CRC64;
+    if (lzma_stream_encoder_mt(&stream, &options) != LZMA_OK) {
+        return 0;
+    }
+    stream.next_in = (const uint8_t *)text;
+    stream.avail_in = sizeof(text);
+    stream.next_out = compressed;
+    stream.avail_out = sizeof(compressed);
+    do {
+        result = lzma_code(&stream, LZMA_FINISH);
+    } while (result == LZMA_OK);
+    lzma_end(&stream);
+
+    return result == LZMA_STREAM_END &&
+           lzma_stream_buffer_decode(&memory_limit, 0, NULL, compressed, &input_position, (size_t)stream.total_out,
+                                     output, &output_size, sizeof(output)) == LZMA_OK &&
+           output_size == sizeof(text) && memcmp(text, output, sizeof(text)) == 0;
+}
+#endif
+
 int main() {
     printf("LZMA version %s\n", lzma_version_string());
+#ifdef LZMA_WITH_THREADS
+    if (!mt_round_trip()) {
+        fprintf(stderr, "multithreaded encoder round trip failed\n");
+        return EXIT_FAILURE;
+    }
+    printf("multithreaded encoder: %u hardware threads\n", (unsigned)lzma_cputhreads());
+#endif
     return EXIT_SUCCESS;
 }
@@ -1,8 +1,10 @@
 from conan import ConanFile
+from conan.errors import ConanException, ConanInvalidConfiguration
 from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
-from conan.tools.files import apply_conandata_patches, export_conandata_patches, get, load, replace_in_file, save
+from conan.tools.files import apply_conandata_patches, copy, export_conandata_patches, get, load, replace_in_file, rmdir, save
 from conan.tools.scm import Version
 import os
+import re
 
 required_conan_version = ">=1.53.0"
 
@@ -21,12 +23,28 @@ class ZlibConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
+        # zlib-ng: zlib-ng built in zlib compatible mode (same API, ABI, library and targets),
+        # with SIMD implementations selected at runtime
+        "backend": ["zlib", "zlib-ng"],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
+        "backend": "zlib",
     }
 
+    @property
+    def _is_windows(self):
+        return self.settings.os in ["Windows", "WindowsStore"]
+
+    @property
+    def _zlib_source_folder(self):
+        return os.path.join(self.source_folder, "zlib")
+
+    @property
+    def _zlib_ng_source_folder(self):
+        return os.path.join(self.source_folder, "zlib-ng")
+
     def export_sources(self):
         export_conandata_patches(self)
 
@@ -43,20 +61,40 @@ class ZlibConan(ConanFile):
     def layout(self):
         cmake_layout(self, src_folder="src")
 
+    def validate(self):
+        if self.options.backend == "zlib-ng" and "zlib-ng" not in self.conan_data["sources"][self.version]:
+            raise ConanInvalidConfiguration(f"{self.ref} has no zlib-ng release compatible with this version, use backend=zlib")
+
     def source(self):
-        get(self, **self.conan_data["sources"][self.version],
-            destination=self.source_folder, strip_root=True)
+        sources = self.conan_data["sources"][self.version]
+        get(self, **sources["zlib"], destination=self._zlib_source_folder, strip_root=True)
+        if "zlib-ng" in sources:
+            get(self, **sources["zlib-ng"], destination=self._zlib_ng_source_folder, strip_root=True)
+            zlib_h = load(self, os.path.join(self._zlib_ng_source_folder, "zlib.h.in"))
+            match = re.search(r'#define\s+ZLIB_VERSION\s+"([0-9]+\.[0-9]+\.[0-9]+)\.zlib-ng"', zlib_h)
+            if not match or match.group(1) != str(self.version):
+                raise ConanException(f"the zlib-ng release of conandata.yml is not compatible with zlib {self.version}")
 
     def generate(self):
         tc = CMakeToolchain(self)
-        tc.variables["SKIP_INSTALL_ALL"] = False
-        tc.variables["SKIP_INSTALL_LIBRARIES"] = False
-        tc.variables["SKIP_INSTALL_HEADERS"] = False
-        tc.variables["SKIP_INSTALL_FILES"] = True
-        # Correct for misuse of "${CMAKE_INSTALL_PREFIX}/" in CMakeLists.txt
-        tc.variables["INSTALL_LIB_DIR"] = "lib"
-        tc.variables["INSTALL_INC_DIR"] = "include"
-        tc.variables["ZLIB_BUILD_EXAMPLES"] = False
+        if self.options.backend == "zlib-ng":
+            tc.cache_variables["ZLIB_COMPAT"] = True
+            tc.cache_variables["WITH_GZFILEOP"] = True
+            tc.cache_variables["WITH_OPTIM"] = True
+            tc.cache_variables["WITH_NATIVE_INSTRUCTIONS"] = False
+            tc.cache_variables["WITH_RUNTIME_CPU_DETECTION"] = True
+            tc.cache_variables["BUILD_TESTING"] = False
+            tc.cache_variables["ZLIB_ENABLE_TESTS"] = False
+            tc.cache_variables["ZLIBNG_ENABLE_TESTS"] = False
+        else:
+            tc.variables["SKIP_INSTALL_ALL"] = False
+            tc.variables["SKIP_INSTALL_LIBRARIES"] = False
+            tc.variables["SKIP_INSTALL_HEADERS"] = False
+            tc.variables["SKIP_INSTALL_FILES"] = True
+            # Correct for misuse of "${CMAKE_INSTALL_PREFIX}/" in CMakeLists.txt
+            tc.variables["INSTALL_LIB_DIR"] = "lib"
+            tc.variables["INSTALL_INC_DIR"] = "include"
+            tc.variables["ZLIB_BUILD_EXAMPLES"] = False
         tc.generate()
 
     def _patch_sources(self):
@@ -65,7 +103,7 @@ class ZlibConan(ConanFile):
         is_apple_clang12 = self.settings.compiler == "apple-clang" and Version(self.settings.compiler.version) >= "12.0"
         if not is_apple_clang12:
             for filename in ['zconf.h', 'zconf.h.cmakein', 'zconf.h.in']:
-                filepath = os.path.join(self.source_folder, filename)
+                filepath = os.path.join(self._zlib_source_folder, filename)
                 replace_in_file(self, filepath,
                                       '#ifdef HAVE_UNISTD_H    '
                                       '/* may be set to #if 1 by ./configure */',
@@ -76,20 +114,32 @@ class ZlibConan(ConanFile):
                                       '#if defined(HAVE_STDARG_H) && (1-HAVE_STDARG_H-1 != 0)')
 
     def build(self):
-        self._patch_sources()
         cmake = CMake(self)
-        cmake.configure()
+        if self.options.backend == "zlib-ng":
+            cmake.configure(build_script_folder="zlib-ng")
+        else:
+            self._patch_sources()
+            cmake.configure(build_script_folder="zlib")
         cmake.build()
 
     def _extract_license(self):
-        tmp = load(self, os.path.join(self.source_folder, "zlib.h"))
+        tmp = load(self, os.path.join(self._zlib_source_folder, "zlib.h"))
         license_contents = tmp[2:tmp.find("*/", 1)]
         return license_contents
 
     def package(self):
-        save(self, os.path.join(self.package_folder, "licenses", "LICENSE"), self._extract_license())
         cmake = CMake(self)
         cmake.install()
+        if self.options.backend == "zlib-ng":
+            from conan.tools.apple import fix_apple_shared_install_name
+
+            copy(self, "LICENSE.md", src=self._zlib_ng_source_folder, dst=os.path.join(self.package_folder, "licenses"))
+            rmdir(self, os.path.join(self.package_folder, "lib", "pkgconfig"))
+            rmdir(self, os.path.join(self.package_folder, "lib", "cmake"))
+            # upstream hardcodes the install_name with the full install path
+            fix_apple_shared_install_name(self)
+        else:
+            save(self, os.path.join(self.package_folder, "licenses", "LICENSE"), self._extract_license())
 
     def package_info(self):
         self.cpp_info.set_property("cmake_find_mode", "both")
@@ -97,7 +147,19 @@ class ZlibConan(ConanFile):
         self.cpp_info.set_property("cmake_target_name", "ZLIB::ZLIB")
         self.cpp_info.set_property("pkg_config_name", "zlib")
 
-        if self.settings.os == "Windows" and self.settings.get_safe("compiler.runtime"):
+        if self.options.backend == "zlib-ng":
+            from conan.tools.microsoft import is_msvc
+
+            # Library names of zlib-ng in zlib compatible mode
+            if self._is_windows:
+                base = "zlib" if is_msvc(self) or self.options.shared else "z"
+                static_flag = "static" if is_msvc(self) and not self.options.shared else ""
+                build_type = "d" if self.settings.build_type == "Debug" else ""
+                libname = f"{base}{static_flag}{build_type}"
+            else:
+                libname = "z"
+            self.cpp_info.defines = ["ZLIB_COMPAT", "WITH_GZFILEOP"]
+        elif self.settings.os == "Windows" and self.settings.get_safe("compiler.runtime"):
             # The recipe patches the CMakeLists.txt to generate different filenames when CMake
             # detects MINGW (clang, gcc with compiler.runtime undefined and compiler.libcxx defined)
             libname = "zdll" if self.options.shared else "zlib"
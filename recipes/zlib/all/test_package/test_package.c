@@ -1,11 +1,25 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
 #include <zlib.h>
 
 int main(void) {
+    static const char text[] = "Hello Conan! Hello Conan! Hello Conan! Hello Conan! Hello Conan!";
+    unsigned char compressed[256];
+    unsigned char output[sizeof(text)];
+    uLongf compressed_size = sizeof(compressed);
+    uLongf output_size = sizeof(output);
 
     printf("ZLIB VERSION: %s\n", zlibVersion());
 
+    /* Throughput is measured by the benchmark executable, see conanfile.py */
+    if (compress2(compressed, &compressed_size, (const Bytef *)text, sizeof(text), Z_BEST_COMPRESSION) != Z_OK ||
+        uncompress(output, &output_size, compressed, compressed_size) != Z_OK ||
+        output_size != sizeof(text) || memcmp(text, output, sizeof(text)) != 0) {
+        fprintf(stderr, "round trip failed\n");
+        return EXIT_FAILURE;
+    }
+
     return EXIT_SUCCESS;
 }
@@ -22,12 +22,23 @@ class ZstdConan(ConanFile):
         "fPIC": [True, False],
         "threading": [True, False],
         "build_programs": [True, False],
+        # decoding of the frame formats of zstd < 0.8
+        "legacy_support": [True, False],
+        # x86_64 assembly Huffman decoder
+        "assembler": [True, False],
+        "no_inline": [True, False],
+        # restrict the Huffman decoder to the single (x1) or double (x2) symbol variant, smaller but slower on some data
+        "huf_decoder": ["auto", "x1", "x2"],
     }
     default_options = {
         "shared": False,
         "fPIC": True,
         "threading": True,
         "build_programs": True,
+        "legacy_support": True,
+        "assembler": True,
+        "no_inline": False,
+        "huf_decoder": "auto",
     }
 
     def export_sources(self):
@@ -36,6 +47,9 @@ class ZstdConan(ConanFile):
     def config_options(self):
         if self.settings.os == "Windows":
             del self.options.fPIC
+        # huf_decompress_amd64.S is neither built with MSVC nor before 1.5.1
+        if self.settings.arch != "x86_64" or self.settings.compiler == "msvc" or Version(self.version) < "1.5.1":
+            del self.options.assembler
 
     def configure(self):
         if self.options.shared:
@@ -55,6 +69,13 @@ class ZstdConan(ConanFile):
         tc.variables["ZSTD_BUILD_STATIC"] = not self.options.shared or self.options.build_programs
         tc.variables["ZSTD_BUILD_SHARED"] = self.options.shared
         tc.variables["ZSTD_MULTITHREAD_SUPPORT"] = self.options.threading
+        tc.variables["ZSTD_LEGACY_SUPPORT"] = self.options.legacy_support
+        if not self.options.get_safe("assembler", True):
+            tc.preprocessor_definitions["ZSTD_DISABLE_ASM"] = 1
+        if self.options.no_inline:
+            tc.preprocessor_definitions["ZSTD_NO_INLINE"] = 1
+        if self.options.huf_decoder != "auto":
+            tc.preprocessor_definitions[f"HUF_FORCE_DECOMPRESS_{str(self.options.huf_decoder).upper()}"] = 1
         if Version(self.version) < "1.5.6":
             tc.cache_variables["CMAKE_POLICY_VERSION_MINIMUM"] = "3.5" # CMake 4 support
         tc.generate()
@@ -2,11 +2,72 @@
 #include <stdlib.h>
 #include <string.h>
 #include <zstd.h>
+#include <zdict.h>
+
+#define SAMPLE_COUNT 1000
+#define SAMPLE_MAX_SIZE 128
+#define DICT_CAPACITY 4096
+
+/* Small JSON-like records sharing most of their content, which is what dictionaries are for */
+static size_t make_sample(char* buffer, unsigned i) {
+    static const char* const levels[] = {"debug", "info", "warning", "error"};
+    return (size_t)snprintf(buffer, SAMPLE_MAX_SIZE, "{\"id\": %u, \"level\": \"%s\", \"user\": \"user%u\", \"message\": \"request %u served\"}",
+                            i, levels[i % 4], (i * 7919u) % 97u, i * 31u);
+}
+
+/* Trains a dictionary on the samples, then compresses and decompresses one record with it */
+static int dictionary_round_trip(void) {
+    char* samples = malloc(SAMPLE_COUNT * SAMPLE_MAX_SIZE);
+    size_t sample_sizes[SAMPLE_COUNT];
+    char dictionary[DICT_CAPACITY];
+    char record[SAMPLE_MAX_SIZE], compressed[ZSTD_COMPRESSBOUND(SAMPLE_MAX_SIZE)], decompressed[SAMPLE_MAX_SIZE];
+    size_t total = 0, dictionary_size, record_size, compressed_size, decompressed_size;
+    ZSTD_CCtx* cctx = ZSTD_createCCtx();
+    ZSTD_DCtx* dctx = ZSTD_createDCtx();
+    int result = 1;
+    unsigned i;
+
+    if (samples == NULL || cctx == NULL || dctx == NULL) {
+        goto end;
+    }
+    for (i = 0; i < SAMPLE_COUNT; ++i) {
+        sample_sizes[i] = make_sample(samples + total, i);
+        total += sample_sizes[i];
+    }
+    dictionary_size = ZDICT_trainFromBuffer(dictionary, sizeof(dictionary), samples, sample_sizes, SAMPLE_COUNT);
+    if (ZDICT_isError(dictionary_size)) {
+        fprintf(stderr, "ZDICT_trainFromBuffer: %s\n", ZDICT_getErrorName(dictionary_size));
+        goto end;
+    }
+
+    record_size = make_sample(record, SAMPLE_COUNT + 1);
+    compressed_size = ZSTD_compress_usingDict(cctx, compressed, sizeof(compressed), record, record_size,
+                                              dictionary, dictionary_size, 3);
+    if (ZSTD_isError(compressed_size)) {
+        fprintf(stderr, "ZSTD_compress_usingDict: %s\n", ZSTD_getErrorName(compressed_size));
+        goto end;
+    }
+    decompressed_size = ZSTD_decompress_usingDict(dctx, decompressed, sizeof(decompressed), compressed, compressed_size,
+                                                  dictionary, dictionary_size);
+    if (ZSTD_isError(decompressed_size) || decompressed_size != record_size || memcmp(record, decompressed, record_size) != 0) {
+        fprintf(stderr, "dictionary round trip failed\n");
+        goto end;
+    }
+    printf("dictionary of %zu bytes (id %u), record of %zu bytes compressed to %zu bytes\n",
+           dictionary_size, ZDICT_getDictID(dictionary, dictionary_size), record_size, compressed_size);
+    result = 0;
+
+end:
+    ZSTD_freeCCtx(cctx);
+    ZSTD_freeDCtx(dctx);
+    free(samples);
+    return result;
+}
 
 int main() {
     const char* originalData = "Sample text";
     size_t compressedSize = ZSTD_compressBound(strlen(originalData) + 1);
     printf("%zu\n", compressedSize);
 
-    return 0;
+    return dictionary_round_trip();
 }
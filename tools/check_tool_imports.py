@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+"""
+Check that recipes defer the imports of build-system and platform-specific tools.
+
+Conan imports every conanfile.py of a dependency graph, but only runs a few of its methods (the ones
+listed in GRAPH_METHODS) to compute it. A ``conan.tools`` module from DEFERRABLE_MODULES that is only
+used by methods like ``generate()``, ``build()`` or ``package()`` must be imported inside those methods,
+not at module level, so that loading the recipe does not pay for it:
+
+    def build(self):
+        from conan.tools.gnu import Autotools
+
+        autotools = Autotools(self)
+
+Modules used by at least one graph method (e.g. ``cmake_layout`` in ``layout()``, ``is_msvc`` in
+``validate()``) stay at module level.
+"""
+
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from recipe_index import ROOT
+
+# Methods run while computing a graph, i.e. whenever the recipe is loaded
+GRAPH_METHODS = (
+    "init",
+    "set_name",
+    "set_version",
+    "export",
+    "export_sources",
+    "config_options",
+    "configure",
+    "layout",
+    "requirements",
+    "build_requirements",
+    "validate",
+    "validate_build",
+    "package_id",
+    "compatibility",
+)
+
+# Modules whose import cost is worth avoiding when they are not needed
+DEFERRABLE_MODULES = (
+    "conan.tools.android",
+    "conan.tools.apple",
+    "conan.tools.cmake",
+    "conan.tools.gnu",
+    "conan.tools.google",
+    "conan.tools.intel",
+    "conan.tools.meson",
+    "conan.tools.microsoft",
+    "conan.tools.premake",
+    "conan.tools.qbs",
+    "conan.tools.scons",
+    "conan.tools.system.package_manager",
+)
+
+
+class _Usage(ast.NodeVisitor):
+    """Names and ``self.<attribute>`` accessed by a piece of code."""
+
+    def __init__(self):
+        self.names = set()
+        self.attributes = set()
+
+    def visit_Name(self, node):
+        self.names.add(node.id)
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id == "self":
+            self.attributes.add(node.attr)
+        self.generic_visit(node)
+
+
+def _usage(nodes: Iterable[ast.AST]) -> _Usage:
+    usage = _Usage()
+    for node in nodes:
+        usage.visit(node)
+    return usage
+
+
+def check_recipe(text: str) -> List[Tuple[int, str, List[str]]]:
+    """Return (line, module, methods using it) for every module-level import that should be deferred."""
+    tree = ast.parse(text)
+    imports = {}
+    others = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module in DEFERRABLE_MODULES:
+            imports[node] = [alias.asname or alias.name for alias in node.names]
+        elif isinstance(node, ast.ClassDef):
+            methods = [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            class_level = [n for n in node.body if n not in methods] + node.bases + node.decorator_list
+            others.append((node, methods, class_level))
+        else:
+            others.append((node, [], [node]))
+
+    # Code executed at import time, or by the methods reachable from the graph methods, needs the import
+    needed = set()
+    usage_by_method = {}
+    for _, methods, module_level in others:
+        needed |= _usage(module_level).names
+        usage = {m.name: _usage([m]) for m in methods}
+        usage_by_method.update(usage)
+        todo = [name for name in GRAPH_METHODS if name in usage]
+        reachable = set(todo)
+        while todo:
+            for attribute in usage[todo.pop()].attributes:
+                if attribute in usage and attribute not in reachable:
+                    reachable.add(attribute)
+                    todo.append(attribute)
+        for name in reachable:
+            needed |= usage[name].names
+
+    violations = []
+    for node, names in imports.items():
+        if needed.intersection(names):
+            continue
+        users = sorted(m for m, u in usage_by_method.items() if u.names.intersection(names))
+        violations.append((node.lineno, node.module, users))
+    return violations
+
+
+def changed_recipes(root: Path, base: str) -> List[Path]:
+    output = subprocess.check_output(["git", "-C", str(root), "diff", "--name-only", "--diff-filter=AM", base, "--", "recipes"], text=True)
+    return [root / p for p in output.splitlines() if p.endswith("conanfile.py")]
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("--diff-base", dest="diff_base", help="only check the conanfiles changed since this git revision")
+    parser.add_argument("paths", nargs="*", type=Path, help="conanfile.py files to check (default: every recipe)")
+    ns = parser.parse_args(args)
+
+    if ns.paths:
+        paths = ns.paths
+    elif ns.diff_base:
+        paths = changed_recipes(ns.root, ns.diff_base)
+    else:
+        paths = sorted(ns.root.glob("recipes/*/*/conanfile.py")) + sorted(ns.root.glob("docs/package_templates/*/all/conanfile.py"))
+
+    count = 0
+    for path in paths:
+        for lineno, module, users in check_recipe(path.read_text(encoding="utf-8")):
+            count += 1
+            where = f"only used in {', '.join(f'{u}()' for u in users)}" if users else "not used"
+            print(f"{path}:{lineno}: '{module}' imported at module level but {where}, import it where it is used")
+    if count:
+        print(f"{count} imports to defer in {len(paths)} recipes checked")
+    return 1 if count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
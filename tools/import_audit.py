@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+"""
+Measure the import time and memory of every recipe of the index.
+
+Each conanfile.py is imported in a fresh child process forked from an interpreter where only the
+``conan`` package is loaded, so the reported cost is what loading that recipe adds: its own code plus
+every ``conan.tools`` module it pulls at module level. ``--shared`` imports all the recipes one after
+the other in the same interpreter instead, like a tool loading the whole graph would (the peak memory
+is only meaningful for the first recipes then).
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from check_tool_imports import DEFERRABLE_MODULES
+from recipe_index import ROOT
+
+log = logging.Logger("import-audit")
+log.parent = logging.root
+log.setLevel(logging.WARNING)
+
+
+def _tool_modules(modules) -> List[str]:
+    return sorted(m for m in modules if m in DEFERRABLE_MODULES)
+
+
+def _memory_kib(field: str) -> Optional[int]:
+    """VmRSS or VmHWM (peak) of the current process, on Linux only."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def import_recipe(path: str) -> dict:
+    """Import a conanfile.py, returning its import time (ms), peak memory increase (KiB) and loaded modules."""
+    folder = str(Path(path).parent)
+    sys.path.insert(0, folder)
+    before = set(sys.modules)
+    # tracemalloc would make imports several times slower, rely on the peak RSS of the child instead
+    rss = _memory_kib("VmRSS")
+    start = time.perf_counter()
+    try:
+        spec = importlib.util.spec_from_file_location(f"conanfile_{abs(hash(path))}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        error = None
+    except BaseException as exc:  # Recipes for other Conan versions, missing local helpers...
+        error = f"{type(exc).__name__}: {exc}"
+    elapsed = time.perf_counter() - start
+    peak = _memory_kib("VmHWM")
+    sys.path.remove(folder)
+    loaded = set(sys.modules) - before
+    return {
+        "recipe": path,
+        "time_ms": round(elapsed * 1000, 2),
+        "peak_kib": peak - rss if peak is not None and rss is not None else None,
+        "modules": len(loaded),
+        "tool_modules": _tool_modules(loaded),
+        "error": error,
+    }
+
+
+def audit(paths: List[str], jobs: Optional[int] = None, shared: bool = False) -> List[dict]:
+    import conan  # noqa: F401 (baseline shared by every recipe)
+    import conan.errors  # noqa: F401
+
+    if shared:
+        return [import_recipe(path) for path in paths]
+    # fork is required: every child must start from the baseline above and nothing else
+    context = multiprocessing.get_context("fork")
+    with context.Pool(processes=jobs, maxtasksperchild=1) as pool:
+        return pool.map(import_recipe, paths, chunksize=1)
+
+
+def recipe_paths(root: Path, recipes: List[str]) -> List[str]:
+    if recipes:
+        paths = [p for r in recipes for p in sorted((root / "recipes" / r).glob("*/conanfile.py"))]
+    else:
+        paths = sorted(root.glob("recipes/*/*/conanfile.py"))
+    return [str(p) for p in paths]
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("-j", dest="jobs", type=int, default=None, help="concurrent child processes (default: cpu count)")
+    parser.add_argument("--shared", dest="shared", action="store_true", help="import every recipe in the same interpreter")
+    parser.add_argument("--top", dest="top", type=int, default=20, help="number of slowest recipes to list (default: 20)")
+    parser.add_argument("--json", dest="json", type=Path, help="write every measurement to this file")
+    parser.add_argument("recipes", nargs="*", help="recipe names to audit (default: all)")
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    try:
+        import conan  # noqa: F401
+    except ImportError:
+        log.error("Conan must be installed to import the recipes")
+        return 1
+
+    paths = recipe_paths(ns.root, ns.recipes)
+    start = time.perf_counter()
+    results = audit(paths, jobs=ns.jobs, shared=ns.shared)
+    wall = time.perf_counter() - start
+
+    if ns.json:
+        ns.json.write_text(json.dumps(results, indent=2))
+
+    errors = [r for r in results if r["error"]]
+    for result in errors:
+        log.warning("%s: %s", result["recipe"], result["error"])
+    results = [r for r in results if not r["error"]]
+
+    print(f"{'time (ms)':>10} {'peak (KiB)':>11} {'modules':>8}  recipe")
+    for result in sorted(results, key=lambda r: r["time_ms"], reverse=True)[:ns.top]:
+        recipe = Path(result["recipe"]).relative_to(ns.root) if ns.root in Path(result["recipe"]).parents else result["recipe"]
+        peak = "n/a" if result["peak_kib"] is None else str(result["peak_kib"])
+        print(f"{result['time_ms']:>10.1f} {peak:>11} {result['modules']:>8}  {recipe}")
+
+    total = sum(r["time_ms"] for r in results)
+    print(f"\n{len(results)} recipes imported ({len(errors)} failed) in {wall:.1f}s, "
+          f"sum of import times {total / 1000:.2f}s, mean {total / max(len(results), 1):.1f} ms")
+    if not ns.shared:
+        counts = {}
+        for result in results:
+            for module in result["tool_modules"]:
+                counts[module] = counts.get(module, 0) + 1
+        print("Recipes loading platform-specific tool modules at import time:")
+        for module, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {module}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
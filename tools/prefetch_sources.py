@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+"""
+Concurrent, content-addressed download of the sources listed in every conandata.yml.
+
+Sources are deduplicated by sha256 and downloaded by a bounded pool of threads. Each download is
+hashed while it is streamed to disk and only moved into the store once its sha256 matches. The store
+uses the layout of the Conan "backup sources" feature (``<sha256>`` and ``<sha256>.json`` at the root
+of the store), so serving the store over HTTP and adding its URL to ``core.sources:download_urls``
+makes the ``get(self, **self.conan_data["sources"][...])`` calls of the recipes use it.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from recipe_index import CACHE_FOLDER, DEFAULT_DB, ROOT, RecipeIndex
+
+log = logging.Logger("prefetch-sources")
+log.parent = logging.root
+log.setLevel(logging.INFO)
+
+
+DEFAULT_STORE = CACHE_FOLDER / "sources"
+
+CHUNK_SIZE = 1 << 20
+
+USER_AGENT = "conan-center-index-prefetch"
+
+
+class Source(object):
+    """A unique source archive, with every URL and reference it is known by."""
+
+    def __init__(self, sha256: str):
+        self.sha256 = sha256
+        self.urls = []
+        self.references = {}
+
+    def add(self, reference: str, url: str) -> None:
+        if url not in self.urls:
+            self.urls.append(url)
+        urls = self.references.setdefault(reference, [])
+        if url not in urls:
+            urls.append(url)
+
+
+def collect_sources(index: RecipeIndex, recipes: Optional[Iterable[str]] = None) -> Tuple[Dict[str, Source], List[dict]]:
+    """Deduplicate the sources of the index by sha256.
+
+    Entries without a sha256 cannot be stored by content and are returned separately.
+    """
+    sources = {}
+    unverifiable = []
+    recipes = set(recipes) if recipes else None
+    for entry in index.sources():
+        if recipes and entry["recipe"] not in recipes:
+            continue
+        if not entry["sha256"]:
+            unverifiable.append(entry)
+            continue
+        sha256 = entry["sha256"].lower()
+        sources.setdefault(sha256, Source(sha256)).add(f"{entry['recipe']}/{entry['version']}", entry["url"])
+    return sources, unverifiable
+
+
+class SourceStore(object):
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.path / sha256
+
+    def has(self, sha256: str) -> bool:
+        return self.blob_path(sha256).is_file()
+
+    def verify(self, sha256: str) -> bool:
+        sha = hashlib.sha256()
+        with self.blob_path(sha256).open("rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                sha.update(chunk)
+        return sha.hexdigest() == sha256
+
+    def write_metadata(self, source: Source) -> None:
+        """Record the references of a blob, merging with the ones already known."""
+        metadata_path = self.path / f"{source.sha256}.json"
+        with self._lock:
+            metadata = {"references": {}}
+            if metadata_path.is_file():
+                try:
+                    metadata = json.loads(metadata_path.read_text())
+                except ValueError:
+                    log.warning("Overwriting corrupted %s", metadata_path)
+            references = metadata.setdefault("references", {})
+            for reference, urls in source.references.items():
+                known = references.setdefault(reference, [])
+                known.extend(u for u in urls if u not in known)
+            self._atomic_write(metadata_path, json.dumps(metadata, indent=2, sort_keys=True).encode())
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def download(self, source: Source, urls: List[str], timeout: float, retries: int) -> int:
+        """Try every URL until one provides the expected content, return the number of bytes stored."""
+        errors = []
+        for url in urls:
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(min(2 ** attempt, 30))
+                try:
+                    return self._download_url(source.sha256, url, timeout)
+                except ChecksumError as exc:
+                    # Retrying the same URL will give the same content
+                    errors.append(str(exc))
+                    break
+                except (OSError, urllib.error.URLError) as exc:
+                    errors.append(f"{url}: {exc}")
+                    if isinstance(exc, urllib.error.HTTPError) and 400 <= exc.code < 500 and exc.code != 429:
+                        break
+        raise DownloadError("; ".join(errors))
+
+    def _download_url(self, sha256: str, url: str, timeout: float) -> int:
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f, urllib.request.urlopen(request, timeout=timeout) as response:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    sha.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            if sha.hexdigest() != sha256:
+                raise ChecksumError(f"{url}: sha256 mismatch, expected {sha256} got {sha.hexdigest()}")
+            os.replace(tmp, self.blob_path(sha256))
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return size
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ChecksumError(DownloadError):
+    pass
+
+
+def rewrite_url(url: str, rewrites: List[Tuple[str, str]]) -> str:
+    for prefix, replacement in rewrites:
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+def prefetch(sources: Dict[str, Source], store: SourceStore, jobs: int = 8, timeout: float = 60.0, retries: int = 2,
+             rewrites: Optional[List[Tuple[str, str]]] = None, verify_existing: bool = False) -> dict:
+    """Download every missing source into the store.
+
+    Returns {"downloaded": [...], "cached": [...], "failed": [(sha256, error), ...], "bytes": downloaded_size}.
+    """
+    result = {"downloaded": [], "cached": [], "failed": [], "bytes": 0}
+    todo = []
+    for source in sources.values():
+        if store.has(source.sha256) and (not verify_existing or store.verify(source.sha256)):
+            result["cached"].append(source.sha256)
+            store.write_metadata(source)
+        else:
+            todo.append(source)
+
+    def fetch(source: Source) -> int:
+        urls = [rewrite_url(url, rewrites or []) for url in source.urls]
+        return store.download(source, urls, timeout, retries)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {executor.submit(fetch, source): source for source in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+            try:
+                result["bytes"] += future.result()
+            except DownloadError as exc:
+                log.warning("[%d/%d] %s failed: %s", done, len(todo), ", ".join(source.references), exc)
+                result["failed"].append((source.sha256, str(exc)))
+                continue
+            store.write_metadata(source)
+            result["downloaded"].append(source.sha256)
+            log.debug("[%d/%d] %s", done, len(todo), ", ".join(source.references))
+    return result
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--db", dest="db", type=Path, default=DEFAULT_DB, help=f"index file (default: {DEFAULT_DB})")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("--no-update", dest="update", action="store_false", help="use the index as is, without refreshing it")
+    parser.add_argument("--store", dest="store", type=Path, default=DEFAULT_STORE, help=f"content-addressed store (default: {DEFAULT_STORE})")
+    parser.add_argument("-j", dest="jobs", type=int, default=16, help="concurrent downloads (default: 16)")
+    parser.add_argument("--timeout", dest="timeout", type=float, default=60.0, help="network timeout in seconds (default: 60)")
+    parser.add_argument("--retries", dest="retries", type=int, default=2, help="retries per URL on network errors (default: 2)")
+    parser.add_argument("--rewrite", dest="rewrites", action="append", default=[], metavar="PREFIX=REPLACEMENT",
+                        help="rewrite URL prefixes before downloading, e.g. to go through a proxy mirror (repeatable)")
+    parser.add_argument("--verify-existing", dest="verify_existing", action="store_true", help="re-hash the files already in the store")
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="only report what would be downloaded")
+    parser.add_argument("recipes", nargs="*", help="only prefetch the sources of these recipes (default: all)")
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    rewrites = []
+    for rewrite in ns.rewrites:
+        prefix, sep, replacement = rewrite.partition("=")
+        if not sep:
+            parser.error(f"invalid --rewrite '{rewrite}', expected PREFIX=REPLACEMENT")
+        rewrites.append((prefix, replacement))
+
+    with RecipeIndex(ns.db) as index:
+        if ns.update:
+            index.update(ns.root)
+        sources, unverifiable = collect_sources(index, ns.recipes)
+
+    for entry in unverifiable:
+        log.debug("%s/%s: no sha256 for %s, skipped", entry["recipe"], entry["version"], entry["url"])
+    if unverifiable:
+        log.warning("%d source URLs have no sha256 and were skipped", len(unverifiable))
+
+    store = SourceStore(ns.store)
+    if ns.dry_run:
+        missing = [s for s in sources.values() if not store.has(s.sha256)]
+        for source in missing:
+            print(f"{source.sha256} {' '.join(source.urls)}")
+        print(f"{len(missing)} of {len(sources)} sources missing from {store.path}")
+        return 0
+
+    start = time.perf_counter()
+    result = prefetch(sources, store, jobs=ns.jobs, timeout=ns.timeout, retries=ns.retries, rewrites=rewrites,
+                      verify_existing=ns.verify_existing)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sources)} unique sources: {len(result['downloaded'])} downloaded, {len(result['cached'])} already stored, "
+          f"{len(result['failed'])} failed ({result['bytes'] / 1e6:.1f} MB in {elapsed:.1f}s, "
+          f"{result['bytes'] / 1e6 / max(elapsed, 1e-6):.1f} MB/s)")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+
+"""
+Rebuild a set of recipes layer by layer, running independent ``conan create`` concurrently.
+
+The layers come from the static requirement graph (see recipe_graph.py): every recipe of a layer only
+depends on recipes of previous layers, so the recipes of a layer can be built at the same time. The
+number of concurrent builds is bounded by a job budget, every build consuming as many jobs as its own
+``tools.build:jobs``. The progress is saved after every build, so an interrupted or failed run can be
+resumed from its first incomplete layer.
+
+The Conan cache does not support concurrent writers, so every running build gets a Conan home of its own,
+configured like the home of the user but with a separate package storage. The packages of the plan it
+depends on are restored into it before the build, and what the build produced is archived and restored
+into the home of the user afterwards, one restore at a time.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from recipe_graph import RecipeGraph
+from recipe_index import CACHE_FOLDER, DEFAULT_DB, ROOT, RecipeIndex
+
+log = logging.Logger("rebuild-scheduler")
+log.parent = logging.root
+log.setLevel(logging.INFO)
+
+
+DEFAULT_STATE = CACHE_FOLDER / "rebuild-state.json"
+DEFAULT_HOMES = CACHE_FOLDER / "rebuild-homes"
+DEFAULT_PACKAGES = CACHE_FOLDER / "rebuild-packages"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+
+class RebuildState(object):
+    """Plan and progress of a rebuild, persisted as json after every change."""
+
+    def __init__(self, path: Path, data: dict, persist: bool = True):
+        self.path = Path(path)
+        self.data = data
+        self.persist = persist
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path: Path, graph: RecipeGraph, layers: List[List[str]], conan_args: List[str], persist: bool = True) -> "RebuildState":
+        nodes = set(n for layer in layers for n in layer)
+        data = {
+            "created": int(time.time()),
+            "conan_args": conan_args,
+            "layers": layers,
+            "folders": {n: graph.versions[graph.node_name(n)][n.split("/", 1)[1]] for n in nodes},
+            "dependencies": {n: sorted(d for d in graph.edges.get(n, ()) if d in nodes) for n in nodes},
+            "status": {n: PENDING for n in nodes},
+        }
+        state = cls(path, data, persist)
+        state.save()
+        return state
+
+    @classmethod
+    def load(cls, path: Path) -> "RebuildState":
+        return cls(path, json.loads(Path(path).read_text()))
+
+    def save(self) -> None:
+        if not self.persist:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def set_status(self, node: str, status: str) -> None:
+        with self._lock:
+            self.data["status"][node] = status
+            self.save()
+
+    def status(self, node: str) -> str:
+        return self.data["status"][node]
+
+    def first_incomplete_layer(self) -> Optional[int]:
+        for index, layer in enumerate(self.data["layers"]):
+            if any(self.status(n) != DONE for n in layer):
+                return index
+        return None
+
+    def reset_incomplete(self) -> None:
+        """Builds interrupted, failed or blocked in a previous run have to be started again."""
+        with self._lock:
+            for node, status in self.data["status"].items():
+                if status != DONE:
+                    self.data["status"][node] = PENDING
+            self.save()
+
+    def summary(self) -> Dict[str, int]:
+        counts = {}
+        for status in self.data["status"].values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+def conan_home() -> Path:
+    """The Conan home used without the scheduler, CONAN_HOME or the default one."""
+    return Path(subprocess.check_output(["conan", "config", "home"], stdin=subprocess.DEVNULL, text=True).strip())
+
+
+class Scheduler(object):
+    def __init__(self, state: RebuildState, root: Path, budget: int, build_jobs: int, build_jobs_overrides: Dict[str, int],
+                 log_folder: Path, keep_going: bool = False, dry_run: bool = False, homes_folder: Path = DEFAULT_HOMES,
+                 packages_folder: Path = DEFAULT_PACKAGES, main_home: Optional[Path] = None):
+        self.state = state
+        self.root = Path(root)
+        self.budget = max(1, budget)
+        self.build_jobs = max(1, build_jobs)
+        self.build_jobs_overrides = build_jobs_overrides
+        self.log_folder = Path(log_folder)
+        self.keep_going = keep_going
+        self.dry_run = dry_run
+        self.homes_folder = Path(homes_folder)
+        self.packages_folder = Path(packages_folder)
+        self.main_home = main_home
+        self._condition = threading.Condition()
+        self._available = self.budget
+        # Worker homes not used by a running build, and the nodes already restored into each home
+        self._free_homes = []
+        self._homes = 0
+        self._restored = {}
+        self._main_home_lock = threading.Lock()
+
+    def jobs_for(self, node: str) -> int:
+        name = node.split("/", 1)[0]
+        jobs = self.build_jobs_overrides.get(node, self.build_jobs_overrides.get(name, self.build_jobs))
+        # A build bigger than the whole budget runs alone
+        return max(1, min(jobs, self.budget))
+
+    def command(self, node: str) -> List[str]:
+        name, version = node.split("/", 1)
+        recipe_folder = self.root / "recipes" / name / self.state.data["folders"][node]
+        return ["conan", "create", str(recipe_folder), f"--version={version}",
+                "-c", f"tools.build:jobs={self.jobs_for(node)}"] + self.state.data["conan_args"]
+
+    def archive(self, node: str) -> Path:
+        """The packages built for a node, kept between runs so that resumed builds can restore them."""
+        return self.packages_folder / f"{node.replace('/', '-')}.tgz"
+
+    def _plan_dependencies(self, node: str) -> List[str]:
+        dependencies = self.state.data["dependencies"]
+        found = []
+        stack = list(dependencies[node])
+        while stack:
+            dependency = stack.pop()
+            if dependency not in found:
+                found.append(dependency)
+                stack.extend(dependencies[dependency])
+        return sorted(found)
+
+    def _prepare_home(self, home: Path) -> None:
+        """Copy the configuration of the home of the user (profiles, remotes, global.conf...), not its packages."""
+        home.mkdir(parents=True, exist_ok=True)
+        for entry in self.main_home.iterdir():
+            if entry.name in ("p", "tmp"):
+                continue
+            if entry.is_dir():
+                shutil.copytree(entry, home / entry.name, dirs_exist_ok=True)
+            else:
+                shutil.copy2(entry, home / entry.name)
+
+    def _conan(self, args: List[str], home: Path, log_file) -> int:
+        log_file.write(f"$ CONAN_HOME={home} conan {' '.join(args)}\n")
+        log_file.flush()
+        env = dict(os.environ, CONAN_HOME=str(home))
+        if home != self.main_home:
+            # "conan cache save" writes its package list to a fixed name of the temporary folder
+            tmp = str(home / "tmp")
+            os.makedirs(tmp, exist_ok=True)
+            env.update(TMPDIR=tmp, TEMP=tmp, TMP=tmp)
+        return subprocess.call(["conan"] + args, env=env, stdout=log_file, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+
+    def _build(self, node: str, home: Path) -> bool:
+        command = self.command(node)
+        if self.dry_run:
+            print(" ".join(command))
+            return True
+        self.log_folder.mkdir(parents=True, exist_ok=True)
+        self.packages_folder.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_folder / f"{node.replace('/', '-')}.log"
+        archive = self.archive(node)
+        graph = archive.with_suffix(".graph.json")
+        package_list = archive.with_suffix(".list.json")
+        restored = self._restored[home]
+        start = time.perf_counter()
+        with log_path.open("w") as log_file:
+            returncode = 0
+            for dependency in self._plan_dependencies(node):
+                if dependency not in restored and self.archive(dependency).is_file():
+                    returncode = self._conan(["cache", "restore", str(self.archive(dependency))], home, log_file)
+                    if returncode:
+                        break
+                    restored.add(dependency)
+            returncode = returncode or self._conan(command[1:] + ["--format=json", f"--out-file={graph}"], home, log_file)
+            # Everything the build produced, including the dependencies built because of --build arguments
+            returncode = returncode or self._conan(["list", f"--graph={graph}", "--graph-binaries=build", "--format=json",
+                                                    f"--out-file={package_list}"], home, log_file)
+            returncode = returncode or self._conan(["cache", "save", f"--list={package_list}", f"--file={archive}"], home, log_file)
+            if not returncode:
+                restored.add(node)
+                with self._main_home_lock:
+                    returncode = self._conan(["cache", "restore", str(archive)], self.main_home, log_file)
+        elapsed = time.perf_counter() - start
+        if returncode:
+            log.error("%s failed after %.0fs, see %s", node, elapsed, log_path)
+        else:
+            log.info("%s built in %.0fs", node, elapsed)
+        return returncode == 0
+
+    def _acquire(self, jobs: int) -> Path:
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= jobs)
+            self._available -= jobs
+            if self._free_homes:
+                return self._free_homes.pop()
+            self._homes += 1
+            home = self.homes_folder / str(self._homes)
+        if not self.dry_run:
+            self._prepare_home(home)
+        self._restored[home] = set()
+        return home
+
+    def _release(self, jobs: int, home: Path) -> None:
+        with self._condition:
+            self._available += jobs
+            self._free_homes.append(home)
+            self._condition.notify_all()
+
+    def _run_node(self, node: str, jobs: int, home: Path) -> None:
+        try:
+            self.state.set_status(node, RUNNING)
+            self.state.set_status(node, DONE if self._build(node, home) else FAILED)
+        except BaseException:
+            self.state.set_status(node, FAILED)
+            raise
+        finally:
+            self._release(jobs, home)
+
+    def _blocked(self, node: str) -> bool:
+        return any(self.state.status(d) in (FAILED, BLOCKED) for d in self.state.data["dependencies"][node])
+
+    def run_layer(self, layer: List[str]) -> bool:
+        # Start the most expensive builds first so that small ones fill the remaining budget
+        pending = sorted((n for n in layer if self.state.status(n) != DONE), key=lambda n: (-self.jobs_for(n), n))
+        threads = []
+        for node in pending:
+            if self._blocked(node):
+                log.warning("%s skipped, one of its dependencies failed", node)
+                self.state.set_status(node, BLOCKED)
+                continue
+            jobs = self.jobs_for(node)
+            home = self._acquire(jobs)
+            thread = threading.Thread(target=self._run_node, args=(node, jobs, home), name=node)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return all(self.state.status(n) == DONE for n in layer)
+
+    def run(self) -> bool:
+        if self.main_home is None and not self.dry_run:
+            self.main_home = conan_home()
+        self.state.reset_incomplete()
+        first = self.state.first_incomplete_layer()
+        if first is None:
+            log.info("Nothing to do, every recipe of the plan is already built")
+            return True
+        layers = self.state.data["layers"]
+        success = True
+        for index in range(first, len(layers)):
+            log.info("Layer %d/%d: %d recipes", index + 1, len(layers), len(layers[index]))
+            if not self.run_layer(layers[index]):
+                success = False
+                if not self.keep_going:
+                    log.error("Stopping after layer %d, re-run with 'resume' once fixed", index + 1)
+                    break
+        return success
+
+
+def _parse_build_jobs_overrides(values: List[str], parser: argparse.ArgumentParser) -> Dict[str, int]:
+    overrides = {}
+    for value in values:
+        name, sep, jobs = value.partition("=")
+        if not sep or not jobs.isdigit():
+            parser.error(f"invalid --build-jobs-for '{value}', expected NAME=JOBS")
+        overrides[name] = int(jobs)
+    return overrides
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     epilog="Arguments after '--' are passed to every 'conan create', e.g. -- -pr:a myprofile")
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--db", dest="db", type=Path, default=DEFAULT_DB, help=f"index file (default: {DEFAULT_DB})")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("--state", dest="state", type=Path, default=DEFAULT_STATE, help=f"state file (default: {DEFAULT_STATE})")
+
+    run_parser = argparse.ArgumentParser(add_help=False)
+    run_parser.add_argument("--budget", dest="budget", type=int, default=os.cpu_count(),
+                            help="total number of jobs shared by the concurrent builds (default: cpu count)")
+    run_parser.add_argument("--build-jobs", dest="build_jobs", type=int, default=4,
+                            help="tools.build:jobs of every build (default: 4)")
+    run_parser.add_argument("--build-jobs-for", dest="build_jobs_overrides", action="append", default=[], metavar="NAME=JOBS",
+                            help="tools.build:jobs for a recipe name or reference, e.g. boost=16 (repeatable)")
+    run_parser.add_argument("--keep-going", dest="keep_going", action="store_true",
+                            help="continue with the next layers when a build fails, skipping its dependents")
+    run_parser.add_argument("--logs", dest="logs", type=Path, default=CACHE_FOLDER / "rebuild-logs", help="folder of the build logs")
+    run_parser.add_argument("--homes", dest="homes", type=Path, default=DEFAULT_HOMES,
+                            help=f"folder of the Conan homes of the concurrent builds (default: {DEFAULT_HOMES})")
+    run_parser.add_argument("--packages", dest="packages", type=Path, default=DEFAULT_PACKAGES,
+                            help=f"folder of the archives of the built packages (default: {DEFAULT_PACKAGES})")
+    run_parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="print the conan commands instead of running them")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    start_parser = subparsers.add_parser("start", parents=[run_parser], help="plan and run a new rebuild")
+    start_parser.add_argument("references", nargs="+", help="name, name/version or name/[range]")
+    start_parser.add_argument("--dependents", dest="dependents", action="store_true",
+                              help="also rebuild every recipe that transitively requires the given references")
+    start_parser.add_argument("--kinds", dest="kinds", default="requires,tool_requires", help="requirement kinds to follow")
+    start_parser.add_argument("--force", dest="force", action="store_true", help="discard an unfinished previous rebuild")
+    subparsers.add_parser("resume", parents=[run_parser], help="continue the rebuild from its first incomplete layer")
+    subparsers.add_parser("status", help="show the progress of the current rebuild")
+    args = sys.argv[1:] if args is None else list(args)
+    conan_args = []
+    if "--" in args:
+        args, conan_args = args[:args.index("--")], args[args.index("--") + 1:]
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(asctime)s] [%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    if ns.command == "status":
+        if not ns.state.is_file():
+            print("No rebuild in progress")
+            return 0
+        state = RebuildState.load(ns.state)
+        for index, layer in enumerate(state.data["layers"]):
+            print(f"Layer {index + 1}: " + " ".join(f"{n}[{state.status(n)}]" for n in layer))
+        print(", ".join(f"{count} {status}" for status, count in sorted(state.summary().items())))
+        return 0
+
+    if ns.command == "start":
+        if ns.state.is_file() and not ns.force:
+            state = RebuildState.load(ns.state)
+            if state.first_incomplete_layer() is not None:
+                log.error("An unfinished rebuild exists in %s, use 'resume' or 'start --force'", ns.state)
+                return 1
+        with RecipeIndex(ns.db) as index:
+            index.update(ns.root)
+            graph = RecipeGraph.from_index(index, [k.strip() for k in ns.kinds.split(",")])
+        try:
+            targets = graph.select(ns.references)
+        except ValueError as exc:
+            log.error("%s", exc)
+            return 1
+        if not targets:
+            log.error("No recipe version matches %s", " ".join(ns.references))
+            return 1
+        nodes = graph.reverse_closure(targets) if ns.dependents else targets
+        layers = graph.layers(nodes)
+        state = RebuildState.create(ns.state, graph, layers, conan_args, persist=not ns.dry_run)
+        log.info("Planned %d recipes in %d layers", len(nodes), len(layers))
+    else:
+        if not ns.state.is_file():
+            log.error("No rebuild to resume in %s", ns.state)
+            return 1
+        state = RebuildState.load(ns.state)
+        state.persist = not ns.dry_run
+
+    scheduler = Scheduler(state, ns.root, budget=ns.budget, build_jobs=ns.build_jobs,
+                          build_jobs_overrides=_parse_build_jobs_overrides(ns.build_jobs_overrides, parser),
+                          log_folder=ns.logs, keep_going=ns.keep_going, dry_run=ns.dry_run, homes_folder=ns.homes,
+                          packages_folder=ns.packages)
+    success = scheduler.run()
+    summary = state.summary()
+    log.info("%s", ", ".join(f"{count} {status}" for status, count in sorted(summary.items())))
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+
+"""
+Static requirement graph of the recipes tree.
+
+The graph is computed from the recipe index (see recipe_index.py): every recipe version is a node,
+and every literal requirement of its conanfile is resolved against the versions of the dependency
+listed in its config.yml, picking the highest version that satisfies a version range like Conan does.
+
+Requirements are collected statically, so conditional requirements are all included: the graph is a
+superset of what ``conan graph info`` would report for a given configuration.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from recipe_index import DEFAULT_DB, ROOT, RecipeIndex
+
+log = logging.Logger("recipe-graph")
+log.parent = logging.root
+log.setLevel(logging.WARNING)
+
+
+DEFAULT_KINDS = ("requires", "tool_requires")
+
+# Bump when the resolution logic changes, to invalidate the graph cached in the index
+GRAPH_VERSION = "1"
+
+# build_requires is the legacy name of tool_requires
+_KIND_ALIASES = {
+    "build_requires": "tool_requires",
+}
+
+
+class Version(object):
+    """Subset of the Conan version model, enough to order and match recipe versions."""
+
+    def __init__(self, value: str):
+        self.value = str(value)
+        main = self.value.split("+", 1)[0]
+        main, dash, pre = main.partition("-")
+        self.is_prerelease = bool(dash)
+        self.pre = pre
+        items = [self._item(i) for i in main.split(".")]
+        while len(items) > 1 and items[-1] == 0:
+            items.pop()
+        self.main = tuple(items)
+
+    @staticmethod
+    def _item(value: str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+    def _key(self):
+        # ints sort before strings, and pre-releases sort before the release
+        main = tuple((0, i, "") if isinstance(i, int) else (1, 0, i) for i in self.main)
+        return main, 0 if self.is_prerelease else 1, self.pre
+
+    def __eq__(self, other):
+        return self._key() == other._key()
+
+    def __lt__(self, other):
+        return self._key() < other._key()
+
+    def __le__(self, other):
+        return self._key() <= other._key()
+
+    def __gt__(self, other):
+        return self._key() > other._key()
+
+    def __ge__(self, other):
+        return self._key() >= other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return self.value
+
+    def upper_bound(self, index: int) -> "Version":
+        items = list(self.main) + [0] * (index + 1 - len(self.main))
+        bumped = items[index] + 1 if isinstance(items[index], int) else 1
+        return Version(".".join(str(i) for i in items[:index] + [bumped]) + "-")
+
+
+class VersionRange(object):
+    """Conan version range expression, e.g. ``>=1.2.11 <2``, ``^0.3.27``, ``~1.5 || >=2``."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        tokens = [t.strip() for t in expression.split(",")]
+        self.include_prerelease = "include_prerelease" in tokens[1:]
+        self.conditions = []
+        for alternative in tokens[0].split("||"):
+            conditions = []
+            for condition in alternative.split():
+                conditions.extend(self._parse_condition(condition))
+            self.conditions.append(conditions)
+
+    @staticmethod
+    def _parse_condition(condition: str) -> List[Tuple[str, Version]]:
+        if condition in ("*", ""):
+            return []
+        match = re.match(r"(>=|<=|>|<|=|~|\^)?(.+)", condition)
+        operator, version = match.group(1) or "=", match.group(2)
+        if operator == "~":
+            v = Version(version)
+            return [(">=", v), ("<", v.upper_bound(1 if len(v.main) > 1 else 0))]
+        if operator == "^":
+            v = Version(version)
+            index = next((i for i, m in enumerate(v.main) if m != 0), len(v.main) - 1)
+            return [(">=", v), ("<", v.upper_bound(index))]
+        if operator == "<":
+            # <2 must not accept 2.0-pre
+            version = version if "-" in version else version + "-"
+        return [(operator, Version(version))]
+
+    def contains(self, version: Version) -> bool:
+        if version.is_prerelease and not self.include_prerelease:
+            return False
+        for conditions in self.conditions:
+            if all(self._check(operator, bound, version) for operator, bound in conditions):
+                return True
+        return False
+
+    @staticmethod
+    def _check(operator: str, bound: Version, version: Version) -> bool:
+        if operator == ">=":
+            return version >= bound
+        if operator == ">":
+            return version > bound
+        if operator == "<=":
+            return version <= bound
+        if operator == "<":
+            return version < bound
+        return version == bound
+
+
+def parse_reference(reference: str) -> Tuple[str, str]:
+    """Split ``name/version@user/channel#rev`` into name and version expression."""
+    reference = reference.split("#", 1)[0].split("@", 1)[0]
+    name, _, version = reference.partition("/")
+    return name.strip(), version.strip()
+
+
+class RecipeGraph(object):
+    def __init__(self, versions: Dict[str, Dict[str, str]], edges: Dict[str, List[str]], unresolved: Dict[str, List[str]]):
+        self.versions = versions
+        self.edges = edges
+        self.unresolved = unresolved
+        self.reverse_edges = {}
+        for node, dependencies in edges.items():
+            for dependency in dependencies:
+                self.reverse_edges.setdefault(dependency, []).append(node)
+
+    @staticmethod
+    def node(name: str, version: str) -> str:
+        return f"{name}/{version}"
+
+    @staticmethod
+    def node_name(node: str) -> str:
+        return node.split("/", 1)[0]
+
+    @classmethod
+    def from_index(cls, index: RecipeIndex, kinds: Iterable[str] = DEFAULT_KINDS) -> "RecipeGraph":
+        kinds = tuple(sorted(set(kinds)))
+        fingerprint = cls._fingerprint(index, kinds)
+        index.connection.execute("CREATE TABLE IF NOT EXISTS graph_cache (fingerprint TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        row = index.connection.execute("SELECT data FROM graph_cache WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        if row:
+            data = json.loads(row[0])
+            return cls(data["versions"], data["edges"], data["unresolved"])
+
+        graph = cls._compute(index, kinds)
+        with index.connection:
+            index.connection.execute("DELETE FROM graph_cache")
+            index.connection.execute("INSERT INTO graph_cache VALUES (?, ?)", (fingerprint, json.dumps({
+                "versions": graph.versions, "edges": graph.edges, "unresolved": graph.unresolved,
+            })))
+        return graph
+
+    @staticmethod
+    def _fingerprint(index: RecipeIndex, kinds: Tuple[str, ...]) -> str:
+        sha = hashlib.sha1(f"{GRAPH_VERSION}:{','.join(kinds)}".encode())
+        for path, blob in index.connection.execute("SELECT path, blob FROM files ORDER BY path"):
+            sha.update(f"{path}\0{blob}\n".encode())
+        return sha.hexdigest()
+
+    @classmethod
+    def _compute(cls, index: RecipeIndex, kinds: Tuple[str, ...]) -> "RecipeGraph":
+        versions = index.versions()
+        sorted_versions = {name: sorted(vs, key=Version, reverse=True) for name, vs in versions.items()}
+        requirements = index.folder_requirements()
+
+        resolved_cache = {}
+
+        def resolve(name: str, expression: str, literal: bool) -> Optional[str]:
+            key = (name, expression, literal)
+            if key not in resolved_cache:
+                resolved_cache[key] = cls._resolve(sorted_versions.get(name, []), expression, literal)
+            return resolved_cache[key]
+
+        edges = {}
+        unresolved = {}
+        for name, recipe_versions in versions.items():
+            for version, folder in recipe_versions.items():
+                node = cls.node(name, version)
+                dependencies = edges.setdefault(node, [])
+                folder_requirements = requirements.get((name, folder), [])
+                # "<host_version>" reuses the version resolved for the same package in the host context
+                host_versions = {}
+                for requirement in folder_requirements:
+                    if requirement["kind"] == "requires":
+                        dep_name, expression = parse_reference(requirement["ref"])
+                        if not expression.startswith("<"):
+                            host_versions[dep_name] = resolve(dep_name, expression, requirement["literal"])
+                for requirement in folder_requirements:
+                    kind = _KIND_ALIASES.get(requirement["kind"], requirement["kind"])
+                    if kind not in kinds:
+                        continue
+                    dep_name, expression = parse_reference(requirement["ref"])
+                    if expression.startswith("<host_version"):
+                        host_name = expression.strip("<>").partition(":")[2] or dep_name
+                        dep_version = host_versions.get(host_name) or resolve(dep_name, "", False)
+                    else:
+                        dep_version = resolve(dep_name, expression, requirement["literal"])
+                    if dep_version is None:
+                        unresolved.setdefault(node, []).append(requirement["ref"])
+                        continue
+                    dependency = cls.node(dep_name, dep_version)
+                    if dependency != node and dependency not in dependencies:
+                        dependencies.append(dependency)
+        return cls(versions, edges, unresolved)
+
+    @staticmethod
+    def _resolve(candidates: List[str], expression: str, literal: bool) -> Optional[str]:
+        if not candidates:
+            return None
+        if not literal or "{" in expression:
+            # Version computed at runtime: assume the latest one
+            return candidates[0]
+        if expression.startswith("[") and expression.endswith("]"):
+            version_range = VersionRange(expression[1:-1])
+            return next((v for v in candidates if version_range.contains(Version(v))), None)
+        if expression in candidates:
+            return expression
+        wanted = Version(expression)
+        # Pinned version no longer in config.yml, e.g. "system" or removed versions
+        return next((v for v in candidates if Version(v) == wanted), None)
+
+    def select(self, patterns: Iterable[str]) -> Set[str]:
+        """Expand ``name`` or ``name/version`` (version may be a range) into graph nodes."""
+        nodes = set()
+        for pattern in patterns:
+            name, expression = parse_reference(pattern)
+            if name not in self.versions:
+                raise ValueError(f"Unknown recipe '{name}'")
+            for version in self.versions[name]:
+                if not expression or expression == version or (
+                        expression.startswith("[") and VersionRange(expression[1:-1]).contains(Version(version))):
+                    nodes.add(self.node(name, version))
+        return nodes
+
+    def _walk(self, start: Iterable[str], adjacency: Dict[str, List[str]]) -> Set[str]:
+        seen = set(start)
+        stack = list(seen)
+        while stack:
+            for next_node in adjacency.get(stack.pop(), ()):
+                if next_node not in seen:
+                    seen.add(next_node)
+                    stack.append(next_node)
+        return seen
+
+    def reverse_closure(self, nodes: Iterable[str]) -> Set[str]:
+        """Nodes that transitively depend on any of nodes, nodes included."""
+        return self._walk(nodes, self.reverse_edges)
+
+    def closure(self, nodes: Iterable[str]) -> Set[str]:
+        """Nodes that any of nodes transitively depends on, nodes included."""
+        return self._walk(nodes, self.edges)
+
+    def strongly_connected_components(self, nodes: Set[str]) -> List[List[str]]:
+        """Tarjan's algorithm (iterative) restricted to nodes, components in reverse topological order."""
+        index_of = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        for root in sorted(nodes):
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(d for d in self.edges.get(root, ()) if d in nodes)))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(d for d in self.edges.get(child, ()) if d in nodes))))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def layers(self, nodes: Set[str]) -> List[List[str]]:
+        """Group nodes so that every node only depends on nodes of previous layers.
+
+        Nodes of a dependency cycle are kept together in the same layer.
+        """
+        layer_of = {}
+        for component in self.strongly_connected_components(nodes):
+            members = set(component)
+            dependencies = [d for n in component for d in self.edges.get(n, ()) if d in nodes and d not in members]
+            layer = max((layer_of[d] + 1 for d in dependencies), default=0)
+            for member in component:
+                layer_of[member] = layer
+        result = [[] for _ in range(max(layer_of.values(), default=-1) + 1)]
+        for node, layer in layer_of.items():
+            result[layer].append(node)
+        return [sorted(layer) for layer in result]
+
+    def critical_path(self, nodes: Set[str], weights: Optional[Dict[str, float]] = None) -> Tuple[float, List[str]]:
+        """Longest chain of dependent nodes, weighted by build cost (1 per node by default).
+
+        Weights are looked up by ``name/version`` first, then by ``name``.
+        """
+        weights = weights or {}
+
+        def weight(node: str) -> float:
+            return float(weights.get(node, weights.get(self.node_name(node), 1)))
+
+        best = {}
+        for component in self.strongly_connected_components(nodes):
+            members = set(component)
+            cost = sum(weight(n) for n in component)
+            previous = max(((best[d][0], d) for n in component for d in self.edges.get(n, ())
+                            if d in nodes and d not in members), default=(0.0, None))
+            best_path = (best[previous[1]][1] if previous[1] else []) + component
+            for member in component:
+                best[member] = (previous[0] + cost, best_path)
+        if not best:
+            return 0.0, []
+        return max(best.values(), key=lambda item: (item[0], len(item[1])))
+
+
+def _print(result, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(result, indent=2))
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            print(f"{key}: {' '.join(value) if isinstance(value, list) else value}")
+    else:
+        for item in result:
+            print(" ".join(item) if isinstance(item, list) else item)
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--db", dest="db", type=Path, default=DEFAULT_DB, help=f"index file (default: {DEFAULT_DB})")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("--no-update", dest="update", action="store_false", help="use the index as is, without refreshing it")
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument("--kinds", dest="kinds", default=",".join(DEFAULT_KINDS),
+                               help="comma separated requirement kinds to follow (requires, tool_requires, test_requires)")
+    output_parser.add_argument("--names", dest="names", action="store_true", help="report recipe names instead of recipe versions")
+    output_parser.add_argument("--json", dest="json", action="store_true", help="json output")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rdeps_parser = subparsers.add_parser("rdeps", parents=[output_parser], help="recipes that transitively require the given references")
+    rdeps_parser.add_argument("references", nargs="+", help="name, name/version or name/[range]")
+
+    deps_parser = subparsers.add_parser("deps", parents=[output_parser], help="recipes transitively required by the given references")
+    deps_parser.add_argument("references", nargs="+", help="name, name/version or name/[range]")
+
+    for name, help_message in (("layers", "topological build layers of the dependents of the given references"),
+                               ("critical-path", "longest chain of builds among the dependents of the given references")):
+        sub = subparsers.add_parser(name, parents=[output_parser], help=help_message)
+        sub.add_argument("references", nargs="+", help="name, name/version or name/[range]")
+        sub.add_argument("--only", dest="only", action="store_true", help="only the given references, not their dependents")
+        if name == "critical-path":
+            sub.add_argument("--weights", dest="weights", type=Path, help="json file mapping name or name/version to build cost")
+
+    subparsers.add_parser("unresolved", parents=[output_parser], help="requirements that match no version of the index")
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    with RecipeIndex(ns.db) as index:
+        if ns.update:
+            index.update(ns.root)
+        graph = RecipeGraph.from_index(index, [k.strip() for k in ns.kinds.split(",")])
+
+    def output_nodes(nodes):
+        return sorted(set(graph.node_name(n) for n in nodes)) if ns.names else sorted(nodes)
+
+    try:
+        targets = graph.select(getattr(ns, "references", []))
+    except ValueError as exc:
+        log.error("%s", exc)
+        return 1
+
+    if ns.command == "rdeps":
+        _print(output_nodes(graph.reverse_closure(targets) - targets), ns.json)
+    elif ns.command == "deps":
+        _print(output_nodes(graph.closure(targets) - targets), ns.json)
+    elif ns.command == "layers":
+        nodes = targets if ns.only else graph.reverse_closure(targets)
+        _print([output_nodes(layer) for layer in graph.layers(nodes)], ns.json)
+    elif ns.command == "critical-path":
+        nodes = targets if ns.only else graph.reverse_closure(targets)
+        weights = json.loads(ns.weights.read_text()) if ns.weights else None
+        cost, path = graph.critical_path(nodes, weights)
+        _print({"cost": cost, "path": path}, ns.json)
+    elif ns.command == "unresolved":
+        _print({node: refs for node, refs in sorted(graph.unresolved.items())}, ns.json)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+
+"""
+Incrementally maintained SQLite index of the recipes tree.
+
+Every ``recipes/<name>/config.yml``, ``recipes/<name>/<folder>/conandata.yml`` and
+``recipes/<name>/<folder>/conanfile.py`` is parsed once per git blob hash: conanfiles are
+inspected statically through their AST, they are never imported. Rebuilding the index only
+re-parses files whose blob changed since the previous run.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import logging
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+log = logging.Logger("recipe-index")
+log.parent = logging.root
+log.setLevel(logging.WARNING)
+
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_FOLDER = ROOT / ".cci-cache"
+DEFAULT_DB = CACHE_FOLDER / "recipe-index.sqlite"
+
+# Bump when the parsers below change what they extract, so that cached blobs get re-parsed
+SCHEMA_VERSION = "1"
+
+REQUIRE_METHODS = (
+    "requires",
+    "tool_requires",
+    "build_requires",
+    "test_requires",
+)
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    folder TEXT,
+    kind TEXT NOT NULL,
+    blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_recipe ON files (recipe, folder, kind);
+CREATE TABLE IF NOT EXISTS parsed_blobs (
+    blob TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS config_versions (
+    blob TEXT NOT NULL,
+    version TEXT NOT NULL,
+    folder TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS config_versions_blob ON config_versions (blob);
+CREATE TABLE IF NOT EXISTS conandata_sources (
+    blob TEXT NOT NULL,
+    version TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    url TEXT,
+    sha256 TEXT
+);
+CREATE INDEX IF NOT EXISTS conandata_sources_blob ON conandata_sources (blob, version);
+CREATE TABLE IF NOT EXISTS conanfile_attributes (
+    blob TEXT PRIMARY KEY,
+    name TEXT,
+    package_type TEXT,
+    license TEXT
+);
+CREATE TABLE IF NOT EXISTS conanfile_options (
+    blob TEXT NOT NULL,
+    option TEXT NOT NULL,
+    "values" TEXT,
+    default_value TEXT
+);
+CREATE INDEX IF NOT EXISTS conanfile_options_blob ON conanfile_options (blob);
+CREATE TABLE IF NOT EXISTS conanfile_requires (
+    blob TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    literal INTEGER NOT NULL,
+    conditional INTEGER NOT NULL,
+    lineno INTEGER
+);
+CREATE INDEX IF NOT EXISTS conanfile_requires_blob ON conanfile_requires (blob);
+
+CREATE VIEW IF NOT EXISTS recipe_versions AS
+    SELECT f.recipe AS recipe, c.version AS version, c.folder AS folder
+    FROM files f JOIN config_versions c ON c.blob = f.blob
+    WHERE f.kind = 'config';
+CREATE VIEW IF NOT EXISTS sources AS
+    SELECT rv.recipe, rv.version, rv.folder, s.variant, s.url, s.sha256
+    FROM recipe_versions rv
+    JOIN files f ON f.recipe = rv.recipe AND f.folder = rv.folder AND f.kind = 'conandata'
+    JOIN conandata_sources s ON s.blob = f.blob AND s.version = rv.version;
+CREATE VIEW IF NOT EXISTS options AS
+    SELECT rv.recipe, rv.version, rv.folder, o.option, o."values", o.default_value
+    FROM recipe_versions rv
+    JOIN files f ON f.recipe = rv.recipe AND f.folder = rv.folder AND f.kind = 'conanfile'
+    JOIN conanfile_options o ON o.blob = f.blob;
+CREATE VIEW IF NOT EXISTS requirements AS
+    SELECT rv.recipe, rv.version, rv.folder, r.kind, r.ref, r.literal, r.conditional, r.lineno
+    FROM recipe_versions rv
+    JOIN files f ON f.recipe = rv.recipe AND f.folder = rv.folder AND f.kind = 'conanfile'
+    JOIN conanfile_requires r ON r.blob = f.blob;
+"""
+
+_BLOB_TABLES = (
+    "config_versions",
+    "conandata_sources",
+    "conanfile_attributes",
+    "conanfile_options",
+    "conanfile_requires",
+)
+
+
+def classify_path(path: str) -> Optional[Tuple[str, Optional[str], str]]:
+    """Return (recipe, folder, kind) for the files the index cares about, None otherwise."""
+    parts = path.split("/")
+    if len(parts) == 3 and parts[0] == "recipes" and parts[2] == "config.yml":
+        return parts[1], None, "config"
+    if len(parts) == 4 and parts[0] == "recipes":
+        if parts[3] == "conandata.yml":
+            return parts[1], parts[2], "conandata"
+        if parts[3] == "conanfile.py":
+            return parts[1], parts[2], "conanfile"
+    return None
+
+
+def git_blob_hash(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _git(root: Path, *args: str) -> bytes:
+    return subprocess.check_output(["git", "-C", str(root)] + list(args), stderr=subprocess.DEVNULL)
+
+
+def collect_blobs(root: Path) -> Dict[str, str]:
+    """Map every indexed path (relative, posix) of the working tree to its git blob hash.
+
+    Tracked files come straight from the git index; files modified in the working tree or not
+    tracked at all are hashed. Outside of a git checkout, everything is hashed.
+    """
+    blobs = {}
+    try:
+        staged = _git(root, "ls-files", "-s", "-z", "--", "recipes")
+        changed = _git(root, "ls-files", "-m", "-o", "--exclude-standard", "-z", "--", "recipes")
+    except (OSError, subprocess.CalledProcessError):
+        log.info("%s is not a git checkout, hashing every file", root)
+        for pattern in ("recipes/*/config.yml", "recipes/*/*/conandata.yml", "recipes/*/*/conanfile.py"):
+            for path in root.glob(pattern):
+                blobs[path.relative_to(root).as_posix()] = git_blob_hash(path.read_bytes())
+        return blobs
+
+    for entry in staged.split(b"\0"):
+        if not entry:
+            continue
+        info, path = entry.decode().split("\t", 1)
+        if classify_path(path):
+            blobs[path] = info.split()[1]
+
+    for path in set(changed.decode().split("\0")):
+        if not path or not classify_path(path):
+            continue
+        full_path = root / path
+        if full_path.is_file():
+            blobs[path] = git_blob_hash(full_path.read_bytes())
+        else:
+            # Deleted in the working tree
+            blobs.pop(path, None)
+    return blobs
+
+
+def _literal(node: ast.AST):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def _dump(value) -> Optional[str]:
+    return None if value is None else json.dumps(value, sort_keys=True)
+
+
+def _is_conanfile_class(node: ast.ClassDef) -> bool:
+    for base in node.bases:
+        if isinstance(base, ast.Name) and base.id == "ConanFile":
+            return True
+        if isinstance(base, ast.Attribute) and base.attr == "ConanFile":
+            return True
+    return False
+
+
+def _reference_argument(node: ast.AST) -> Optional[Tuple[str, bool]]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value, True
+    if isinstance(node, ast.JoinedStr):
+        # f"boost/{self._boost_version}": the package name is usually still usable
+        return ast.unparse(node)[2:-1], False
+    return None
+
+
+_CONDITIONAL_NODES = (ast.If, ast.IfExp, ast.For, ast.While, ast.Try, ast.BoolOp, ast.comprehension)
+
+
+def _find_require_calls(node: ast.AST, conditional: bool, found: list) -> None:
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == "self" \
+            and node.func.attr in REQUIRE_METHODS:
+        argument = node.args[0] if node.args else next((k.value for k in node.keywords if k.arg == "ref"), None)
+        reference = _reference_argument(argument) if argument is not None else None
+        if reference:
+            found.append((node.func.attr, reference[0], reference[1], conditional, node.lineno))
+    conditional = conditional or isinstance(node, _CONDITIONAL_NODES)
+    for child in ast.iter_child_nodes(node):
+        _find_require_calls(child, conditional, found)
+
+
+def parse_conanfile(text: str) -> dict:
+    """Statically extract attributes, options and requirements from a recipe."""
+    tree = ast.parse(text)
+    classes = [n for n in tree.body if isinstance(n, ast.ClassDef)]
+    conanfiles = [n for n in classes if _is_conanfile_class(n)] or classes
+    result = {"attributes": {}, "options": {}, "default_options": {}, "requires": []}
+    if not conanfiles:
+        return result
+    conanfile = conanfiles[0]
+
+    for statement in conanfile.body:
+        if isinstance(statement, ast.Assign) and len(statement.targets) == 1 and isinstance(statement.targets[0], ast.Name):
+            target = statement.targets[0].id
+            value = statement.value
+            if target in ("name", "package_type", "license"):
+                result["attributes"][target] = _literal(value)
+            elif target in ("options", "default_options") and isinstance(value, ast.Dict):
+                for key, option_value in zip(value.keys, value.values):
+                    key = _literal(key) if key is not None else None
+                    if isinstance(key, str):
+                        result[target][key] = _literal(option_value)
+            elif target in REQUIRE_METHODS:
+                references = _literal(value)
+                if isinstance(references, str):
+                    references = [references]
+                for reference in references or []:
+                    if isinstance(reference, str):
+                        result["requires"].append((target, reference, True, False, statement.lineno))
+        elif isinstance(statement, ast.FunctionDef):
+            _find_require_calls(statement, False, result["requires"])
+    return result
+
+
+def _source_entries(entry, variant: Tuple[str, ...] = ()) -> Iterable[Tuple[str, Optional[str], Optional[str]]]:
+    if isinstance(entry, dict):
+        if "url" in entry:
+            urls = entry["url"]
+            for url in urls if isinstance(urls, list) else [urls]:
+                yield "/".join(variant), str(url), entry.get("sha256")
+            return
+        for key, value in entry.items():
+            yield from _source_entries(value, variant + (str(key),))
+    elif isinstance(entry, list):
+        for index, value in enumerate(entry):
+            yield from _source_entries(value, variant + (str(index),) if len(entry) > 1 else variant)
+
+
+def parse_conandata(text: str) -> dict:
+    data = yaml.load(text, Loader=_YAML_LOADER) or {}
+    sources = []
+    for version, entry in (data.get("sources") or {}).items():
+        for variant, url, sha256 in _source_entries(entry):
+            sources.append((str(version), variant, url, sha256))
+    return {"sources": sources}
+
+
+def parse_config(text: str) -> dict:
+    data = yaml.load(text, Loader=_YAML_LOADER) or {}
+    versions = []
+    for version, entry in (data.get("versions") or {}).items():
+        versions.append((str(version), str((entry or {}).get("folder", "all"))))
+    return {"versions": versions}
+
+
+_PARSERS = {
+    "config": parse_config,
+    "conandata": parse_conandata,
+    "conanfile": parse_conanfile,
+}
+
+
+def _parse_file(job: Tuple[str, str, str]) -> Tuple[str, str, Optional[dict], Optional[str]]:
+    path, blob, kind = job
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+        return blob, kind, _PARSERS[kind](text), None
+    except Exception as exc:  # A broken recipe must not break the index
+        return blob, kind, None, f"{type(exc).__name__}: {exc}"
+
+
+class RecipeIndex(object):
+    def __init__(self, db_path: Path = DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.executescript(_SCHEMA)
+        self._check_schema_version()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check_schema_version(self) -> None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row and row[0] == SCHEMA_VERSION:
+            return
+        with self.connection:
+            for table in _BLOB_TABLES + ("parsed_blobs", "files"):
+                self.connection.execute(f"DELETE FROM {table}")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (SCHEMA_VERSION,))
+
+    def _store(self, blob: str, kind: str, parsed: Optional[dict], error: Optional[str]) -> None:
+        execute = self.connection.execute
+        execute("INSERT OR REPLACE INTO parsed_blobs VALUES (?, ?, ?)", (blob, kind, error))
+        if parsed is None:
+            return
+        if kind == "config":
+            self.connection.executemany("INSERT INTO config_versions VALUES (?, ?, ?)",
+                                        [(blob, version, folder) for version, folder in parsed["versions"]])
+        elif kind == "conandata":
+            self.connection.executemany("INSERT INTO conandata_sources VALUES (?, ?, ?, ?, ?)",
+                                        [(blob,) + tuple(source) for source in parsed["sources"]])
+        elif kind == "conanfile":
+            attributes = parsed["attributes"]
+            execute("INSERT OR REPLACE INTO conanfile_attributes VALUES (?, ?, ?, ?)",
+                    (blob, attributes.get("name"), attributes.get("package_type"), _dump(attributes.get("license"))))
+            names = list(parsed["options"]) + [o for o in parsed["default_options"] if o not in parsed["options"]]
+            self.connection.executemany("INSERT INTO conanfile_options VALUES (?, ?, ?, ?)",
+                                        [(blob, name, _dump(parsed["options"].get(name)), _dump(parsed["default_options"].get(name)))
+                                         for name in names])
+            self.connection.executemany("INSERT INTO conanfile_requires VALUES (?, ?, ?, ?, ?, ?)",
+                                        [(blob, kind_, ref, int(literal), int(conditional), lineno)
+                                         for kind_, ref, literal, conditional, lineno in parsed["requires"]])
+
+    def _prune_blobs(self) -> None:
+        """Drop parse results of blobs no longer referenced by any file of the tree."""
+        unreferenced = "blob NOT IN (SELECT blob FROM files)"
+        for table in _BLOB_TABLES + ("parsed_blobs",):
+            self.connection.execute(f"DELETE FROM {table} WHERE {unreferenced}")
+
+    def update(self, root: Path = ROOT, jobs: Optional[int] = None) -> Tuple[int, int]:
+        """Synchronize the index with the recipes tree below root.
+
+        Returns the number of files parsed during this call and the total number of indexed files.
+        """
+        root = Path(root)
+        blobs = collect_blobs(root)
+        known = set(row[0] for row in self.connection.execute("SELECT blob FROM parsed_blobs"))
+        todo = {}
+        for path, blob in blobs.items():
+            if blob not in known and blob not in todo:
+                todo[blob] = (str(root / path), blob, classify_path(path)[2])
+
+        if len(todo) > 50 and jobs != 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_parse_file, todo.values(), chunksize=32))
+        else:
+            results = [_parse_file(job) for job in todo.values()]
+
+        with self.connection:
+            for blob, kind, parsed, error in results:
+                if error:
+                    log.warning("Could not parse %s: %s", todo[blob][0], error)
+                self._store(blob, kind, parsed, error)
+            self.connection.execute("DELETE FROM files")
+            self.connection.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                                        [(path,) + classify_path(path) + (blob,) for path, blob in sorted(blobs.items())])
+            self._prune_blobs()
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('updated', ?)", (str(int(time.time())),))
+        return len(todo), len(blobs)
+
+    def recipes(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT recipe FROM files ORDER BY recipe")]
+
+    def versions(self, recipe: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """Return {recipe: {version: folder}} as declared in config.yml."""
+        query = "SELECT recipe, version, folder FROM recipe_versions"
+        rows = self.connection.execute(query + " WHERE recipe = ?", (recipe,)) if recipe else self.connection.execute(query)
+        result = {}
+        for name, version, folder in rows:
+            result.setdefault(name, {})[version] = folder
+        return result
+
+    def sources(self, recipe: Optional[str] = None) -> List[dict]:
+        # Same as the sources view, ordered like the conandata.yml so that mirrors are listed in their order
+        query = ("SELECT rv.recipe, rv.version, rv.folder, s.variant, s.url, s.sha256 FROM recipe_versions rv "
+                 "JOIN files f ON f.recipe = rv.recipe AND f.folder = rv.folder AND f.kind = 'conandata' "
+                 "JOIN conandata_sources s ON s.blob = f.blob AND s.version = rv.version")
+        order = " ORDER BY rv.recipe, s.rowid"
+        rows = (self.connection.execute(query + " WHERE rv.recipe = ?" + order, (recipe,)) if recipe
+                else self.connection.execute(query + order))
+        keys = ("recipe", "version", "folder", "variant", "url", "sha256")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def folder_requirements(self, recipe: Optional[str] = None) -> Dict[Tuple[str, str], List[dict]]:
+        """Return {(recipe, folder): [requirement, ...]} without expanding per version."""
+        query = ("SELECT f.recipe, f.folder, r.kind, r.ref, r.literal, r.conditional, r.lineno "
+                 "FROM files f JOIN conanfile_requires r ON r.blob = f.blob WHERE f.kind = 'conanfile'")
+        rows = self.connection.execute(query + " AND f.recipe = ?", (recipe,)) if recipe else self.connection.execute(query)
+        result = {}
+        for name, folder, kind, ref, literal, conditional, lineno in rows:
+            result.setdefault((name, folder), []).append({
+                "kind": kind, "ref": ref, "literal": bool(literal), "conditional": bool(conditional), "lineno": lineno,
+            })
+        return result
+
+    def options(self, recipe: str, folder: str) -> Dict[str, dict]:
+        query = ("SELECT o.option, o.\"values\", o.default_value FROM files f JOIN conanfile_options o ON o.blob = f.blob "
+                 "WHERE f.kind = 'conanfile' AND f.recipe = ? AND f.folder = ?")
+        result = {}
+        for option, values, default in self.connection.execute(query, (recipe, folder)):
+            result[option] = {
+                "values": json.loads(values) if values is not None else None,
+                "default": json.loads(default) if default is not None else None,
+            }
+        return result
+
+    def errors(self) -> List[Tuple[str, str]]:
+        query = "SELECT f.path, p.error FROM files f JOIN parsed_blobs p ON p.blob = f.blob WHERE p.error IS NOT NULL ORDER BY f.path"
+        return list(self.connection.execute(query))
+
+
+def _show(index: RecipeIndex, recipe: str, version: Optional[str]) -> dict:
+    versions = index.versions(recipe).get(recipe, {})
+    if version:
+        versions = {version: versions[version]} if version in versions else {}
+    requirements = index.folder_requirements(recipe)
+    sources = index.sources(recipe)
+    result = {}
+    for ver, folder in versions.items():
+        result[ver] = {
+            "folder": folder,
+            "sources": [{k: s[k] for k in ("variant", "url", "sha256")} for s in sources if s["version"] == ver],
+            "options": index.options(recipe, folder),
+            "requires": requirements.get((recipe, folder), []),
+        }
+    return result
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--db", dest="db", type=Path, default=DEFAULT_DB, help=f"index file (default: {DEFAULT_DB})")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="create or incrementally update the index")
+    build_parser.add_argument("-j", dest="jobs", type=int, default=None, help="parser processes (default: cpu count)")
+
+    show_parser = subparsers.add_parser("show", help="print what is indexed for a recipe as json")
+    show_parser.add_argument("recipe")
+    show_parser.add_argument("version", nargs="?")
+
+    sql_parser = subparsers.add_parser("sql", help="run a read-only SQL query against the index")
+    sql_parser.add_argument("query")
+
+    subparsers.add_parser("errors", help="list the files that could not be parsed")
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    with RecipeIndex(ns.db) as index:
+        if ns.command == "build":
+            start = time.perf_counter()
+            parsed, total = index.update(ns.root, jobs=ns.jobs)
+            print(f"Indexed {total} files ({parsed} new blobs parsed) in {time.perf_counter() - start:.2f}s")
+        elif ns.command == "show":
+            print(json.dumps(_show(index, ns.recipe, ns.version), indent=2))
+        elif ns.command == "sql":
+            index.connection.execute("PRAGMA query_only = ON")
+            for row in index.connection.execute(ns.query):
+                print("\t".join("" if v is None else str(v) for v in row))
+        elif ns.command == "errors":
+            errors = index.errors()
+            for path, error in errors:
+                print(f"{path}: {error}")
+            return 1 if errors else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+Run the benchmark executable built by the test package of a recipe and collect its results.
+
+The test packages of some performance sensitive libraries build a ``benchmark`` executable next to
+``test_package``, measuring the library on a deterministic generated input. This script builds the test
+package with ``conan test`` (any argument after ``--`` is passed to it: profiles, options, ``--build``...),
+runs the benchmark in the runtime environment of the test package, and adds the reference, options and
+settings of the tested package to every result, so that results of different versions, options or profiles
+can be compared.
+
+Every benchmark executable takes two arguments, the size of the measurement (see ``SIZES``) and the number
+of runs per measurement, and prints one JSON object per result.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import yaml
+
+from recipe_index import ROOT
+
+log = logging.Logger("run-benchmarks")
+log.parent = logging.root
+log.setLevel(logging.INFO)
+
+
+# First argument of the benchmark executables: (meaning, default)
+DEFAULT_SIZE = ("MiB of input", 16)
+SIZES = {
+    "ffmpeg": ("CIF frames encoded, decoded and transcoded", 100),
+    "grpc": ("unary echo calls", 20000),
+    "libuv": ("4 KiB reads, the size of the file read in blocks", 4096),
+    "openblas": ("order of the square matrices multiplied by DGEMM", 1024),
+    "sqlite3": ("rows inserted, then looked up", 100000),
+}
+
+# Environment variables the benchmark is also run with, when the tested package has the option:
+# {recipe: (option, variable, values)}, None runs it with the variable unset
+VARIANTS = {
+    # Default of the package, then the file operations forced on the threadpool and on io_uring
+    "libuv": ("with_io_uring", "UV_USE_IO_URING", [None, "0", "1"]),
+}
+
+
+def recipe_folder(root: Path, name: str, version: str) -> Path:
+    with open(root / "recipes" / name / "config.yml") as f:
+        versions = yaml.safe_load(f)["versions"]
+    if version not in versions:
+        raise ValueError(f"{name}/{version} is not in recipes/{name}/config.yml")
+    return root / "recipes" / name / versions[version]["folder"]
+
+
+def benchmark_nodes(graph: dict, name: str) -> Tuple[dict, dict]:
+    """Return the nodes of the test package and of the tested package in the json graph of 'conan test'."""
+    nodes = graph["graph"]["nodes"]
+    tested = next(node for key, node in nodes.items() if key != "0" and node["name"] == name and node["context"] == "host")
+    return nodes["0"], tested
+
+
+def find_benchmark(test_package: dict) -> Optional[Path]:
+    build_folder = Path(test_package["build_folder"])
+    # cmake_layout: the executables are in a subfolder named after the build type for multi-config generators
+    for folder in (build_folder, build_folder / test_package["settings"].get("build_type", "")):
+        for executable in ("benchmark", "benchmark.exe"):
+            if (folder / executable).is_file():
+                return folder / executable
+    return None
+
+
+def benchmark_command(test_package: dict, executable: Path, arguments: List[str]) -> List[str]:
+    generators_folder = Path(test_package["generators_folder"])
+    if (generators_folder / "conanrun.bat").is_file():
+        return ["cmd", "/c", "call", str(generators_folder / "conanrun.bat"), "&&", str(executable)] + arguments
+    return ["sh", "-c", '. "$0" && exec "$@"', str(generators_folder / "conanrun.sh"), str(executable)] + arguments
+
+
+def parse_results(output: str, tested: dict) -> List[dict]:
+    package = {"reference": f"{tested['name']}/{tested['version']}", "options": tested["options"],
+               "settings": tested["settings"]}
+    return [{**json.loads(line), **package} for line in output.splitlines() if line.startswith("{")]
+
+
+def run_benchmark(test_package: dict, tested: dict, size: int, iterations: int) -> List[dict]:
+    executable = find_benchmark(test_package)
+    if executable is None:
+        raise FileNotFoundError(f"no benchmark executable in {test_package['build_folder']}, "
+                                "the test package of this recipe does not build one with these options")
+    command = benchmark_command(test_package, executable, [str(size), str(iterations)])
+    option, variable, values = VARIANTS.get(tested["name"], (None, None, [None]))
+    if option not in tested["options"]:
+        values = [None]
+    results = []
+    for value in values:
+        env = dict(os.environ)
+        env.pop(variable, None)
+        if value is not None:
+            env[variable] = value
+            log.info("Running %s with %s=%s", executable, variable, value)
+        else:
+            log.info("Running %s", executable)
+        output = subprocess.check_output(command, env=env, stdin=subprocess.DEVNULL, text=True)
+        results.extend(parse_results(output, tested))
+    return results
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     epilog="Arguments after '--' are passed to 'conan test', e.g. -- -pr:a myprofile --build=missing")
+    parser.add_argument("--verbose", dest="verbose", action="store_true", help="verbose output")
+    parser.add_argument("--root", dest="root", type=Path, default=ROOT, help="conan-center-index checkout")
+    parser.add_argument("reference", help="name/version of the recipe to benchmark")
+    parser.add_argument("--size", dest="size", type=int,
+                        help="size of the measurement, " + ", ".join(f"{name}: {meaning} (default: {default})"
+                                                                      for name, (meaning, default) in sorted(SIZES.items())) +
+                             f", other recipes: {DEFAULT_SIZE[0]} (default: {DEFAULT_SIZE[1]})")
+    parser.add_argument("--iterations", dest="iterations", type=int, default=3,
+                        help="runs per measurement, the best one is kept (default: 3)")
+    parser.add_argument("--output", dest="output", type=Path, help="JSON Lines file the results are appended to")
+    args = sys.argv[1:] if args is None else list(args)
+    conan_args = []
+    if "--" in args:
+        args, conan_args = args[:args.index("--")], args[args.index("--") + 1:]
+    ns = parser.parse_args(args)
+
+    logging.basicConfig(format="[%(asctime)s] [%(levelname)s] %(message)s")
+    if ns.verbose:
+        log.setLevel(logging.DEBUG)
+
+    name, sep, version = ns.reference.partition("/")
+    if not sep:
+        parser.error(f"invalid reference '{ns.reference}', expected name/version")
+    try:
+        folder = recipe_folder(ns.root, name, version)
+    except (OSError, ValueError) as exc:
+        log.error("%s", exc)
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        graph_file = Path(tmp) / "graph.json"
+        command = ["conan", "test", str(folder / "test_package"), ns.reference,
+                   "--format=json", f"--out-file={graph_file}"] + conan_args
+        log.debug("%s", " ".join(command))
+        if subprocess.call(command, stdin=subprocess.DEVNULL) != 0:
+            log.error("conan test failed for %s", ns.reference)
+            return 1
+        with open(graph_file) as f:
+            graph = json.load(f)
+
+    test_package, tested = benchmark_nodes(graph, name)
+    size = ns.size if ns.size is not None else SIZES.get(name, DEFAULT_SIZE)[1]
+    try:
+        results = run_benchmark(test_package, tested, size, ns.iterations)
+    except (FileNotFoundError, subprocess.CalledProcessError) as exc:
+        log.error("%s", exc)
+        return 1
+
+    lines = "".join(f"{json.dumps(result)}\n" for result in results)
+    sys.stdout.write(lines)
+    if ns.output:
+        with open(ns.output, "a") as f:
+            f.write(lines)
+        log.info("%d results appended to %s", len(results), ns.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Offline tests of prefetch_sources.py, against an http.server listening on 127.0.0.1.
+
+Run from the root of the checkout with:
+
+    python -m unittest discover -s tools -p "test_*.py"
+"""
+
+import hashlib
+import http.server
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from prefetch_sources import SourceStore, collect_sources, main, prefetch
+from recipe_index import RecipeIndex
+
+ZLIB = b"zlib archive content\n" * 1000
+ZSTD = b"zstd archive content\n" * 1000
+ZLIB_SHA = hashlib.sha256(ZLIB).hexdigest()
+ZSTD_SHA = hashlib.sha256(ZSTD).hexdigest()
+
+
+class StandInServer(object):
+    """Serves {path: content}, answers 404 for anything else, and counts the requests of every path."""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests[self.path] = server.requests.get(self.path, 0) + 1
+                content = server.files.get(self.path)
+                if content is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                # several writes, so that the content is hashed over several reads
+                for start in range(0, len(content), 4096):
+                    self.wfile.write(content[start:start + 4096])
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+
+def write_recipe(root: Path, name: str, sources: dict) -> None:
+    folder = root / "recipes" / name / "all"
+    folder.mkdir(parents=True)
+    (root / "recipes" / name / "config.yml").write_text(
+        "versions:\n" + "".join(f'  "{version}":\n    folder: all\n' for version in sources))
+    conandata = "sources:\n"
+    for version, (urls, sha256) in sources.items():
+        conandata += f'  "{version}":\n    url:\n' + "".join(f'      - "{url}"\n' for url in urls)
+        conandata += f'    sha256: "{sha256}"\n'
+    (folder / "conandata.yml").write_text(conandata)
+
+
+class PrefetchSourcesTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.root = self.tmp / "checkout"
+        self.store = SourceStore(self.tmp / "store")
+
+    def collect(self, recipes=None):
+        with RecipeIndex(self.tmp / "index.sqlite") as index:
+            index.update(self.root, jobs=1)
+            return collect_sources(index, recipes)
+
+    def stored_files(self):
+        return sorted(path.name for path in self.store.path.iterdir())
+
+    def test_deduplicated_by_sha256(self):
+        with StandInServer({"/zlib-1.3.1.tar.gz": ZLIB, "/mirror/zlib-1.3.1.tar.gz": ZLIB}) as server:
+            write_recipe(self.root, "zlib", {"1.3.1": ([f"{server.url}/zlib-1.3.1.tar.gz"], ZLIB_SHA)})
+            # the same archive, from another recipe and another URL
+            write_recipe(self.root, "zlib-compat", {"1.3.1": ([f"{server.url}/mirror/zlib-1.3.1.tar.gz"], ZLIB_SHA)})
+            sources, unverifiable = self.collect()
+            self.assertEqual(list(sources), [ZLIB_SHA])
+            self.assertEqual(unverifiable, [])
+
+            result = prefetch(sources, self.store, jobs=4, timeout=10, retries=0)
+
+        self.assertEqual(result["downloaded"], [ZLIB_SHA])
+        self.assertEqual(result["failed"], [])
+        self.assertEqual(result["bytes"], len(ZLIB))
+        self.assertEqual(sum(server.requests.values()), 1)
+        self.assertEqual(self.store.blob_path(ZLIB_SHA).read_bytes(), ZLIB)
+        metadata = json.loads((self.store.path / f"{ZLIB_SHA}.json").read_text())
+        self.assertEqual(sorted(metadata["references"]), ["zlib-compat/1.3.1", "zlib/1.3.1"])
+
+    def test_checksum_mismatch_falls_back_and_is_not_stored(self):
+        tampered = ZLIB[:-1] + b"!"
+        with StandInServer({"/tampered/zlib.tar.gz": tampered, "/zlib.tar.gz": ZLIB}) as server:
+            write_recipe(self.root, "zlib", {"1.3.1": ([f"{server.url}/tampered/zlib.tar.gz", f"{server.url}/zlib.tar.gz"], ZLIB_SHA)})
+            write_recipe(self.root, "zstd", {"1.5.6": ([f"{server.url}/tampered/zlib.tar.gz"], ZSTD_SHA)})
+            sources, _ = self.collect()
+
+            result = prefetch(sources, self.store, jobs=2, timeout=10, retries=2)
+
+        self.assertEqual(result["downloaded"], [ZLIB_SHA])
+        self.assertEqual([sha256 for sha256, _ in result["failed"]], [ZSTD_SHA])
+        self.assertIn("sha256 mismatch", result["failed"][0][1])
+        # a bad content is not downloaded again from the same URL, whatever the retries
+        self.assertEqual(server.requests["/tampered/zlib.tar.gz"], 2)
+        self.assertEqual(self.store.blob_path(ZLIB_SHA).read_bytes(), ZLIB)
+        # neither the mismatching content nor its temporary file are left in the store
+        self.assertEqual(self.stored_files(), sorted([ZLIB_SHA, f"{ZLIB_SHA}.json"]))
+
+    def test_not_found_falls_back_to_next_url(self):
+        with StandInServer({"/mirror/zstd-1.5.6.tar.gz": ZSTD}) as server:
+            write_recipe(self.root, "zstd", {"1.5.6": ([f"{server.url}/zstd-1.5.6.tar.gz", f"{server.url}/mirror/zstd-1.5.6.tar.gz"], ZSTD_SHA)})
+            sources, _ = self.collect()
+
+            result = prefetch(sources, self.store, jobs=2, timeout=10, retries=2)
+
+        self.assertEqual(result["downloaded"], [ZSTD_SHA])
+        self.assertEqual(result["failed"], [])
+        # client errors are not retried
+        self.assertEqual(server.requests, {"/zstd-1.5.6.tar.gz": 1, "/mirror/zstd-1.5.6.tar.gz": 1})
+        self.assertEqual(self.store.blob_path(ZSTD_SHA).read_bytes(), ZSTD)
+
+    def test_already_stored(self):
+        self.store.blob_path(ZLIB_SHA).write_bytes(ZLIB)
+        with StandInServer({"/zlib.tar.gz": ZLIB, "/zstd.tar.gz": ZSTD}) as server:
+            write_recipe(self.root, "zlib", {"1.3.1": ([f"{server.url}/zlib.tar.gz"], ZLIB_SHA)})
+            write_recipe(self.root, "zstd", {"1.5.6": ([f"{server.url}/zstd.tar.gz"], ZSTD_SHA)})
+            sources, _ = self.collect()
+
+            result = prefetch(sources, self.store, jobs=2, timeout=10, retries=0, verify_existing=True)
+
+        self.assertEqual(result["cached"], [ZLIB_SHA])
+        self.assertEqual(result["downloaded"], [ZSTD_SHA])
+        self.assertEqual(server.requests, {"/zstd.tar.gz": 1})
+        metadata = json.loads((self.store.path / f"{ZLIB_SHA}.json").read_text())
+        self.assertEqual(list(metadata["references"]), ["zlib/1.3.1"])
+
+    def test_main_with_rewrite(self):
+        write_recipe(self.root, "zlib", {"1.3.1": (["https://github.com/madler/zlib/zlib.tar.gz"], ZLIB_SHA)})
+        with StandInServer({"/github.com/madler/zlib/zlib.tar.gz": ZLIB}) as server:
+            args = ["--db", str(self.tmp / "index.sqlite"), "--root", str(self.root), "--store", str(self.store.path),
+                    "--retries", "0", "--rewrite", f"https://github.com/={server.url}/github.com/"]
+            self.assertEqual(main(args), 0)
+            # the second run finds everything in the store
+            self.assertEqual(main(args), 0)
+
+        self.assertEqual(server.requests, {"/github.com/madler/zlib/zlib.tar.gz": 1})
+        self.assertEqual(self.store.blob_path(ZLIB_SHA).read_bytes(), ZLIB)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Offline tests of run_benchmarks.py, with a stand-in benchmark executable and runtime environment.
+
+Run from the root of the checkout with:
+
+    python -m unittest discover -s tools -p "test_*.py"
+"""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from run_benchmarks import benchmark_nodes, find_benchmark, run_benchmark
+
+SETTINGS = {"os": "Linux", "arch": "x86_64", "build_type": "Release"}
+
+BENCHMARK = """#!/bin/sh
+echo "benchmark of $1 MiB, $2 iterations"
+echo "{\\"library\\": \\"libuv\\", \\"size\\": $1, \\"iterations\\": $2, \\"variable\\": \\"${CONANRUN_VARIABLE}\\", \\"io_uring\\": \\"${UV_USE_IO_URING:-unset}\\"}"
+"""
+
+
+def graph(build_folder, options):
+    return {"graph": {"nodes": {
+        "0": {"name": None, "context": "host", "build_folder": str(build_folder),
+              "generators_folder": str(build_folder / "generators"), "settings": SETTINGS},
+        "1": {"name": "libuv", "version": "1.49.2", "context": "host", "options": options, "settings": SETTINGS},
+        "2": {"name": "libuv", "version": "1.49.2", "context": "build", "options": {}, "settings": {}},
+    }}}
+
+
+@unittest.skipIf(sys.platform == "win32", "the stand-in benchmark is a shell script")
+class RunBenchmarksTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.build_folder = Path(self.tmp.name) / "build" / "gcc-release"
+        (self.build_folder / "generators").mkdir(parents=True)
+        (self.build_folder / "generators" / "conanrun.sh").write_text("export CONANRUN_VARIABLE=applied\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _add_benchmark(self, folder):
+        folder.mkdir(parents=True, exist_ok=True)
+        executable = folder / "benchmark"
+        executable.write_text(BENCHMARK)
+        executable.chmod(executable.stat().st_mode | stat.S_IXUSR)
+        return executable
+
+    def test_nodes(self):
+        test_package, tested = benchmark_nodes(graph(self.build_folder, {}), "libuv")
+        self.assertEqual(test_package["build_folder"], str(self.build_folder))
+        self.assertEqual(tested["context"], "host")
+        self.assertEqual(tested["version"], "1.49.2")
+
+    def test_find_benchmark(self):
+        test_package, _ = benchmark_nodes(graph(self.build_folder, {}), "libuv")
+        self.assertIsNone(find_benchmark(test_package))
+        # Multi-config generators
+        executable = self._add_benchmark(self.build_folder / "Release")
+        self.assertEqual(find_benchmark(test_package), executable)
+
+    def test_run(self):
+        self._add_benchmark(self.build_folder)
+        test_package, tested = benchmark_nodes(graph(self.build_folder, {"shared": "False"}), "libuv")
+        results = run_benchmark(test_package, tested, 4, 2)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["size"], 4)
+        self.assertEqual(results[0]["iterations"], 2)
+        self.assertEqual(results[0]["variable"], "applied")
+        self.assertEqual(results[0]["reference"], "libuv/1.49.2")
+        self.assertEqual(results[0]["options"], {"shared": "False"})
+        self.assertEqual(results[0]["settings"], SETTINGS)
+        json.dumps(results)
+
+    def test_variants(self):
+        self._add_benchmark(self.build_folder)
+        test_package, tested = benchmark_nodes(graph(self.build_folder, {"with_io_uring": "True"}), "libuv")
+        previous = os.environ.pop("UV_USE_IO_URING", None)
+        os.environ["UV_USE_IO_URING"] = "1"
+        try:
+            results = run_benchmark(test_package, tested, 1, 1)
+        finally:
+            os.environ.pop("UV_USE_IO_URING")
+            if previous is not None:
+                os.environ["UV_USE_IO_URING"] = previous
+        self.assertEqual([r["io_uring"] for r in results], ["unset", "0", "1"])
+
+    def test_missing_benchmark(self):
+        test_package, tested = benchmark_nodes(graph(self.build_folder, {}), "libuv")
+        with self.assertRaises(FileNotFoundError):
+            run_benchmark(test_package, tested, 1, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()